@@ -0,0 +1 @@
+"""In-process response caches placed in front of the LLM providers."""
@@ -0,0 +1,109 @@
+# app/cache/exact.py
+"""
+Exact-match completion cache.
+
+Keyed by sha256 over the canonical JSON of a provider call (provider, model,
+messages, system prompt, temperature, token cap, ...). Only deterministic
+calls (temperature == 0) are cached, and provider failures
+(ProviderErrorText) are never stored. An explicit API key enters the key only as a
+sha256 digest, so calls made with different keys (different accounts,
+quotas, model access) never share an answer or an in-flight request.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config.settings import settings
+from app.cache.semantic import is_error_answer
+from app.cache.singleflight import SingleFlight
+
+
+def make_key(provider: str, params: Dict[str, Any]) -> str:
+    blob = json.dumps({"provider": provider, **params}, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Thread-safe LRU with per-entry TTL."""
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 2048):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._store: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            rec = self._store.get(key)
+            if rec is None:
+                return None
+            expires, val = rec
+            if expires < time.monotonic():
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return val
+
+    def set(self, key: str, val: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._store[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), val)
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+llm_cache = LLMCache(ttl=settings.EXACT_CACHE_TTL, max_entries=settings.EXACT_CACHE_MAX_ENTRIES)
+# Identical calls already in flight share one provider request
+llm_inflight = SingleFlight()
+
+
+def cached_completion(provider: str) -> Callable[[Callable[..., Awaitable[str]]], Callable[..., Awaitable[str]]]:
+    """
+    Decorator for async ask_*_async wrappers: serve exact temperature-0
+    repeats from llm_cache, and coalesce identical concurrent calls (any
+    temperature) into one provider request.
+    """
+
+    def deco(fn: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> str:
+            if not settings.ENABLE_EXACT_CACHE:
+                return await fn(*args, **kwargs)
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            api_key = params.pop("api_key", None)
+            if api_key:
+                params["api_key_sha256"] = hashlib.sha256(str(api_key).encode("utf-8")).hexdigest()
+            key = make_key(provider, params)
+            temperature = params.get("temperature")
+            if temperature is None or temperature > 0:
+                return await llm_inflight.do(key, lambda: fn(*args, **kwargs))
+
+            hit = llm_cache.get(key)
+            if hit is not None:
+                return hit
+            answer = await llm_inflight.do(key, lambda: fn(*args, **kwargs))
+            if not is_error_answer(answer):
+                llm_cache.set(key, answer)
+            return answer
+
+        return wrapper
+
+    return deco
+
+
+__all__ = ["LLMCache", "llm_cache", "llm_inflight", "cached_completion", "make_key"]
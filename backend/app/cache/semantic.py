@@ -0,0 +1,121 @@
+# app/cache/semantic.py
+"""
+Semantic response cache.
+
+Answers are stored per namespace (user, project, role, provider, model, output
+options) together with the unit-normalized embedding of the question. A lookup
+returns the stored payload when the cosine similarity to a fresh question is
+>= tau and the entry is younger than its TTL — paraphrases skip the LLM calls.
+
+Embeddings come from the existing OpenAI text-embedding-3-small helper in
+vector_service, so no extra model has to be loaded.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+from app.config.settings import settings
+from app.providers.errors import ProviderErrorText
+
+logger = logging.getLogger(__name__)
+
+
+def is_error_answer(text: Optional[str]) -> bool:
+    """Provider wrappers return a ProviderErrorText instead of an answer on failure."""
+    return not text or isinstance(text, ProviderErrorText)
+
+
+def embed_text(text: str) -> Optional[List[float]]:
+    """Question embedding, or None if embeddings are unavailable (never raises)."""
+    try:
+        from app.services.vector_service import create_embedding
+
+        return create_embedding(text)
+    except Exception as e:
+        logger.warning("[SemanticCache] embedding skipped: %s", e)
+        return None
+
+
+class _Bucket:
+    __slots__ = ("vecs", "payloads", "stamps")
+
+    def __init__(self, dim: int):
+        self.vecs = np.empty((0, dim), dtype=np.float32)
+        self.payloads: List[Dict[str, Any]] = []
+        self.stamps: List[float] = []
+
+
+class SemanticCache:
+    """Per-namespace matrix of unit vectors; query is one mat-vec product."""
+
+    def __init__(self, tau: float = 0.92, ttl: float = 3600.0, max_per_namespace: int = 256):
+        self.tau = tau
+        self.ttl = ttl
+        self.max_per_namespace = max_per_namespace
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(emb: Any) -> Optional[np.ndarray]:
+        v = np.asarray(emb, dtype=np.float32).ravel()
+        n = float(np.linalg.norm(v))
+        return v / n if n else None
+
+    def query(
+        self,
+        namespace: Hashable,
+        emb: Any,
+        tau: Optional[float] = None,
+        ttl: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        v = self._unit(emb)
+        if v is None:
+            return None
+        tau = self.tau if tau is None else tau
+        cutoff = time.monotonic() - (self.ttl if ttl is None else ttl)
+        with self._lock:
+            b = self._buckets.get(namespace)
+            if b is None or not b.payloads or b.vecs.shape[1] != v.shape[0]:
+                return None
+            sims = b.vecs @ v
+            best = int(np.argmax(sims))
+            if sims[best] < tau or b.stamps[best] < cutoff:
+                return None
+            return b.payloads[best]
+
+    def put(self, namespace: Hashable, emb: Any, payload: Dict[str, Any]) -> None:
+        v = self._unit(emb)
+        if v is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            b = self._buckets.get(namespace)
+            if b is None or b.vecs.shape[1] != v.shape[0]:
+                b = self._buckets[namespace] = _Bucket(v.shape[0])
+            # Drop expired rows plus the oldest ones over capacity (rows are
+            # appended in time order, so both are a prefix)
+            cutoff = now - self.ttl
+            drop = 0
+            while drop < len(b.stamps) and b.stamps[drop] < cutoff:
+                drop += 1
+            drop = max(drop, len(b.stamps) + 1 - self.max_per_namespace)
+            b.vecs = np.vstack((b.vecs[drop:], v[None, :]))
+            b.payloads = b.payloads[drop:] + [payload]
+            b.stamps = b.stamps[drop:] + [now]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+semantic_cache = SemanticCache(
+    tau=settings.SEMANTIC_CACHE_TAU,
+    ttl=settings.SEMANTIC_CACHE_TTL,
+)
+
+__all__ = ["SemanticCache", "semantic_cache", "embed_text", "is_error_answer"]
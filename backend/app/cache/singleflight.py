@@ -0,0 +1,37 @@
+# app/cache/singleflight.py
+"""
+Single-flight coalescing for in-flight async calls.
+
+Concurrent callers with the same key share one execution: the first caller
+starts the call as a task, later ones await the same future. The task is
+shielded, so one caller disconnecting does not cancel the call for the rest.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    def _done(self, key: str, fut: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved even if every waiter went away
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._inflight.get(key)
+        if fut is None or fut.get_loop() is not asyncio.get_running_loop():
+            fut = asyncio.ensure_future(factory())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f, k=key: self._done(k, f))
+        return await asyncio.shield(fut)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+__all__ = ["SingleFlight"]
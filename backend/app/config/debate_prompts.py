@@ -3,12 +3,191 @@ Debate Mode System Prompts
 Промпты для различных ролей в режиме дебатов
 """
 
+import hashlib
+import sys
+from functools import cache, lru_cache
+from pathlib import Path
+from string import Formatter
+from types import MappingProxyType
+from typing import Any, FrozenSet, Iterator, List, Mapping, Optional, Tuple
+
+__all__ = [
+    "PromptTemplate",
+    "PROJECT_STRUCTURE_START",
+    "PROJECT_STRUCTURE_END",
+    "REVIEW_START",
+    "REVIEW_END",
+    "FINAL_STRUCTURE_START",
+    "FINAL_STRUCTURE_END",
+    "PROPOSER_SYSTEM_PROMPT",
+    "PROPOSER_USER_TEMPLATE",
+    "CRITIC_SYSTEM_PROMPT",
+    "CRITIC_USER_TEMPLATE",
+    "DEFENDER_SYSTEM_PROMPT",
+    "DEFENDER_USER_TEMPLATE",
+    "JUDGE_SYSTEM_PROMPT",
+    "JUDGE_USER_TEMPLATE",
+    "ROUND_SUMMARY_SYSTEM_PROMPT",
+    "PROJECT_BUILDER_GENERATOR_SYSTEM_PROMPT",
+    "PROJECT_BUILDER_GENERATOR_USER_TEMPLATE",
+    "PROJECT_BUILDER_REVIEWER_SYSTEM_PROMPT",
+    "PROJECT_BUILDER_REVIEWER_USER_TEMPLATE",
+    "PROJECT_BUILDER_MERGER_SYSTEM_PROMPT",
+    "PROJECT_BUILDER_MERGER_USER_TEMPLATE",
+    "DEBATE_CONFIGS",
+    "PROJECT_BUILDER_CONFIGS",
+    "get_round_config",
+    "prompt_cache_key",
+    "get_available_modes",
+    "get_mode_info",
+]
+
+
+# =============================================================================
+# TEMPLATE COMPILATION
+# =============================================================================
+
+_FORMATTER = Formatter()
+
+
+class PromptTemplate:
+    """
+    Шаблон, разобранный один раз при импорте.
+
+    render() склеивает готовые (literal, field) чанки через "".join вместо
+    повторного разбора format-строки на каждом вызове str.format.
+    render_bytes() делает то же на уровне UTF-8: литералы закодированы заранее,
+    кодируются только подставляемые значения.
+    """
+
+    __slots__ = ("source", "fields", "_chunks", "_encoded_chunks")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        parsed = list(_FORMATTER.parse(source))
+        for _literal, field, spec, conv in parsed:
+            # render() подставляет str(value) как есть — спецификаторы не поддерживаются
+            if field is not None and (not field.isidentifier() or spec or conv):
+                raise ValueError(f"Unsupported placeholder {{{field}}} in prompt template")
+        self._chunks: Tuple[Tuple[str, Optional[str]], ...] = tuple(
+            (literal, field) for literal, field, _spec, _conv in parsed
+        )
+        self._encoded_chunks: Tuple[Tuple[bytes, Optional[str]], ...] = tuple(
+            (literal.encode("utf-8"), field) for literal, field in self._chunks
+        )
+        self.fields: FrozenSet[str] = frozenset(f for _, f in self._chunks if f)
+
+    def render(self, **kwargs: Any) -> str:
+        return "".join(self.render_into([], **kwargs))
+
+    def render_into(self, parts: List[str], **kwargs: Any) -> List[str]:
+        """
+        Дописывает чанки в чужой список: вызывающий код может добавить свой
+        префикс/суффикс и собрать всё одним "".join без промежуточной строки.
+        """
+        for literal, field in self._chunks:
+            parts.append(literal)
+            if field:
+                parts.append(str(kwargs[field]))
+        return parts
+
+    def render_bytes(self, **kwargs: Any) -> bytes:
+        parts = []
+        for literal, field in self._encoded_chunks:
+            parts.append(literal)
+            if field:
+                parts.append(str(kwargs[field]).encode("utf-8"))
+        return b"".join(parts)
+
+    def __str__(self) -> str:
+        return self.source
+
+
+# =============================================================================
+# FILE-BACKED PROMPTS
+# =============================================================================
+
+_PROMPTS_DIR = Path(__file__).parent / "prompts"
+
+
+class _PromptFile:
+    """Ссылка на prompts/<name>.txt внутри конфига раунда."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+@cache
+def _load_prompt(name: str) -> str:
+    """Читает prompts/<name>.txt один раз и подставляет маркеры блоков."""
+    text = (_PROMPTS_DIR / f"{name}.txt").read_text(encoding="utf-8").rstrip("\n")
+    return text.format_map(_MARKERS)
+
+
+class _RoundConfig(Mapping):
+    """Read-only конфиг раунда; _PromptFile значения читаются при первом доступе."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        self._data = dict(data)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._data[key]
+        if isinstance(value, _PromptFile):
+            return _load_prompt(value.name)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"_RoundConfig(role={self._data.get('role')!r})"
+
+
+# =============================================================================
+# SHARED FRAGMENTS
+# =============================================================================
+
+# Общие куски промптов собираются один раз при импорте, чтобы все шаблоны
+# ссылались на одни и те же строки.
+_EXPERT_PREAMBLE = "Ты AI-эксперт, участвующий в конструктивной дискуссии.\nТвоя роль:"
+_TASKS_HEADER = "Задачи:"
+_TOKEN_LIMIT_2K = "(макс 2000 tokens)"
+
+# Маркеры блоков в ответах Project Builder (interned: парсеры сравнивают их
+# с частями ответа).
+PROJECT_STRUCTURE_START = sys.intern("===PROJECT_STRUCTURE_START===")
+PROJECT_STRUCTURE_END = sys.intern("===PROJECT_STRUCTURE_END===")
+REVIEW_START = sys.intern("===REVIEW_START===")
+REVIEW_END = sys.intern("===REVIEW_END===")
+FINAL_STRUCTURE_START = sys.intern("===FINAL_STRUCTURE_START===")
+FINAL_STRUCTURE_END = sys.intern("===FINAL_STRUCTURE_END===")
+
+_MARKERS: Mapping[str, str] = MappingProxyType({
+    "PROJECT_STRUCTURE_START": PROJECT_STRUCTURE_START,
+    "PROJECT_STRUCTURE_END": PROJECT_STRUCTURE_END,
+    "REVIEW_START": REVIEW_START,
+    "REVIEW_END": REVIEW_END,
+    "FINAL_STRUCTURE_START": FINAL_STRUCTURE_START,
+    "FINAL_STRUCTURE_END": FINAL_STRUCTURE_END,
+})
+
+
 # =============================================================================
 # STANDARD DEBATE PROMPTS
 # =============================================================================
 
-PROPOSER_PROMPT = """Ты AI-эксперт, участвующий в конструктивной дискуссии.
-Твоя роль: предложить ЛУЧШЕЕ решение на основе анализа.
+# Static instructions live in *_SYSTEM_PROMPT so they form a byte-identical
+# prefix across requests (provider prompt caching); per-request data goes into
+# the trailing *_USER_TEMPLATE.
+
+PROPOSER_SYSTEM_PROMPT = f"""{_EXPERT_PREAMBLE} предложить ЛУЧШЕЕ решение на основе анализа.
 
 Правила:
 - Будь конкретным и аргументированным
@@ -16,60 +195,45 @@ PROPOSER_PROMPT = """Ты AI-эксперт, участвующий в конс
 - Признавай возможные недостатки
 - Открыт к улучшениям
 
-Вопрос: {topic}
-
-Предложи своё решение (макс 2000 tokens)."""
+Предложи своё решение {_TOKEN_LIMIT_2K}."""
 
-CRITIC_PROMPT = """Ты AI-эксперт, участвующий в конструктивной дискуссии.
-Твоя роль: критически оценить решение и улучшить его.
+PROPOSER_USER_TEMPLATE = PromptTemplate("""Вопрос: {topic}""")
 
-Предложенное решение:
-{previous_solution}
+CRITIC_SYSTEM_PROMPT = f"""{_EXPERT_PREAMBLE} критически оценить решение и улучшить его.
 
-Задачи:
+{_TASKS_HEADER}
 - Найди сильные стороны
 - Найди слабые стороны или пропуски
 - Предложи улучшения или альтернативы
 - Добавь что упущено
 
 Будь конструктивен! Цель - найти лучшее решение вместе.
-(макс 2000 tokens)"""
-
-DEFENDER_PROMPT = """Ты AI-эксперт, продолжающий дискуссию.
-Твоя роль: ответить на критику и уточнить позицию.
+{_TOKEN_LIMIT_2K}"""
 
-Твоё первоначальное решение:
-{original_solution}
+CRITIC_USER_TEMPLATE = PromptTemplate("""Предложенное решение:
+{previous_solution}""")
 
-Критика и предложения:
-{critique}
+DEFENDER_SYSTEM_PROMPT = f"""Ты AI-эксперт, продолжающий дискуссию.
+Твоя роль: ответить на критику и уточнить позицию.
 
-Задачи:
+{_TASKS_HEADER}
 - Признай валидные замечания
 - Защити сильные стороны своего решения
 - Интегрируй полезные предложения
 - Уточни финальную позицию
 
-(макс 2000 tokens)"""
-
-JUDGE_PROMPT = """Ты AI-судья, финализирующий дискуссию.
-Твоя роль: создать ОПТИМАЛЬНОЕ решение из лучших идей.
-
-Вопрос: {topic}
+{_TOKEN_LIMIT_2K}"""
 
-Дискуссия:
----
-Round 1 (GPT-4o): 
-{round1}
+DEFENDER_USER_TEMPLATE = PromptTemplate("""Твоё первоначальное решение:
+{original_solution}
 
-Round 2 (Claude Sonnet): 
-{round2}
+Критика и предложения:
+{critique}""")
 
-Round 3 (GPT-4o): 
-{round3}
----
+JUDGE_SYSTEM_PROMPT = f"""Ты AI-судья, финализирующий дискуссию.
+Твоя роль: создать ОПТИМАЛЬНОЕ решение из лучших идей.
 
-Задачи:
+{_TASKS_HEADER}
 1. Проанализируй все аргументы
 2. Возьми лучшее от каждого AI
 3. Создай ИТОГОВОЕ решение которое:
@@ -91,393 +255,91 @@ Round 3 (GPT-4o):
 
 (макс 3000 tokens)"""
 
+# Сжатие ранних раундов перед судьёй, если они длиннее бюджета
+ROUND_SUMMARY_SYSTEM_PROMPT = """Сожми реплику участника дискуссии.
+Сохрани все аргументы, предложения, факты и выводы; убери повторы и воду.
+Не добавляй ничего от себя. Пиши на языке оригинала."""
 
-# =============================================================================
-# PROJECT BUILDER PROMPTS - IMPROVED VERSION
-# =============================================================================
-
-PROJECT_BUILDER_GENERATOR_PROMPT = """You are a Project Structure Generator. Generate complete project structures with LOGICAL file ordering.
-
-## 🎯 CRITICAL: FILE ORDERING RULES
-Files MUST be numbered in DEPENDENCY ORDER, grouped by purpose!
-
-## 📦 MANDATORY GROUP STRUCTURE:
-
-**GROUP 1: FOUNDATION** (Files with ZERO dependencies)
-- Types/Interfaces (*.types.ts, interfaces.ts)
-- Constants (constants.ts, config.ts)
-- Base utilities (logger.ts, helpers.ts)
-
-**GROUP 2: CORE LOGIC** (Uses Foundation)
-- Authentication (auth/, authManager.ts)
-- API clients (api.ts, apiClient.ts)
-- Services (services/)
-- Data models (models/)
-
-**GROUP 3: INTEGRATION** (Connects Core to UI)
-- Controllers (controllers/)
-- Panels (panels/, providers/)
-- Middleware (middleware/)
-- State management (store/, context/)
-
-**GROUP 4: UI LAYER** (Uses everything above)
-- React/Vue components (components/)
-- Hooks (hooks/, composables/)
-- Views/Pages (views/, pages/)
-
-**GROUP 5: STYLING** (Visual presentation)
-- Global styles (globals.css, theme.css)
-- Component styles (components.css)
-- Assets (images/, fonts/)
-
-**GROUP 6: CONFIGURATION** (References project files)
-- Build configs (webpack.config.js, vite.config.ts)
-- TypeScript configs (tsconfig.json)
-- Package files (package.json)
-- Linting configs (.eslintrc, .prettierrc)
-
-**GROUP 7: TOOLING** (Development environment)
-- IDE configs (.vscode/, .idea/)
-- Test setup (jest.config.js, test/)
-- CI/CD (.github/, .gitlab-ci.yml)
-
-**GROUP 8: DOCUMENTATION** (Project meta)
-- README.md
-- CHANGELOG.md
-- LICENSE
-- .gitignore
-
-## 📋 OUTPUT FORMAT (USE EXACTLY):
-
-===PROJECT_STRUCTURE_START===
-📁 [project-name] ✅ STRUCTURED
-Tech: [list technologies]
-====================
-
-## 📦 GROUP 1: FOUNDATION (Independent files)
-[folder]/
-├── types.ts                [1] - Core TypeScript interfaces (no dependencies)
-├── constants.ts            [2] - Application constants (uses types)
-└── utils/
-    ├── logger.ts           [3] - Logging utility (uses types)
-    └── helpers.ts          [4] - Helper functions (uses types, constants)
-
-## 📦 GROUP 2: CORE LOGIC (Business logic)
-[folder]/
-├── auth/
-│   └── authManager.ts      [5] - Authentication management (uses 1-4)
-├── api.ts                  [6] - API client (uses 1-2, 5)
-└── services/
-    └── dataService.ts      [7] - Data service (uses 1-2, 6)
-
-## 📦 GROUP 3: INTEGRATION (Connecting layers)
-[folder]/
-├── panels/
-│   └── mainPanel.ts        [8] - Main panel (uses 1-7)
-└── controllers/
-    └── appController.ts    [9] - App controller (uses 1-8)
-
-## 📦 GROUP 4: UI LAYER (User interface)
-[folder]/
-├── components/
-│   ├── auth/
-│   │   └── LoginForm.tsx   [10] - Login component (uses 5, 7)
-│   └── chat/
-│       └── ChatView.tsx    [11] - Chat component (uses 7-9)
-└── hooks/
-    └── useAuth.ts          [12] - Auth hook (uses 5, 7)
-
-## 📦 GROUP 5: STYLING (Visual design)
-[folder]/
-├── styles/
-│   ├── globals.css         [13] - Global styles
-│   └── components.css      [14] - Component styles
-└── assets/
-    └── logo.svg            [15] - Assets
-
-## 📦 GROUP 6: CONFIGURATION (Project setup)
-├── tsconfig.json           [16] - TypeScript config (references all .ts files)
-├── package.json            [17] - Dependencies (lists all packages)
-├── webpack.config.js       [18] - Build config (references source files)
-└── .eslintrc.js            [19] - Linting rules
-
-## 📦 GROUP 7: TOOLING (Development)
-├── .vscode/
-│   ├── launch.json         [20] - Debug config
-│   └── tasks.json          [21] - Build tasks
-└── test/
-    └── setup.ts            [22] - Test setup
-
-## 📦 GROUP 8: DOCUMENTATION (Meta files)
-├── README.md               [23] - Project documentation
-├── CHANGELOG.md            [24] - Version history
-└── .gitignore              [25] - Git ignore rules
-
-📋 SETUP COMMANDS:
-```bash
-npm install
-npm run build
-npm run dev
-npm test
-```
-
-📦 DEPENDENCIES:
-Production: [@types/node], [express], [typescript]
-Dev: [webpack], [jest], [@types/jest]
-
-🔗 FILE GENERATION ORDER & DEPENDENCIES:
-
-**Start here (no dependencies):**
-[1] types.ts → Defines all interfaces
-[2] constants.ts → Uses [1]
-[3] logger.ts → Uses [1]
-[4] helpers.ts → Uses [1,2]
-
-**Then core logic:**
-[5] authManager.ts → Uses [1,2,3,4]
-[6] api.ts → Uses [1,2,5]
-[7] dataService.ts → Uses [1,2,6]
-
-**Then integration:**
-[8] mainPanel.ts → Uses [1-7]
-[9] appController.ts → Uses [1-8]
-
-**Then UI (can work in parallel):**
-[10] LoginForm.tsx → Uses [5,7]
-[11] ChatView.tsx → Uses [7,8,9]
-[12] useAuth.ts → Uses [5,7]
-
-**Then styling:**
-[13-15] CSS and assets → No code dependencies
-
-**Then config (last!):**
-[16-19] Config files → Reference all source files
-
-**Then tooling:**
-[20-22] Dev tools → Use config files
-
-**Finally documentation:**
-[23-25] Docs → Describe everything above
-
-===PROJECT_STRUCTURE_END===
-
-## ✅ VALIDATION CHECKLIST:
-Before outputting, verify:
-- [ ] All files are grouped by purpose
-- [ ] Groups follow dependency order (Foundation → Core → UI → Config → Docs)
-- [ ] File numbers increase within each group
-- [ ] Each file lists what it depends on
-- [ ] Foundation group (1-5) has NO external dependencies
-- [ ] Config files (package.json, tsconfig) come LATE
-- [ ] No file uses code from higher-numbered files
-
-User request: {topic}
-
-Generate the PROPERLY GROUPED structure now."""
-
-
-PROJECT_BUILDER_REVIEWER_PROMPT = """You are a Project Structure Reviewer. Verify GROUPING and ORDERING are correct.
-
-## STRUCTURE TO REVIEW:
-{previous_solution}
-
-## YOUR REVIEW TASKS:
+JUDGE_USER_TEMPLATE = PromptTemplate("""Вопрос: {topic}
 
-### 1. ✅ GROUP STRUCTURE CHECK:
-- Are all 8 groups present? (Foundation, Core, Integration, UI, Styling, Config, Tooling, Docs)
-- Are groups in correct order?
-- Are files in the right groups?
-
-### 2. ✅ FILE ORDERING CHECK:
-- Do Foundation files come first (1-5ish)?
-- Do Config files come late (near end)?
-- Does each file come AFTER its dependencies?
-- Are group numbers consecutive?
-
-### 3. ✅ DEPENDENCY CHECK:
-- Does each file list what it depends on?
-- Are dependencies only from lower numbers?
-- Are there circular dependencies?
-
-### 4. ✅ COMPLETENESS CHECK:
-- Missing files in any group?
-- Missing essential configs (package.json, tsconfig)?
-- Missing utilities (logger, helpers)?
+Дискуссия:
+---
+Round 1 (GPT-4o): 
+{round1}
 
-## OUTPUT FORMAT (USE EXACTLY):
+Round 2 (Claude Sonnet): 
+{round2}
 
-===REVIEW_START===
-## ✅ CORRECT GROUPING:
-- GROUP 1 (Foundation): [list files] ✓
-- GROUP 2 (Core): [list files] ✓
-- [continue for all groups]
+Round 3 (GPT-4o): 
+{round3}
+---""")
 
-## ⚠️ GROUPING ISSUES:
-- [file.ts] is in GROUP X but should be in GROUP Y because [reason]
-- GROUP [N] should come before GROUP [M] because [reason]
 
-## ⚠️ ORDERING ISSUES:
-- [file.ts] numbered [N] but uses [file2.ts] numbered [M where M>N] ❌
-- Suggested fix: Move [file.ts] to position [new_N]
+# =============================================================================
+# PROJECT BUILDER PROMPTS - IMPROVED VERSION
+# =============================================================================
 
-## ⚠️ MISSING FILES:
-**In GROUP 1 (Foundation):**
-- [path/file.ts] - [why needed] - Should be file [N]
+# Большие статические промпты Project Builder лежат в prompts/*.txt и читаются
+# только при первом обращении: debate-only процесс их вообще не загружает.
+_PROMPT_FILES: Mapping[str, str] = MappingProxyType({
+    "PROJECT_BUILDER_GENERATOR_SYSTEM_PROMPT": "pb_generator",
+    "PROJECT_BUILDER_REVIEWER_SYSTEM_PROMPT": "pb_reviewer",
+    "PROJECT_BUILDER_MERGER_SYSTEM_PROMPT": "pb_merger",
+})
 
-**In GROUP 2 (Core):**
-- [path/file.ts] - [why needed] - Should be file [N]
 
-[...continue for each group]
+def __getattr__(name: str) -> str:
+    prompt_file = _PROMPT_FILES.get(name)
+    if prompt_file is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _load_prompt(prompt_file)
 
-## ✅ DEPENDENCY VERIFICATION:
-- [1] types.ts → No dependencies ✓
-- [2] constants.ts → Uses [1] ✓
-- [5] auth.ts → Uses [1,2,3,4] ✓
-[...verify all critical files]
 
-## 🔧 RECOMMENDED CHANGES:
-1. Move [file] from GROUP X to GROUP Y
-2. Renumber [file] from [N] to [M]
-3. Add [missing file] to GROUP Z as file [N]
-4. Reorder GROUP [X] to come before GROUP [Y]
+PROJECT_BUILDER_GENERATOR_USER_TEMPLATE = PromptTemplate("""User request: {topic}
 
-===REVIEW_END===
+Generate the PROPERLY GROUPED structure now.""")
 
-## IMPORTANT:
-- Focus on LOGICAL STRUCTURE, not just missing files
-- Every file should be in exactly ONE group
-- Groups should be numbered 1-8
-- Foundation must be first, Documentation must be last
 
-Review now."""
+PROJECT_BUILDER_REVIEWER_USER_TEMPLATE = PromptTemplate("""## STRUCTURE TO REVIEW:
+{previous_solution}
 
+Review now.""")
 
-PROJECT_BUILDER_MERGER_PROMPT = """You are a Project Structure Finalizer. Create the PERFECT final structure with OPTIMAL grouping.
 
-## CONTEXT:
+PROJECT_BUILDER_MERGER_USER_TEMPLATE = PromptTemplate("""## CONTEXT:
 Original request: {topic}
 
 Round 1 (Generator): {round1}
 
 Round 2 (Reviewer feedback): {round2}
 
-## YOUR TASKS:
-1. Apply ALL valid improvements from reviewer
-2. Fix any grouping issues
-3. Renumber files if needed to fix dependencies
-4. Add missing files in correct groups
-5. Output PERFECTLY STRUCTURED final result
-
-## OUTPUT FORMAT (USE EXACTLY):
-
-===FINAL_STRUCTURE_START===
-📁 [project-name] ✅ FINAL
-Tech: [technologies]
-====================
-
-## 📦 GROUP 1: FOUNDATION (No external dependencies)
-[Complete file tree for this group]
-├── [file.ext]              [1] - [description]
-├── [file.ext]              [2] - [description]
-└── [folder]/
-    └── [file.ext]          [3] - [description]
-
-## 📦 GROUP 2: CORE LOGIC (Uses Foundation)
-[Complete file tree for this group]
-├── [folder]/
-│   └── [file.ext]          [4] - [description]
-└── [file.ext]              [5] - [description]
-
-## 📦 GROUP 3: INTEGRATION (Connects Core to UI)
-[...continue with all groups clearly separated...]
-
-## 📦 GROUP 4: UI LAYER (User interface)
-[...continue...]
-
-## 📦 GROUP 5: STYLING (Visual design)
-[...continue...]
-
-## 📦 GROUP 6: CONFIGURATION (Project setup)
-[...continue...]
-
-## 📦 GROUP 7: TOOLING (Development tools)
-[...continue...]
-
-## 📦 GROUP 8: DOCUMENTATION (Project meta)
-[...continue...]
-
-📋 SETUP COMMANDS:
-```bash
-[specific commands with package versions]
-```
-
-📦 DEPENDENCIES:
-Production: [pkg1@version], [pkg2@version]
-Dev: [pkg1@version], [pkg2@version]
-
-🔗 GENERATION ORDER & RATIONALE:
-
-**GROUP 1 (Generate first - no dependencies):**
-[1] [path/file] - No dependencies, defines base types
-[2] [path/file] - Uses [1] for type definitions
-[3] [path/file] - Uses [1,2] for types and constants
-[...continue for all GROUP 1 files]
-
-**GROUP 2 (Generate next - uses GROUP 1):**
-[N] [path/file] - Uses [1,2,3] from Foundation
-[N+1] [path/file] - Uses [1,2,N] 
-[...continue for all GROUP 2 files]
-
-**GROUP 3 (Integration layer):**
-[...continue explaining each group]
-
-[Continue through all groups with clear dependency explanation]
-
-## 📋 GENERATION CHECKLIST:
-Generate files IN ORDER - each uses code from previous!
-
-| # | File | Group | Dependencies | Status |
-|---|------|-------|--------------|--------|
-| 1 | [path] | Foundation | None | ⏳ Ready |
-| 2 | [path] | Foundation | [1] | 🔒 Locked |
-| 3 | [path] | Foundation | [1,2] | 🔒 Locked |
-| 4 | [path] | Core | [1,2,3] | 🔒 Locked |
-[...complete table for ALL files]
-
-## 🎯 GENERATION STRATEGY:
-1. **Start with GROUP 1** (files 1-5ish)
-   - Generate all Foundation files first
-   - Test compilation: `npm run compile`
-   
-2. **Then GROUP 2** (files 6-10ish)
-   - Generate Core logic
-   - Foundation files are now available
-   
-3. **Then GROUP 3-4** (Integration & UI)
-   - Can use everything from previous groups
-   
-4. **Then GROUP 5-6** (Styling & Config)
-   - Reference all source code
-   
-5. **Finally GROUP 7-8** (Tooling & Docs)
-   - Everything is ready to document
-
-⚠️ **DO NOT skip ahead!** File [10] cannot work if [5] doesn't exist yet.
-
-===FINAL_STRUCTURE_END===
-
-## CRITICAL VALIDATION:
-Before outputting, ensure:
-- ✅ All 8 groups are present and labeled
-- ✅ Groups are in correct order (1→8)
-- ✅ Files are numbered consecutively within groups
-- ✅ Dependencies column shows what each file uses
-- ✅ No file depends on higher-numbered files
-- ✅ Foundation group contains ONLY independent files
-- ✅ Configuration group is near the end
-- ✅ First file is ⏳ Ready, all others 🔒 Locked
-
-Generate the PERFECTLY STRUCTURED final output now."""
+Generate the PERFECTLY STRUCTURED final output now.""")
+
+
+# =============================================================================
+# PLACEHOLDER VALIDATION
+# =============================================================================
+
+# Ожидаемые поля каждого шаблона: расхождение — ошибка при импорте, а не
+# KeyError (или молча проигнорированное поле) посреди дебата.
+_EXPECTED_FIELDS: Tuple[Tuple[str, PromptTemplate, FrozenSet[str]], ...] = (
+    ("PROPOSER_USER_TEMPLATE", PROPOSER_USER_TEMPLATE, frozenset({"topic"})),
+    ("CRITIC_USER_TEMPLATE", CRITIC_USER_TEMPLATE, frozenset({"previous_solution"})),
+    ("DEFENDER_USER_TEMPLATE", DEFENDER_USER_TEMPLATE, frozenset({"original_solution", "critique"})),
+    ("JUDGE_USER_TEMPLATE", JUDGE_USER_TEMPLATE, frozenset({"topic", "round1", "round2", "round3"})),
+    ("PROJECT_BUILDER_GENERATOR_USER_TEMPLATE", PROJECT_BUILDER_GENERATOR_USER_TEMPLATE, frozenset({"topic"})),
+    ("PROJECT_BUILDER_REVIEWER_USER_TEMPLATE", PROJECT_BUILDER_REVIEWER_USER_TEMPLATE, frozenset({"previous_solution"})),
+    ("PROJECT_BUILDER_MERGER_USER_TEMPLATE", PROJECT_BUILDER_MERGER_USER_TEMPLATE, frozenset({"topic", "round1", "round2"})),
+)
+
+for _name, _template, _expected in _EXPECTED_FIELDS:
+    if _template.fields != _expected:
+        raise ValueError(
+            f"{_name} placeholders mismatch: "
+            f"missing={sorted(_expected - _template.fields)} "
+            f"unexpected={sorted(_template.fields - _expected)}"
+        )
+del _name, _template, _expected
 
 
 # =============================================================================
@@ -489,25 +351,37 @@ DEBATE_CONFIGS = {
         "model_key": "gpt-4o",
         "role": "proposer",
         "max_tokens": 2000,
-        "prompt_template": PROPOSER_PROMPT
+        "system_prompt": PROPOSER_SYSTEM_PROMPT,
+        "user_template": PROPOSER_USER_TEMPLATE,
+        "cache_ttl": 3600
     },
     2: {
         "model_key": "claude-3-5-sonnet",
         "role": "critic",
         "max_tokens": 2000,
-        "prompt_template": CRITIC_PROMPT
+        "system_prompt": CRITIC_SYSTEM_PROMPT,
+        "user_template": CRITIC_USER_TEMPLATE,
+        "cache_ttl": 3600
     },
     3: {
         "model_key": "gpt-4o",
         "role": "defender",
         "max_tokens": 2000,
-        "prompt_template": DEFENDER_PROMPT
+        "system_prompt": DEFENDER_SYSTEM_PROMPT,
+        "user_template": DEFENDER_USER_TEMPLATE,
+        "cache_ttl": 3600
     },
     "final": {
         "model_key": "claude-sonnet-4.5",  
-        "role": "merger",
+        "role": "judge",
         "max_tokens": 8192,  
-        "prompt_template": PROJECT_BUILDER_MERGER_PROMPT
+        "system_prompt": JUDGE_SYSTEM_PROMPT,
+        "user_template": JUDGE_USER_TEMPLATE,
+        # Rounds 1-2 longer than this (tokens) are summarized before the judge;
+        # the last round is always passed verbatim.
+        "summarize_above": 1200,
+        "summary_model_key": "gpt-4o-mini",
+        "cache_ttl": 3600
     }
 }
 
@@ -516,63 +390,113 @@ PROJECT_BUILDER_CONFIGS = {
         "model_key": "gpt-4o",
         "role": "generator",
         "max_tokens": 4000,  # Increased for detailed grouping
-        "prompt_template": PROJECT_BUILDER_GENERATOR_PROMPT
+        "system_prompt": _PromptFile("pb_generator"),
+        "user_template": PROJECT_BUILDER_GENERATOR_USER_TEMPLATE
     },
     2: {
         "model_key": "claude-3-5-sonnet",
         "role": "reviewer",
         "max_tokens": 3000,  # Increased for detailed review
-        "prompt_template": PROJECT_BUILDER_REVIEWER_PROMPT
+        "system_prompt": _PromptFile("pb_reviewer"),
+        "user_template": PROJECT_BUILDER_REVIEWER_USER_TEMPLATE
     },
     "final": {
         "model_key": "claude-sonnet-4.5",
         "role": "merger",
         "max_tokens": 5000,  # Increased for complete final structure
-        "prompt_template": PROJECT_BUILDER_MERGER_PROMPT
+        "system_prompt": _PromptFile("pb_merger"),
+        "user_template": PROJECT_BUILDER_MERGER_USER_TEMPLATE
     }
 }
 
 
-def get_round_config(round_num: int, mode: str = "debate") -> dict:
+# Read-only views: one shared config object per round for every concurrent
+# debate. Callers needing overrides build their own {**cfg, ...}.
+DEBATE_CONFIGS = MappingProxyType({k: _RoundConfig(v) for k, v in DEBATE_CONFIGS.items()})
+PROJECT_BUILDER_CONFIGS = MappingProxyType(
+    {k: _RoundConfig(v) for k, v in PROJECT_BUILDER_CONFIGS.items()}
+)
+
+
+# (mode, round) → resolved config, built once at import.
+# Project Builder: только 2 раунда + final; round 3 goes straight to final.
+_ROUND_TABLE: Mapping[Tuple[str, Any], Mapping[str, Any]] = MappingProxyType({
+    ("debate", 1): DEBATE_CONFIGS[1],
+    ("debate", 2): DEBATE_CONFIGS[2],
+    ("debate", 3): DEBATE_CONFIGS[3],
+    ("debate", "final"): DEBATE_CONFIGS["final"],
+    ("project-builder", 1): PROJECT_BUILDER_CONFIGS[1],
+    ("project-builder", 2): PROJECT_BUILDER_CONFIGS[2],
+    ("project-builder", 3): PROJECT_BUILDER_CONFIGS["final"],
+    ("project-builder", "final"): PROJECT_BUILDER_CONFIGS["final"],
+})
+_MODE_DEFAULTS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "debate": DEBATE_CONFIGS[1],
+    "project-builder": PROJECT_BUILDER_CONFIGS[1],
+})
+
+
+def get_round_config(round_num: int, mode: str = "debate") -> Mapping[str, Any]:
     """
     Возвращает конфигурацию для конкретного раунда
     
     Args:
         round_num: Номер раунда (1, 2, 3, или 'final')
-        mode: "debate" или "project-builder"
+        mode: "debate" или "project-builder" (любой другой → "debate")
     
     Returns:
-        Dict с model_key, role, max_tokens, prompt_template
+        Read-only mapping с model_key, role, max_tokens, system_prompt, user_template
+        (+ cache_ttl для дебатов, summarize_above / summary_model_key для final)
     """
-    if mode == "project-builder":
-        # Project Builder: только 2 раунда + final
-        if round_num == 3:
-            # Skip round 3 for project builder, go straight to final
-            return PROJECT_BUILDER_CONFIGS.get("final")
-        return PROJECT_BUILDER_CONFIGS.get(round_num, PROJECT_BUILDER_CONFIGS[1])
-    
-    # Standard debate mode
-    return DEBATE_CONFIGS.get(round_num, DEBATE_CONFIGS[1])
+    config = _ROUND_TABLE.get((mode, round_num))
+    if config is not None:
+        return config
+    if mode not in _MODE_DEFAULTS:
+        return _ROUND_TABLE.get(("debate", round_num), DEBATE_CONFIGS[1])
+    return _MODE_DEFAULTS[mode]
+
+
+@lru_cache(maxsize=16)
+def _encode_static(text: str) -> bytes:
+    return text.encode("utf-8")
 
 
-def get_available_modes() -> list:
+def prompt_cache_key(config: Mapping[str, Any], **kwargs: Any) -> str:
+    """
+    Ключ кэша ответа для раунда: blake2b от модели, лимита токенов,
+    системного промпта и отрендеренного user-шаблона.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{config['model_key']}\0{config['max_tokens']}\0".encode("utf-8"))
+    h.update(_encode_static(config["system_prompt"]))
+    h.update(b"\0")
+    h.update(config["user_template"].render_bytes(**kwargs))
+    return h.hexdigest()
+
+
+_AVAILABLE_MODES: Tuple[str, ...] = ("debate", "project-builder")
+
+_MODES_INFO: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "debate": MappingProxyType({
+        "name": "Debate Mode",
+        "description": "AI дискуссия с 3 раундами + финальное решение",
+        "rounds": 3,
+        "models": ("gpt-4o", "claude-3-5-sonnet", "gpt-4o", "claude-sonnet-4.5"),  # ✅ FIX
+    }),
+    "project-builder": MappingProxyType({
+        "name": "Project Builder",
+        "description": "Генерация структуры проекта с review",
+        "rounds": 2,
+        "models": ("gpt-4o", "claude-3-5-sonnet", "claude-sonnet-4.5"),  # ✅ FIX
+    }),
+})
+
+
+def get_available_modes() -> Tuple[str, ...]:
     """Возвращает список доступных режимов"""
-    return ["debate", "project-builder"]
-
-
-def get_mode_info(mode: str) -> dict:
-    modes = {
-        "debate": {
-            "name": "Debate Mode",
-            "description": "AI дискуссия с 3 раундами + финальное решение",
-            "rounds": 3,
-            "models": ["gpt-4o", "claude-3-5-sonnet", "gpt-4o", "claude-sonnet-4.5"]  # ✅ FIX
-        },
-        "project-builder": {
-            "name": "Project Builder",
-            "description": "Генерация структуры проекта с review",
-            "rounds": 2,
-            "models": ["gpt-4o", "claude-3-5-sonnet", "claude-sonnet-4.5"]  # ✅ FIX
-        }
-    }
-    return modes.get(mode, modes["debate"])
\ No newline at end of file
+    return _AVAILABLE_MODES
+
+
+def get_mode_info(mode: str) -> Mapping[str, Any]:
+    """Read-only описание режима (неизвестный режим → "debate")"""
+    return _MODES_INFO.get(mode, _MODES_INFO["debate"])
@@ -1,163 +1,69 @@
 from __future__ import annotations
 
-from typing import Dict, Literal, TypedDict
-
-# Try modern Required/NotRequired; gracefully degrade if unavailable
-_HAS_REQ_NOTREQ = True
-try:
-    from typing import Required, NotRequired  # Python 3.11+
-except Exception:  # pragma: no cover
-    try:
-        from typing_extensions import Required, NotRequired  # type: ignore
-    except Exception:  # pragma: no cover
-        _HAS_REQ_NOTREQ = False
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Literal, Mapping, Optional, Tuple
 
 Provider = Literal["openai", "anthropic", "glm"]
 
-if _HAS_REQ_NOTREQ:
-    class ModelInfo(TypedDict):
-        provider: Required[Provider]
-        model: Required[str]
-        # Optional per-model overrides used by factory.ask_model(...)
-        temperature: NotRequired[float]
-        max_tokens: NotRequired[int]
-else:
-    # Fallback: permissive TypedDict (runtime data still includes provider/model).
-    class ModelInfo(TypedDict, total=False):  # type: ignore[misc]
-        provider: Provider
-        model: str
-        temperature: float
-        max_tokens: int
+
+@dataclass(frozen=True, slots=True)
+class ModelInfo:
+    # "provider" and "model" are consumed by the provider wrappers.
+    provider: Provider
+    model: str
+    # Optional per-model overrides used by factory.ask_model(...)
+    max_tokens: int = 4096
+    temperature: Optional[float] = None  # None → caller's temperature (or omitted for reasoning)
 
 
-# Registry keys (left side) are accepted as `model_key` by your API.
-# "provider" and "model" are consumed by the provider wrappers.
-MODEL_REGISTRY: Dict[str, ModelInfo] = {
+# Registry keys are accepted as `model_key` by your API. Aliases are listed
+# together and share one ModelInfo slot.
+_ENTRIES: Tuple[Tuple[Tuple[str, ...], ModelInfo], ...] = (
     # ---------------------------------------------------------------------
     # OpenAI
     # ---------------------------------------------------------------------
-    "gpt-4o": {
-        "provider": "openai",
-        "model": "gpt-4o",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    "gpt-4o-mini": {  # factory fallback candidate
-        "provider": "openai",
-        "model": "gpt-4o-mini",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    "gpt-4.1-mini": {
-        "provider": "openai",
-        "model": "gpt-4.1-mini",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    "gpt-3.5-turbo": {
-        "provider": "openai",
-        "model": "gpt-3.5-turbo",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
+    (("gpt-4o",), ModelInfo("openai", "gpt-4o", 4096, 0.7)),
+    (("gpt-4o-mini",), ModelInfo("openai", "gpt-4o-mini", 4096, 0.7)),  # factory fallback candidate
+    (("gpt-4.1-mini",), ModelInfo("openai", "gpt-4.1-mini", 4096, 0.7)),
+    (("gpt-3.5-turbo",), ModelInfo("openai", "gpt-3.5-turbo", 4096, 0.7)),
 
     # Optional GPT-5 family (only if your gateway/account supports them).
     # The factory may omit temperature for "reasoning" families.
-    "gpt-5": {
-        "provider": "openai",
-        "model": "gpt-5",
-        "max_tokens": 4096,
-    },
-    "gpt-5-mini": {  # factory fallback candidate
-        "provider": "openai",
-        "model": "gpt-5-mini",
-        "max_tokens": 4096,
-    },
-    "gpt-5-nano": {  # factory fallback candidate
-        "provider": "openai",
-        "model": "gpt-5-nano",
-        "max_tokens": 4096,
-    },
-    "gpt-5-chat": {
-        "provider": "openai",
-        "model": "gpt-5-chat-latest",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    "gpt-5-chat-latest": {
-        "provider": "openai",
-        "model": "gpt-5-chat-latest",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
+    (("gpt-5",), ModelInfo("openai", "gpt-5", 4096)),
+    (("gpt-5-mini",), ModelInfo("openai", "gpt-5-mini", 4096)),  # factory fallback candidate
+    (("gpt-5-nano",), ModelInfo("openai", "gpt-5-nano", 4096)),  # factory fallback candidate
+    (("gpt-5-chat", "gpt-5-chat-latest"), ModelInfo("openai", "gpt-5-chat-latest", 4096, 0.7)),
 
     # ---------------------------------------------------------------------
     # Anthropic (Claude)
     # ---------------------------------------------------------------------
-    "claude-3-5-sonnet": {
-        "provider": "anthropic",
-        "model": "claude-sonnet-4-20250514",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    # Factory fallback candidates (small/fast)
-    "claude-3-5-haiku-20241022": {
-        "provider": "anthropic",
-        "model": "claude-3-5-haiku-20241022",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    "claude-3-5-haiku-latest": {  # alias used by factory fallback
-        "provider": "anthropic",
-        "model": "claude-3-5-haiku-20241022",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    "claude-3-haiku-20240307": {
-        "provider": "anthropic",
-        "model": "claude-3-haiku-20240307",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    "claude-3-haiku": {  # alias used by factory fallback
-        "provider": "anthropic",
-        "model": "claude-3-haiku-20240307",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    # Alias (full id as key)
-    "claude-sonnet-4-20250514": {
-        "provider": "anthropic",
-        "model": "claude-sonnet-4-20250514",
-        "max_tokens": 4096,
-        "temperature": 0.7,
-    },
-    # Claude Opus 4 (premium quality)
-    "claude-sonnet-4.5": {  # ← NEW!
-        "provider": "anthropic",
-        "model": "claude-sonnet-4-5-20250929",  # ✅ Самая умная!
-        "max_tokens": 8192,  # Sonnet 4.5 поддерживает больше
-        "temperature": 0.7,
-    },
-    "claude-sonnet-4-5-20250929": {  # ← Alias
-        "provider": "anthropic",
-        "model": "claude-sonnet-4-5-20250929",
-        "max_tokens": 8192,
-        "temperature": 0.7,
-    },
+    # "claude-sonnet-4-20250514": alias (full id as key)
+    (("claude-3-5-sonnet", "claude-sonnet-4-20250514"),
+     ModelInfo("anthropic", "claude-sonnet-4-20250514", 4096, 0.7)),
+    # Factory fallback candidates (small/fast); "-latest" alias used by factory fallback
+    (("claude-3-5-haiku-20241022", "claude-3-5-haiku-latest"),
+     ModelInfo("anthropic", "claude-3-5-haiku-20241022", 4096, 0.7)),
+    (("claude-3-haiku-20240307", "claude-3-haiku"),
+     ModelInfo("anthropic", "claude-3-haiku-20240307", 4096, 0.7)),
+    # Claude Sonnet 4.5 (premium quality) — поддерживает больше токенов
+    (("claude-sonnet-4.5", "claude-sonnet-4-5-20250929"),
+     ModelInfo("anthropic", "claude-sonnet-4-5-20250929", 8192, 0.7)),
 
     # ---------------------------------------------------------------------
     # Z.ai GLM (Anthropic-API compatible)
     # ---------------------------------------------------------------------
-    "glm-5.2": {
-        "provider": "glm",
-        "model": "glm-5.2",
-        "max_tokens": 8192,
-        "temperature": 0.7,
-    },
-}
+    (("glm-5.2",), ModelInfo("glm", "glm-5.2", 8192, 0.7)),
+)
+
+_MODELS: Tuple[ModelInfo, ...] = tuple(info for _, info in _ENTRIES)
+_INDEX: Dict[str, int] = {key: i for i, (keys, _) in enumerate(_ENTRIES) for key in keys}
 
-# Force reload - change this comment to trigger module reload
-# Version: 2024-11-17-v2
+# Read-only key → ModelInfo view (membership tests, iteration, .get()).
+MODEL_REGISTRY: Mapping[str, ModelInfo] = MappingProxyType({k: _MODELS[i] for k, i in _INDEX.items()})
 
 
+def get_model(key: Optional[str]) -> Optional[ModelInfo]:
+    """Registry lookup by key; None for unknown/empty keys."""
+    i = _INDEX.get(key) if key else None
+    return None if i is None else _MODELS[i]
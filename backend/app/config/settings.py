@@ -3,34 +3,51 @@ from __future__ import annotations
 import os
 import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional, Tuple
 
 # ---------------------------- env helpers ----------------------------
 
+_ENV = os.environ
+
 def _getenv_int(name: str, default: int) -> int:
+    raw = _ENV.get(name)
+    if raw is None:
+        return default
     try:
-        return int(os.getenv(name, str(default)))
+        return int(raw)
     except Exception:
         return default
 
 def _getenv_float(name: str, default: float) -> float:
+    raw = _ENV.get(name)
+    if raw is None:
+        return default
     try:
-        return float(os.getenv(name, str(default)))
+        return float(raw)
     except Exception:
         return default
 
 def _getenv_bool(name: str, default: bool) -> bool:
-    val = os.getenv(name)
+    val = _ENV.get(name)
     if val is None:
         return default
     val = val.strip().lower()
     return val in {"1", "true", "t", "yes", "y", "on"}
 
 def _getenv_str(name: str, default: str) -> str:
-    return os.getenv(name, default)
+    return _ENV.get(name, default)
+
+def _first_env(*names: str) -> str:
+    """First non-empty value among names (chained fallbacks), else ''."""
+    for name in names:
+        val = _ENV.get(name)
+        if val:
+            return val
+    return ""
 
 def _getenv_int_opt(name: str) -> Optional[int]:
-    raw = os.getenv(name)
+    raw = _ENV.get(name)
     if raw is None:
         return None
     try:
@@ -40,7 +57,7 @@ def _getenv_int_opt(name: str) -> Optional[int]:
 
 def _getenv_user_project_map(name: str) -> dict[int, int]:
     """Parse 'tgId:projectId,tgId:projectId' into dict[int,int]."""
-    raw = os.getenv(name, "")
+    raw = _ENV.get(name, "")
     result: dict[int, int] = {}
     if not raw:
         return result
@@ -56,21 +73,24 @@ def _getenv_user_project_map(name: str) -> dict[int, int]:
     return result
 
 def _getenv_csv(name: str) -> tuple[str, ...]:
-    raw = os.getenv(name, "")
+    raw = _ENV.get(name, "")
     if not raw:
         return tuple()
     return tuple([tok.strip() for tok in raw.split(",") if tok.strip()])
 
+_SANITIZE_RE = re.compile(r"[^A-Za-z0-9]+")
+
+@lru_cache(maxsize=128)
 def _sanitize_model_key(s: str) -> str:
     """
     Convert a model string into an ENV-safe key segment.
     e.g. 'gpt-4o-mini' -> 'GPT_4O_MINI'
     """
-    return re.sub(r"[^A-Za-z0-9]+", "_", (s or "").strip()).upper()
+    return _SANITIZE_RE.sub("_", (s or "").strip()).upper()
 
 # ------------------------------ settings -----------------------------
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class _Settings:
     """
     Centralized runtime configuration.
@@ -90,6 +110,8 @@ class _Settings:
     SUMMARIZE_TRIGGER_TOKENS: int = _getenv_int("SUMMARIZE_TRIGGER_TOKENS", 2000)
     HISTORY_MAX_TOKENS: int = _getenv_int("HISTORY_MAX_TOKENS", 1800)
     HISTORY_FETCH_LIMIT: int = _getenv_int("HISTORY_FETCH_LIMIT", 200)
+    # retrieve_messages (AI context): raw_text chars fetched per row (0 = full)
+    MSG_RETURN_CAP: int = _getenv_int("MSG_RETURN_CAP", 4000)
 
     # Token cap for injecting memory summaries into the prompt (prompt builder)
     MEMORY_SUMMARY_BUDGET_TOKENS: int = _getenv_int("MEMORY_SUMMARY_BUDGET_TOKENS", 600)
@@ -103,10 +125,16 @@ class _Settings:
     SOFT_TOKEN_BUDGET: int = _getenv_int("SOFT_TOKEN_BUDGET", 6000)
     HARD_TOKEN_BUDGET: int = _getenv_int("HARD_TOKEN_BUDGET", 7800)
 
+    # Unicode form applied by safe_text(): NFC keeps ligatures/compatibility
+    # characters as typed; NFKC folds them (e.g. for Hindi/Arabic canon terms)
+    UNICODE_NORM_FORM: str = _getenv_str("UNICODE_NORM_FORM", "NFC")
+
     # === Canonical Memory ===
     ENABLE_CANON: bool = _getenv_bool("ENABLE_CANON", False)
     CANON_TOPK: int = _getenv_int("CANON_TOPK", 6)
     CANON_EXTRACT_MODEL: str = _getenv_str("CANON_EXTRACT_MODEL", "gpt-4o-mini")
+    # Parsed extract_canon_deltas results keyed by content hash (0 disables)
+    CANON_EXTRACT_CACHE_TTL: int = _getenv_int("CANON_EXTRACT_CACHE_TTL", 3600)
 
     # === Rendering modes / behavior flags ===
     ENABLE_CODE_DOC_AUTOMODE: bool = _getenv_bool("ENABLE_CODE_DOC_AUTOMODE", True)
@@ -124,18 +152,33 @@ class _Settings:
     # === Web search (Wikipedia-backed) ===
     WEB_SEARCH_MAX_RESULTS: int = _getenv_int("WEB_SEARCH_MAX_RESULTS", 3)
 
+    # === Semantic response cache (/ask, /ask-ai-to-ai simple mode) ===
+    ENABLE_SEMANTIC_CACHE: bool = _getenv_bool("ENABLE_SEMANTIC_CACHE", True)
+    # Cosine threshold for text-embedding-3-small question embeddings
+    SEMANTIC_CACHE_TAU: float = _getenv_float("SEMANTIC_CACHE_TAU", 0.92)
+    SEMANTIC_CACHE_TTL: int = _getenv_int("SEMANTIC_CACHE_TTL", 3600)
+    # Skip the cache once the chat session holds more than this many entries:
+    # a follow-up's answer depends on the conversation, not just the question
+    SEMANTIC_CACHE_MAX_HISTORY: int = _getenv_int("SEMANTIC_CACHE_MAX_HISTORY", 0)
+
+    # === Exact-match completion cache (temperature == 0 calls only) ===
+    ENABLE_EXACT_CACHE: bool = _getenv_bool("ENABLE_EXACT_CACHE", True)
+    EXACT_CACHE_TTL: int = _getenv_int("EXACT_CACHE_TTL", 3600)
+    EXACT_CACHE_MAX_ENTRIES: int = _getenv_int("EXACT_CACHE_MAX_ENTRIES", 2048)
+
     # === Observability toggles ===
     ENABLE_PAYLOAD_PREVIEW_LOG: bool = _getenv_bool("ENABLE_PAYLOAD_PREVIEW_LOG", True)
     LOG_TOKEN_COUNTS: bool = _getenv_bool("LOG_TOKEN_COUNTS", True)
 
+    # === Worker threads for blocking off-loads (per uvicorn worker process) ===
+    THREAD_POOL_SIZE: int = _getenv_int("THREAD_POOL_SIZE", 128)
+
     # === Database ===
     DATABASE_URL: Optional[str] = _getenv_str("DATABASE_URL", "")
     
     # === API Keys (resolved here for convenience) ===
-    OPENAI_API_KEY: Optional[str] = (
-        _getenv_str("OPENAI_API_KEY", "") or _getenv_str("CHATITNOW_API_KEY", "") or _getenv_str("OPEN_API_KEY", "")
-    )
-    ANTHROPIC_API_KEY: Optional[str] = _getenv_str("ANTHROPIC_API_KEY", "") or _getenv_str("CLAUDE_API_KEY", "")
+    OPENAI_API_KEY: Optional[str] = _first_env("OPENAI_API_KEY", "CHATITNOW_API_KEY", "OPEN_API_KEY")
+    ANTHROPIC_API_KEY: Optional[str] = _first_env("ANTHROPIC_API_KEY", "CLAUDE_API_KEY")
     YOUTUBE_API_KEY: Optional[str] = _getenv_str("YOUTUBE_API_KEY", "")
     
     # === Authentication & Security ===
@@ -226,6 +269,47 @@ settings = _Settings()
 
 # ------------------------- thresholds helper --------------------------
 
+# Per-model / per-provider overrides, scanned from os.environ once (the env is
+# frozen at process start, like _Settings). Values are (soft, hard); None = unset.
+_TOKEN_LIMIT_ENV_RE = re.compile(r"^(MODEL_)?(.+?)_(SOFT|HARD)_TOKEN_LIMIT$")
+
+_MODEL_OVERRIDES: dict[str, tuple[Optional[int], Optional[int]]] = {}
+_PROVIDER_OVERRIDES: dict[str, tuple[Optional[int], Optional[int]]] = {}
+
+
+def _scan_token_overrides() -> None:
+    """(Re)build the override tables from os.environ."""
+    prefixed: dict[str, list[Optional[int]]] = {}
+    bare: dict[str, list[Optional[int]]] = {}
+    for name, raw in _ENV.items():
+        m = _TOKEN_LIMIT_ENV_RE.match(name)
+        if not m:
+            continue
+        try:
+            value = int(raw)
+        except Exception:
+            continue
+        table = prefixed if m.group(1) else bare
+        table.setdefault(m.group(2), [None, None])[0 if m.group(3) == "SOFT" else 1] = value
+
+    _PROVIDER_OVERRIDES.clear()
+    _PROVIDER_OVERRIDES.update({k: (v[0], v[1]) for k, v in bare.items()})
+
+    # MODEL_<KEY>_* wins over <KEY>_*, field by field
+    _MODEL_OVERRIDES.clear()
+    for key in prefixed.keys() | bare.keys():
+        p = prefixed.get(key, (None, None))
+        b = bare.get(key, (None, None))
+        _MODEL_OVERRIDES[key] = (
+            p[0] if p[0] is not None else b[0],
+            p[1] if p[1] is not None else b[1],
+        )
+
+
+_scan_token_overrides()
+
+
+@lru_cache(maxsize=256)
 def get_thresholds(model: Optional[str] = None, provider: Optional[str] = None) -> Tuple[int, int]:
     """
     Returns (soft_limit, hard_limit) with override precedence:
@@ -238,33 +322,22 @@ def get_thresholds(model: Optional[str] = None, provider: Optional[str] = None)
       3) Global defaults:
          - settings.SOFT_TOKEN_LIMIT / settings.HARD_TOKEN_LIMIT
     Ensures soft <= hard by clamping if misconfigured.
+    Memoized per (model, provider); overrides come from the import-time env
+    scan — call reload_thresholds() after changing the env
+    (see /api/admin/reload-config).
     """
     soft = settings.SOFT_TOKEN_LIMIT
     hard = settings.HARD_TOKEN_LIMIT
 
-    # Provider-level override (OPENAI_*, ANTHROPIC_*, etc.)
-    if provider:
-        prov = (provider or "").strip().upper()
-        soft_prov = _getenv_int_opt(f"{prov}_SOFT_TOKEN_LIMIT")
-        hard_prov = _getenv_int_opt(f"{prov}_HARD_TOKEN_LIMIT")
-        if soft_prov is not None:
-            soft = soft_prov
-        if hard_prov is not None:
-            hard = hard_prov
-
-    # Model-level override (MODEL_<KEY>_* preferred; <KEY>_* also supported)
-    if model:
-        key = _sanitize_model_key(model)
-        soft_model = _getenv_int_opt(f"MODEL_{key}_SOFT_TOKEN_LIMIT")
-        hard_model = _getenv_int_opt(f"MODEL_{key}_HARD_TOKEN_LIMIT")
-        if soft_model is None:
-            soft_model = _getenv_int_opt(f"{key}_SOFT_TOKEN_LIMIT")
-        if hard_model is None:
-            hard_model = _getenv_int_opt(f"{key}_HARD_TOKEN_LIMIT")
-        if soft_model is not None:
-            soft = soft_model
-        if hard_model is not None:
-            hard = hard_model
+    # Provider-level override (OPENAI_*, ANTHROPIC_*, etc.), then model-level
+    for soft_o, hard_o in (
+        _PROVIDER_OVERRIDES.get(provider.strip().upper(), (None, None)) if provider else (None, None),
+        _MODEL_OVERRIDES.get(_sanitize_model_key(model), (None, None)) if model else (None, None),
+    ):
+        if soft_o is not None:
+            soft = soft_o
+        if hard_o is not None:
+            hard = hard_o
 
     # Safety: maintain invariant soft <= hard
     if soft > hard:
@@ -272,4 +345,10 @@ def get_thresholds(model: Optional[str] = None, provider: Optional[str] = None)
 
     return soft, hard
 
-__all__ = ["settings", "_Settings", "get_thresholds"]
+
+def reload_thresholds() -> None:
+    """Re-scan token-limit overrides from os.environ and drop memoized results."""
+    _scan_token_overrides()
+    get_thresholds.cache_clear()
+
+__all__ = ["settings", "_Settings", "get_thresholds", "reload_thresholds"]
@@ -1,30 +1,101 @@
 """Dependencies for FastAPI endpoints"""
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from fastapi import BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy.orm import Session, load_only
+from datetime import datetime, timedelta
+import hashlib
 import logging
+import threading
+import time
 
-from app.memory.db import SessionLocal
+# get_db is re-exported: routers import it from here, and sharing the one
+# dependency lets FastAPI reuse a single session per request
+from app.memory.db import SessionLocal, get_db
+from app.memory.manager import MemoryManager
 from app.memory.models import User
 from app.utils.security import verify_token
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-def get_db() -> Generator[Session, None, None]:
-    """FastAPI dependency – открыть сессию и закрыть после запроса."""
+# OAuth2 scheme for JWT token
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+
+# Columns needed by get_current_user / get_current_active_user / get_superuser
+_AUTH_USER_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.password_hash,
+    User.is_active,
+    User.is_superuser,
+    User.status,
+    User.trial_ends_at,
+    User.subscription_ends_at,
+)
+
+# last_login is written at most once per interval per user (in-process guard)
+_LAST_LOGIN_INTERVAL = timedelta(minutes=5)
+_LAST_LOGIN_CACHE: Dict[int, datetime] = {}
+_LAST_LOGIN_LOCK = threading.Lock()
+
+
+def _should_touch_last_login(user_id: int, now: datetime) -> bool:
+    with _LAST_LOGIN_LOCK:
+        prev = _LAST_LOGIN_CACHE.get(user_id)
+        if prev is not None and now - prev < _LAST_LOGIN_INTERVAL:
+            return False
+        _LAST_LOGIN_CACHE[user_id] = now
+        return True
+
+
+# Verified JWT payloads keyed by token hash; valid until the token's own exp
+_TOKEN_CACHE_MAX = 4096
+_TOKEN_CACHE: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+def _verify_token_cached(token: str) -> Optional[dict]:
+    """verify_token() with a bounded LRU so repeat calls skip the signature check."""
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    now = time.time()
+    with _TOKEN_CACHE_LOCK:
+        hit = _TOKEN_CACHE.get(key)
+        if hit is not None:
+            if now < hit[1]:
+                _TOKEN_CACHE.move_to_end(key)
+                return hit[0]
+            del _TOKEN_CACHE[key]
+
+    payload = verify_token(token)
+    exp = payload.get("exp") if payload else None
+    if isinstance(exp, (int, float)) and now < exp:
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[key] = (payload, float(exp))
+            _TOKEN_CACHE.move_to_end(key)
+            while len(_TOKEN_CACHE) > _TOKEN_CACHE_MAX:
+                _TOKEN_CACHE.popitem(last=False)
+    return payload
+
+
+def _flush_last_login(user_id: int, when: datetime) -> None:
+    """Background task: persist last_login in its own short-lived session."""
     db = SessionLocal()
     try:
-        yield db
+        db.query(User).filter(User.id == user_id).update(
+            {User.last_login: when}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("⚠️ last_login update failed for user %s: %s", user_id, e)
     finally:
         db.close()
 
-# OAuth2 scheme for JWT token
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-
 async def get_current_user(
+    background_tasks: BackgroundTasks,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
@@ -38,12 +109,16 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    debug = logger.isEnabledFor(logging.DEBUG)
+
     # DEBUG: Log token
-    logger.info(f"🔍 Token received: {token[:30]}...")
+    if debug:
+        logger.debug("🔍 Token received: %s...", token[:30])
     
-    # Verify token
-    payload = verify_token(token)
-    logger.info(f"🔍 Payload: {payload}")
+    # Verify token (cached until exp)
+    payload = _verify_token_cached(token)
+    if debug:
+        logger.debug("🔍 Payload: %s", payload)
     
     if payload is None:
         logger.error("❌ Payload is None - token verification failed")
@@ -51,7 +126,8 @@ async def get_current_user(
     
     # Get user_id from payload (might be int or str)
     user_id = payload.get("sub")
-    logger.info(f"🔍 user_id from payload: {user_id} (type: {type(user_id).__name__})")
+    if debug:
+        logger.debug("🔍 user_id from payload: %s (type: %s)", user_id, type(user_id).__name__)
     
     if user_id is None:
         logger.error("❌ user_id is None in payload")
@@ -60,22 +136,29 @@ async def get_current_user(
     # Convert to int if needed
     try:
         user_id = int(user_id)
-        logger.info(f"✅ user_id converted to int: {user_id}")
     except (ValueError, TypeError) as e:
-        logger.error(f"❌ Failed to convert user_id to int: {e}")
+        logger.error("❌ Failed to convert user_id to int: %s", e)
         raise credentials_exception
     
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    # Get user from database (only the columns the auth/status checks read;
+    # anything else lazy-loads on first access)
+    user = (
+        db.query(User)
+        .options(load_only(*_AUTH_USER_COLUMNS))
+        .filter(User.id == user_id)
+        .first()
+    )
     if user is None:
-        logger.error(f"❌ User not found with id: {user_id}")
+        logger.error("❌ User not found with id: %s", user_id)
         raise credentials_exception
     
-    logger.info(f"✅ User authenticated: {user.username} (id={user.id})")
+    if debug:
+        logger.debug("✅ User authenticated: %s (id=%s)", user.username, user.id)
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login (debounced, written after the response is sent)
+    now = datetime.utcnow()
+    if _should_touch_last_login(user.id, now):
+        background_tasks.add_task(_flush_last_login, user.id, now)
     
     return user
 
@@ -137,4 +220,9 @@ async def get_superuser(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Superuser privileges required"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def get_memory(db: Session = Depends(get_db)) -> MemoryManager:
+    """Request-scoped MemoryManager on the request's session (one per request)"""
+    return MemoryManager(db)
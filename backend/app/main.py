@@ -1,29 +1,83 @@
 from __future__ import annotations
 import re
 from app.mcp_server import mcp   # ← MCP instance with all tools
-from app.memory.db import init_db, DATABASE_URL, mask_db_url
-
+from app.memory.db import engine, init_db, DATABASE_URL, mask_db_url
+from app.utils.memory_writer import start_memory_writer, stop_memory_writer
+from app.utils.audit_writer import start_audit_writer, stop_audit_writer
+
+import asyncio
+import concurrent.futures
+import dataclasses
+import importlib
 import logging
 import os
-import traceback
 from contextlib import AsyncExitStack, asynccontextmanager
 from typing import Any, Dict
 
-from dotenv import load_dotenv
+import anyio.to_thread
+import orjson
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 # ───────────────────── .env & logging ─────────────────────
-load_dotenv()
+# Production containers get their env from the orchestrator; only read .env
+# (and import python-dotenv) for local/dev/test runs. APP_ENV defaults to dev.
+# app.memory.db (imported above) already loads it and sets _DOTENV_LOADED.
+if os.getenv("APP_ENV", "dev").strip().lower() in {"dev", "local", "test"} and not os.getenv("_DOTENV_LOADED"):
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("app")
 
 # DB init + MCP import
 
 
+# ───────────────────── One-shot migrations ─────────────────
+def _apply_migration_once(name: str, sql: str) -> None:
+    """
+    Run a PostgreSQL-only DDL statement once, recorded in schema_migrations.
+    Uses the shared engine from app.memory.db; a no-op once the marker exists.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    from sqlalchemy import text
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "name VARCHAR(100) PRIMARY KEY, "
+                "applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+            ))
+            done = conn.execute(
+                text("SELECT 1 FROM schema_migrations WHERE name = :name"),
+                {"name": name},
+            ).first()
+            if done:
+                return
+            conn.execute(text(sql))
+            conn.execute(
+                text("INSERT INTO schema_migrations (name) VALUES (:name)"),
+                {"name": name},
+            )
+        logger.info(f"✅ Migration applied: {name}")
+    except Exception as e:
+        logger.info(f"ℹ️ Migration {name} skipped: {e}")
+
+
+# ──────────────────── JSON response class ─────────────────
+class _JSONResponse(ORJSONResponse):
+    """orjson-backed default response; also accepts non-str dict keys like stdlib json."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
 # ──────────────────── App lifespan hook ───────────────────
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -31,34 +85,93 @@ async def lifespan(app: FastAPI):
         # Start MCP Streamable HTTP session manager (required for mcp==1.26.0)
         await stack.enter_async_context(mcp.session_manager.run())
 
+        _include_routers(app)
+        _configure_thread_pools()
+
         logger.info(f"Initializing database… URL={mask_db_url(DATABASE_URL)}")
         init_db()
 
         # 🔧 One-time migration: roles.description VARCHAR(255) -> TEXT
-        try:
-            from sqlalchemy import create_engine, text
-            engine = create_engine(DATABASE_URL)
-            with engine.connect() as conn:
-                conn.execute(
-                    text("ALTER TABLE roles ALTER COLUMN description TYPE TEXT;"))
-                conn.commit()
-                logger.info("✅ Migration: roles.description -> TEXT")
-        except Exception as e:
-            logger.info(
-                f"ℹ️ Migration skipped (already done or not needed): {e}")
+        _apply_migration_once(
+            "roles_desc_text",
+            "ALTER TABLE roles ALTER COLUMN description TYPE TEXT;",
+        )
 
+        # 🔧 One-time migration: DB-side UTC default for memory_entries.timestamp
+        _apply_migration_once(
+            "memory_timestamp_server_default",
+            "ALTER TABLE memory_entries ALTER COLUMN timestamp SET DEFAULT (clock_timestamp() AT TIME ZONE 'utc');",
+        )
+
+        # 🔧 One-time migration: full-text search over canon items
+        # (generated tsvector + GIN; search_canon_items queries it on Postgres)
+        _apply_migration_once(
+            "canon_items_search_tsv",
+            "ALTER TABLE canon_items ADD COLUMN IF NOT EXISTS search_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(title, '') || ' ' || "
+            "coalesce(body, '') || ' ' || coalesce(terms, ''))) STORED;",
+        )
+        _apply_migration_once(
+            "canon_items_search_tsv_gin",
+            "CREATE INDEX IF NOT EXISTS ix_canon_items_search_tsv ON canon_items USING gin (search_tsv);",
+        )
+
+        # Superuser + seed data run in the background: neither is needed to
+        # serve the first request, so the server starts accepting connections
+        # right away. Await app.state.bootstrap_done where it strictly matters.
+        app.state.bootstrap_done = asyncio.Event()
+        app.state.bootstrap_task = asyncio.create_task(_bootstrap_async(app))
+
+        # Long-term memory summaries and audit rows are written by background consumers
+        start_memory_writer()
+        start_audit_writer()
+
+        yield
+
+        if not app.state.bootstrap_task.done():
+            app.state.bootstrap_task.cancel()
+        await stop_memory_writer()
+        await stop_audit_writer()
+
+
+def _configure_thread_pools() -> None:
+    """
+    Size the pools used for blocking off-loads (DB, memory writes, sync SDKs).
+    asyncio.to_thread uses the loop's default executor; Starlette's
+    run_in_threadpool and sync endpoints use anyio's limiter. Both default to
+    ~40 threads, too few when each holds a multi-second call. The size applies
+    per uvicorn worker process.
+    """
+    size = max(1, settings.THREAD_POOL_SIZE)
+    asyncio.get_running_loop().set_default_executor(
+        concurrent.futures.ThreadPoolExecutor(max_workers=size, thread_name_prefix="llm-io")
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
+    logger.info(f"Thread pools sized to {size} (default executor + anyio limiter)")
+
+
+async def _bootstrap_async(app: FastAPI) -> None:
+    """Create the configured superuser, seed default data, warm the tokenizer (post-startup)."""
+    try:
         # Create superuser on startup if configured
         await create_superuser()
 
         # 🌱 Seed database with default data
         try:
             from app.seed import run_seed
-            run_seed()
+            await asyncio.to_thread(run_seed)
         except Exception as e:
-            logger.error(f"❌ Failed to seed database: {e}")
-            traceback.print_exc()
+            logger.exception(f"❌ Failed to seed database: {e}")
 
-        yield
+        # Load the shared tiktoken encoding now rather than on the first
+        # request that counts tokens (BPE parse, or download without a cache)
+        from app.utils.tokenizer import get_encoding
+        if await asyncio.to_thread(get_encoding) is None:
+            logger.warning("⚠️ tiktoken encoding unavailable — using length-based token estimates")
+
+        logger.info("✅ Startup bootstrap complete (superuser + seed + tokenizer)")
+    finally:
+        app.state.bootstrap_done.set()
 
 
 # ────────────────────── FastAPI app ───────────────────────
@@ -71,41 +184,49 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan,
     redirect_slashes=False,
+    default_response_class=_JSONResponse,
 )
 
 # ──────────────────── CORS configuration ──────────────────
 # Allow multiple origins via env: CORS_ORIGINS="http://localhost:3000,https://example.com"
-raw_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").strip()
-allow_origins = [o.strip() for o in raw_origins.split(",") if o.strip()]
-
-# Build regex pattern from allowed origins
-escaped_origins = []
-for origin in allow_origins:
-    if origin == "*":
-        escaped_origins.append(".*")
-    elif origin == "vscode-webview://*":
-        escaped_origins.append(r"vscode-webview://[a-z0-9]+")
-    else:
-        escaped = re.escape(origin).replace(
-            r"\*", ".*").replace(r":\d+", r":\d+")
-        escaped_origins.append(escaped)
-
-origin_pattern = "^(" + "|".join(escaped_origins) + ")$"
-logger.info(f"CORS allow_origin_regex: {origin_pattern}")
+_RAW_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000").strip()
+_ALLOW_ORIGINS = (
+    ["*"] if _RAW_ORIGINS == "*"
+    else [o.strip() for o in _RAW_ORIGINS.split(",") if o.strip()]
+)
+
+
+def _origin_regex(origin: str) -> str:
+    if origin == "vscode-webview://*":
+        return r"vscode-webview://[a-z0-9]+"
+    return re.escape(origin).replace(r"\*", ".*")
+
+
+# Build one regex from the allowed origins ("*" anywhere → allow everything)
+_ORIGIN_PATTERN = (
+    "^(.*)$" if "*" in _ALLOW_ORIGINS
+    else "^(" + "|".join(_origin_regex(o) for o in _ALLOW_ORIGINS) + ")$"
+)
+logger.info(f"CORS allow_origin_regex: {_ORIGIN_PATTERN}")
+
+# Browsers cache preflight results for max_age seconds (Starlette default: 600),
+# so credentialed cross-origin calls don't pay an OPTIONS round-trip each time.
+_CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", "86400"))
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origin_regex=origin_pattern,
+    allow_origin_regex=_ORIGIN_PATTERN,
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    max_age=_CORS_MAX_AGE,
 )
 
 
 # ─────────────── Global JSON error handlers ───────────────
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
-    return JSONResponse(
+    return _JSONResponse(
         status_code=exc.status_code,
         content={
             "detail": exc.detail if isinstance(exc.detail, str) else "HTTP error",
@@ -114,38 +235,26 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     )
 
 
+_PRIMS = (str, int, float, bool, type(None))
+
+
+def _safe(val: Any) -> Any:
+    return val if isinstance(val, _PRIMS) else str(val)
+
+
 def _sanitize_pydantic_errors(errors: Any) -> list[Dict[str, Any]]:
-    out: list[dict] = []
     if not isinstance(errors, list):
-        return out
-
+        return []
+    out: list[dict] = []
     for e in errors:
         if not isinstance(e, dict):
             continue
-        item: Dict[str, Any] = {
-            "loc": e.get("loc"),
-            "msg": e.get("msg"),
-            "type": e.get("type"),
-        }
+        item: Dict[str, Any] = {"loc": e.get("loc"), "msg": e.get("msg"), "type": e.get("type")}
         if "input" in e:
-            try:
-                val = e.get("input")
-                item["input"] = val if isinstance(
-                    val, (str, int, float, bool, type(None))) else str(val)
-            except Exception:
-                item["input"] = None
-
+            item["input"] = _safe(e["input"])
         ctx = e.get("ctx")
-        if isinstance(ctx, dict):
-            safe_ctx: Dict[str, Any] = {}
-            for k, v in ctx.items():
-                if isinstance(v, (str, int, float, bool, type(None))):
-                    safe_ctx[k] = v
-                else:
-                    safe_ctx[k] = str(v)
-            if safe_ctx:
-                item["ctx"] = safe_ctx
-
+        if isinstance(ctx, dict) and ctx:
+            item["ctx"] = {k: _safe(v) for k, v in ctx.items()}
         out.append(item)
     return out
 
@@ -153,7 +262,7 @@ def _sanitize_pydantic_errors(errors: Any) -> list[Dict[str, Any]]:
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     errors = _sanitize_pydantic_errors(exc.errors())
-    return JSONResponse(
+    return _JSONResponse(
         status_code=422,
         content={
             "detail": "Validation error",
@@ -167,8 +276,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 async def unhandled_exception_handler(request: Request, exc: Exception):
     logger.exception("Unhandled exception at %s %s",
                      request.method, request.url.path)
-    traceback.print_exc()
-    return JSONResponse(
+    return _JSONResponse(
         status_code=500,
         content={
             "detail": f"Internal server error: {type(exc).__name__}",
@@ -178,114 +286,63 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
 
 
 # ─────────────────────── Routers ──────────────────────────
-# Keep imports after app creation to avoid circulars during startup
-from app.routers import (  # noqa: E402
-    ask,
-    ask_ai_to_ai,
-    ask_ai_to_ai_turn,
-    youtube,
-    chat,
-    projects,
-    audit,
-    roles,
-    balance,
-    debate,
-    init,
-    auth,
-    api_keys,
-    admin,
-    project_builder,
-    vscode,
-    file_indexer,
-    agentic,
-    versions,
-    auto_learning,
-    webhooks,
-    prediction,
-    pattern_analyzer,
-    memory,
-    usage_analytics,
-    studio,
+# (module under app.routers, required). Imported and mounted under /api from
+# lifespan, so importing app.main does not pull in every router's SDK/DB
+# dependencies. Order matters for overlapping paths — keep it stable.
+_ROUTERS: tuple[tuple[str, bool], ...] = (
+    ("init", True),
+    ("auth", True),
+    ("api_keys", True),
+    ("admin", True),
+    ("ask", True),
+    ("ask_ai_to_ai", True),
+    ("ask_ai_to_ai_turn", True),
+    ("youtube", True),
+    ("upload_file", False),
+    ("prompt_template", False),
+    ("chat", True),
+    ("projects", True),
+    ("audit", True),
+    ("roles", True),
+    ("balance", True),
+    ("debate", True),
+    ("project_builder", True),
+    ("vscode", True),
+    ("file_indexer", True),
+    ("agentic", True),
+    ("versions", True),
+    ("auto_learning", True),
+    ("webhooks", True),
+    ("prediction", True),
+    ("pattern_analyzer", True),
+    ("memory", True),
+    ("usage_analytics", True),
+    ("studio", True),
+    # Media processing
+    ("mux_audio", True),
+    ("transform_image", False),
+    ("telegram", False),
+    ("app_api", False),   # → /api/app
+    ("lessons", False),   # → /api/app/lessons
 )
 
-# Optional routers
-try:
-    from app.routers.upload_file import router as upload_router  # type: ignore
-    logger.info("Loaded optional router: upload_file")
-except Exception as e:
-    upload_router = None
-    logger.info(f"Optional router 'upload_file' not available: {e}")
-
-try:
-    from app.routers.prompt_template import router as prompt_template_router  # type: ignore
-    logger.info("Loaded optional router: prompt_template")
-except Exception as e:
-    prompt_template_router = None
-    logger.info(f"Optional router 'prompt_template' not available: {e}")
-
-# Include all routers under /api
-app.include_router(init.router, prefix="/api")
-app.include_router(auth.router, prefix="/api")
-app.include_router(api_keys.router, prefix="/api")
-app.include_router(admin.router, prefix="/api")
-app.include_router(ask.router, prefix="/api")
-app.include_router(ask_ai_to_ai.router, prefix="/api")
-app.include_router(ask_ai_to_ai_turn.router, prefix="/api")
-app.include_router(youtube.router, prefix="/api")
-if upload_router:
-    app.include_router(upload_router, prefix="/api")
-if prompt_template_router:
-    app.include_router(prompt_template_router, prefix="/api")
-app.include_router(chat.router, prefix="/api")
-app.include_router(projects.router, prefix="/api")
-app.include_router(audit.router, prefix="/api")
-app.include_router(roles.router, prefix="/api")
-app.include_router(balance.router, prefix="/api")
-app.include_router(debate.router, prefix="/api")
-app.include_router(project_builder.router, prefix="/api")
-app.include_router(vscode.router, prefix="/api")
-app.include_router(file_indexer.router, prefix="/api")
-app.include_router(agentic.router, prefix="/api")
-app.include_router(versions.router, prefix="/api")
-app.include_router(auto_learning.router, prefix="/api")
-app.include_router(webhooks.router, prefix="/api")
-app.include_router(prediction.router, prefix="/api")
-app.include_router(pattern_analyzer.router, prefix="/api")
-app.include_router(memory.router, prefix="/api")
-app.include_router(usage_analytics.router, prefix="/api")
-app.include_router(studio.router, prefix="/api")
-
-# Media processing
-from app.routers.mux_audio import router as mux_audio_router  # noqa: E402
-app.include_router(mux_audio_router, prefix="/api")
-
-try:
-    from app.routers.transform_image import router as transform_image_router  # type: ignore
-    app.include_router(transform_image_router, prefix="/api")
-    logger.info("Loaded optional router: transform_image")
-except Exception as e:
-    logger.error(f"Failed to load transform_image router: {e}")
-
-try:
-    from app.routers.telegram import router as telegram_router  # type: ignore
-    app.include_router(telegram_router, prefix="/api")
-    logger.info("Loaded optional router: telegram")
-except Exception as e:
-    logger.error(f"Failed to load telegram router: {e}")
-
-try:
-    from app.routers.app_api import router as app_api_router  # type: ignore
-    app.include_router(app_api_router, prefix="/api")
-    logger.info("Loaded router: app_api → /api/app")
-except Exception as e:
-    logger.error(f"Failed to load app_api router: {e}")
-
-try:
-    from app.routers.lessons import router as lessons_router  # type: ignore
-    app.include_router(lessons_router, prefix="/api")
-    logger.info("Loaded router: lessons → /api/app/lessons")
-except Exception as e:
-    logger.error(f"Failed to load lessons router: {e}")
+
+def _include_routers(app: FastAPI) -> None:
+    """Import router modules and mount them under /api (idempotent)."""
+    if getattr(app.state, "routers_loaded", False):
+        return
+    for name, required in _ROUTERS:
+        try:
+            mod = importlib.import_module(f"app.routers.{name}")
+        except Exception as e:
+            if required:
+                raise
+            logger.error(f"Failed to load optional router '{name}': {e}")
+            continue
+        app.include_router(mod.router, prefix="/api")
+        logger.info(f"Loaded router: {name}")
+    app.state.routers_loaded = True
+
 
 # ─────────────────────── MCP server ──────────────────────────────
 # This is the most reliable pattern for mcp==1.26.0
@@ -297,17 +354,23 @@ from app.config.settings import settings  # noqa: E402
 from app.config.model_registry import MODEL_REGISTRY  # noqa: E402
 
 
+# Reverse index: provider model id → first registry key using it
+# (built in reverse so the first alias wins, matching the old linear scan)
+_MODEL_NAME_TO_KEY: Dict[str, str] = {
+    v.model: k for k, v in reversed(MODEL_REGISTRY.items())
+}
+
+
 def _resolve_key_for_model_name(name: str | None) -> str | None:
-    if not name:
-        return None
-    for k, v in MODEL_REGISTRY.items():
-        if v.get("model") == name:
-            return k
-    return None
+    return _MODEL_NAME_TO_KEY.get(name) if name else None
 
 
-@app.get("/api/config")
-def read_config():
+def _registry_entry_dict(key: str | None) -> Dict[str, Any] | None:
+    info = MODEL_REGISTRY.get(key) if key else None
+    return dataclasses.asdict(info) if info is not None else None
+
+
+def _build_config() -> Dict[str, Any]:
     return {
         "env": {
             "OPENAI_API_KEY_present": bool(os.getenv("OPENAI_API_KEY")),
@@ -316,11 +379,11 @@ def read_config():
             "BACKEND_URL": os.getenv("BACKEND_URL"),
         },
         "cors": {
-            "allow_origins": allow_origins,
+            "allow_origins": _ALLOW_ORIGINS,
         },
         "models": {
             "default_registry_key": settings.DEFAULT_MODEL,
-            "default_registry_entry": MODEL_REGISTRY.get(settings.DEFAULT_MODEL),
+            "default_registry_entry": _registry_entry_dict(settings.DEFAULT_MODEL),
 
             "openai_default_model_name": settings.OPENAI_DEFAULT_MODEL,
             "openai_default_registry_key": _resolve_key_for_model_name(settings.OPENAI_DEFAULT_MODEL),
@@ -345,6 +408,17 @@ def read_config():
     }
 
 
+@app.get("/api/config")
+def read_config(request: Request):
+    # Config is fixed for the process lifetime: serialize once, then serve the
+    # cached bytes. /api/admin/reload-config drops the cache.
+    cached = getattr(request.app.state, "config_bytes", None)
+    if cached is None:
+        cached = orjson.dumps(_build_config())
+        request.app.state.config_bytes = cached
+    return Response(content=cached, media_type="application/json")
+
+
 @app.get("/api/config/models")
 def list_models():
     return {"keys": sorted(MODEL_REGISTRY.keys())}
@@ -24,22 +24,24 @@ def mask_db_url(url: str) -> str:
     return re.sub(r"(://[^:/@]+:)[^@]+@", r"\1***@", url)
 
 # ──────────────────────── .env resolution ───────────────────────
-# Try project .env first; fall back to current working dir
+# Try project .env first; fall back to current working dir. Parsed once per
+# process tree: _DOTENV_LOADED is inherited by forked/spawned workers.
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 ENV_CANDIDATES = [
     os.path.join(PROJECT_ROOT, ".env"),
     os.environ.get("ENV_FILE", ""),  # allow override
 ]
 
-for candidate in ENV_CANDIDATES:
-    if candidate and os.path.exists(candidate):
-        load_dotenv(dotenv_path=candidate)
-        logger.info(f"Loaded .env from: {candidate}")
-        break
-else:
-    # As a last resort, load default .env if present in CWD
-    load_dotenv()
-    logger.info("Loaded .env from current working directory (if present).")
+if not os.getenv("_DOTENV_LOADED"):
+    _env_file = next((c for c in ENV_CANDIDATES if c and os.path.exists(c)), None)
+    if _env_file:
+        load_dotenv(dotenv_path=_env_file)
+        logger.info(f"Loaded .env from: {_env_file}")
+    else:
+        # As a last resort, load default .env if present in CWD
+        load_dotenv()
+        logger.info("Loaded .env from current working directory (if present).")
+    os.environ["_DOTENV_LOADED"] = "1"
 
 # ───────────────────── Database URL / Paths ─────────────────────
 DEFAULT_DB_PATH = os.path.abspath(os.path.join(PROJECT_ROOT, "memory.db"))
@@ -58,6 +60,9 @@ logger.info("=" * 80)
 
 SQLALCHEMY_URL: str = DATABASE_URL  # Backward compatibility alias
 ECHO = (os.getenv("SQLALCHEMY_ECHO", "0").strip().lower() in {"1", "true", "yes", "on"})
+# Compiled-statement LRU (SQLAlchemy default 500): room for every select()
+# shape MemoryManager and the routers build, so repeats skip SQL compilation
+QUERY_CACHE_SIZE = int(os.getenv("SQL_QUERY_CACHE_SIZE", "1200"))
 
 # Ensure SQLite directory exists (except for :memory:)
 if DATABASE_URL.startswith("sqlite"):
@@ -74,30 +79,46 @@ if DATABASE_URL.startswith("sqlite"):
 
 # ─────────────────────────── Create engine ──────────────────────
 try:
-    if DATABASE_URL.startswith("postgresql"):
+    if DATABASE_URL.startswith("postgresql") and os.getenv("SQL_NULL_POOL", "0").strip().lower() in {"1", "true", "yes", "on"}:
+        # Behind PgBouncer (transaction pooling) — let the bouncer pool;
+        # a second client-side pool + pre-ping only adds round-trips
+        from sqlalchemy.pool import NullPool
+
+        engine = create_engine(DATABASE_URL, poolclass=NullPool, pool_pre_ping=False, query_cache_size=QUERY_CACHE_SIZE, echo=ECHO)
+        logger.info("✅ PostgreSQL configured without client pooling (SQL_NULL_POOL=1)")
+        logger.info(f"Database URL: {mask_db_url(DATABASE_URL)}")
+    elif DATABASE_URL.startswith("postgresql"):
         # PostgreSQL with connection pooling
         from sqlalchemy.pool import QueuePool
         
         engine = create_engine(
             DATABASE_URL,
             poolclass=QueuePool,
-            pool_size=int(os.getenv("SQL_POOL_SIZE", "5")),
+            pool_size=int(os.getenv("SQL_POOL_SIZE", "20")),
             max_overflow=int(os.getenv("SQL_MAX_OVERFLOW", "10")),
             pool_timeout=int(os.getenv("SQL_POOL_TIMEOUT", "30")),
-            pool_recycle=int(os.getenv("SQL_POOL_RECYCLE", "3600")),
+            pool_recycle=int(os.getenv("SQL_POOL_RECYCLE", "1800")),
             pool_pre_ping=True,
+            # LIFO keeps a small hot set of connections in use, so idle extras
+            # age out instead of being cycled (and re-validated) round-robin
+            pool_use_lifo=True,
+            query_cache_size=QUERY_CACHE_SIZE,
             echo=ECHO
         )
         logger.info("✅ PostgreSQL configured with connection pooling")
         logger.info(f"Database URL: {mask_db_url(DATABASE_URL)}")
     else:
-        # SQLite without pooling
-        from sqlalchemy.pool import NullPool
-        
+        # SQLite: keep a few warm connections (pragmas run once per connection);
+        # max_overflow=-1 → never block, extra connections close on return
+        from sqlalchemy.pool import QueuePool
+
         engine = create_engine(
             DATABASE_URL,
-            poolclass=NullPool,
+            poolclass=QueuePool,
+            pool_size=int(os.getenv("SQLITE_POOL_SIZE", "5")),
+            max_overflow=-1,
             connect_args={"check_same_thread": False},
+            query_cache_size=QUERY_CACHE_SIZE,
             echo=ECHO
         )
         logger.info("✅ SQLite configured (development mode)")
@@ -109,24 +130,36 @@ except Exception as e:
 
 # ───────────────────── SQLite performance tweaks ────────────────
 if DATABASE_URL.startswith("sqlite"):
+    # journal_mode is persisted in the database file: set it on the first
+    # connection only; the other pragmas below are per-connection
+    _wal_set = False
 
     @event.listens_for(engine, "connect")
     def _set_sqlite_pragma(dbapi_connection, connection_record):  # type: ignore[no-redef]
+        global _wal_set
         try:
             cursor = dbapi_connection.cursor()
             # Keep foreign keys enforced and use WAL for better concurrency
             cursor.execute("PRAGMA foreign_keys=ON;")
-            cursor.execute("PRAGMA journal_mode=WAL;")
+            if not _wal_set:
+                cursor.execute("PRAGMA journal_mode=WAL;")
+                _wal_set = True
             cursor.execute("PRAGMA synchronous=NORMAL;")
             # Cache size negative = KB pages in memory cache
             cursor.execute("PRAGMA cache_size=-64000;")
+            # Memory-map reads (256 MiB), keep temp sorts/indexes in RAM,
+            # and let concurrent writers wait instead of failing with SQLITE_BUSY
+            cursor.execute("PRAGMA mmap_size=268435456;")
+            cursor.execute("PRAGMA temp_store=MEMORY;")
+            cursor.execute("PRAGMA busy_timeout=30000;")
             cursor.close()
         except Exception as e:
             # Never fail app due to pragma issues
             logger.warning(f"SQLite PRAGMA setup warning: {e}")
 
 # ───────────────────────── Session factory ──────────────────────
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: objects stay readable after commit without a re-SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # FastAPI dependency
 def get_db() -> Generator[Session, None, None]:
@@ -141,11 +174,77 @@ def get_session() -> Session:
     return SessionLocal()
 
 # ────────────────────────── Init helpers ────────────────────────
+# Arbitrary app-wide keys for the advisory locks around init DDL
+_INIT_DB_LOCK_KEY = 7_246_013_581
+_INIT_INDEX_LOCK_KEY = 7_246_013_582
+_INIT_DB_LOCK_POLL = 0.5  # seconds between pg_try_advisory_lock attempts
+
+
 def init_db(retries: int = 3, delay: float = 1.0) -> None:
     """
     Create all tables with pgvector extension enabled first.
     Extension must be enabled BEFORE creating tables with vector columns.
+
+    On PostgreSQL the DDL runs under a session advisory lock, so with several
+    workers starting at once only one creates objects; the others wait and
+    then find everything in place. Waiters poll pg_try_advisory_lock rather
+    than block in pg_advisory_lock, so they hold no open statement (snapshot)
+    while waiting. Model indexes missing on existing tables (create_all only
+    indexes tables it creates) are added CONCURRENTLY after the DDL lock is
+    released, by whichever worker gets the index lock first; the others skip.
     """
+    if not str(engine.url).startswith("postgresql"):
+        _init_db(retries, delay)
+        return
+    # AUTOCOMMIT: hold the (session-level) locks without an open transaction,
+    # which CREATE INDEX CONCURRENTLY would otherwise wait on forever
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        while not _try_advisory_lock(lock_conn, _INIT_DB_LOCK_KEY):
+            time.sleep(_INIT_DB_LOCK_POLL)
+        try:
+            _init_db(retries, delay)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _INIT_DB_LOCK_KEY})
+
+        if not _try_advisory_lock(lock_conn, _INIT_INDEX_LOCK_KEY):
+            logger.info("ℹ️ Index build running in another worker — skipping")
+            return
+        try:
+            _create_missing_indexes_concurrently()
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _INIT_INDEX_LOCK_KEY})
+
+
+def _try_advisory_lock(conn, key: int) -> bool:
+    return bool(conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": key}).scalar())
+
+
+def _create_missing_indexes_concurrently() -> None:
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS for every non-unique model index,
+    so indexes added to models.py reach live tables without an exclusive lock.
+    Unique indexes are left to explicit migrations (a failed concurrent build
+    leaves an INVALID index behind).
+    """
+    from sqlalchemy.schema import CreateIndex
+
+    created = 0
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in Base.metadata.tables.values():
+            for index in table.indexes:
+                if index.unique:
+                    continue
+                ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+                ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+                try:
+                    conn.execute(text(ddl))
+                    created += 1
+                except Exception as e:
+                    logger.warning(f"⚠️ Index {index.name} skipped: {e}")
+    logger.info(f"✅ Indexes ensured (concurrently): {created}")
+
+
+def _init_db(retries: int, delay: float) -> None:
     for attempt in range(1, retries + 1):
         try:
             # Enable pgvector extension FIRST (PostgreSQL only)
@@ -172,20 +271,11 @@ def init_db(retries: int = 3, delay: float = 1.0) -> None:
                 raise
             time.sleep(delay)
 
-# Optionally initialize at import if desired; harmless if tables exist
-if os.getenv("INIT_DB_ON_IMPORT", "1").strip().lower() in {"1", "true", "yes", "on"}:
+# Opt-in init at import (INIT_DB_ON_IMPORT=1) for standalone scripts; the app
+# itself runs init_db() once in the lifespan hook.
+if os.getenv("INIT_DB_ON_IMPORT", "0").strip().lower() in {"1", "true", "yes", "on"}:
     try:
         init_db()
     except Exception:
         # Don't crash import path; app can still call init on startup
         logger.exception("DB init at import failed; continuing. App may initialize on startup.")
-
-__all__ = [
-    "engine",
-    "SessionLocal", 
-    "Base",
-    "get_db",
-    "init_db",
-    "DATABASE_URL",
-    "SQLALCHEMY_URL"
-]
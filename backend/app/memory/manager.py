@@ -1,25 +1,29 @@
 from __future__ import annotations
 
 from datetime import datetime
+from functools import lru_cache
+from collections import OrderedDict, deque
 from typing import List, Optional, Tuple, Dict, Any
+import hashlib
 import json
-import unicodedata
+import logging
+import os
+import re
+import threading
+import time
 from uuid import uuid4
 
+import orjson
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import func, insert, inspect, literal_column, select, or_, and_
 
 from app.memory.models import MemoryEntry, Role as MemoryRole, CanonItem
+from app.memory.utils import normalize_unicode
 
-# --- Tokenizer (robust) ---
-try:
-    import tiktoken  # type: ignore
-    try:
-        _enc = tiktoken.get_encoding("o200k_base")
-    except Exception:
-        _enc = tiktoken.encoding_for_model("gpt-4o")  # close enough
-except Exception:
-    _enc = None  # fallback
+logger = logging.getLogger(__name__)
+
+# --- Tokenizer (robust, loaded on first use) ---
+from app.utils.tokenizer import get_encoding  # noqa: E402
 
 
 def _count_tokens_fallback(text: str) -> int:
@@ -28,9 +32,50 @@ def _count_tokens_fallback(text: str) -> int:
     return max(1, len(text) // 4)
 
 
+# Short texts are memoized by value; longer ones by a 16-byte blake2b digest
+# in a small bounded LRU, so repeated long prompts/snippets are not pinned
+_TOKEN_CACHE_MAX_CHARS = 4_096
+_LONG_TOKEN_CACHE_SIZE = 1_024
+_long_token_counts: "OrderedDict[bytes, int]" = OrderedDict()
+_long_token_lock = threading.Lock()
+# tiktoken batch calls release the GIL and fan out over a Rust thread pool
+_ENCODE_THREADS = max(1, min(8, os.cpu_count() or 1))
+
+
+@lru_cache(maxsize=8192)
+def _count_tokens_cached(text: str) -> int:
+    return len(get_encoding().encode(text))  # type: ignore[union-attr]
+
+
+def _count_tokens_long(enc: Any, text: str) -> int:
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _long_token_lock:
+        n = _long_token_counts.get(key)
+        if n is not None:
+            _long_token_counts.move_to_end(key)
+            return n
+    n = len(enc.encode(text))
+    with _long_token_lock:
+        _long_token_counts[key] = n
+        if len(_long_token_counts) > _LONG_TOKEN_CACHE_SIZE:
+            _long_token_counts.popitem(last=False)
+    return n
+
+
+def _count_tokens(text: str) -> int:
+    enc = get_encoding()
+    if enc is None:
+        return _count_tokens_fallback(text)
+    if len(text) < _TOKEN_CACHE_MAX_CHARS:
+        return _count_tokens_cached(text)
+    return _count_tokens_long(enc, text)
+
+
 # --- Late imports so optional deps/settings load cleanly ---
 from app.providers.openai_provider import ask_openai  # noqa: E402
 from app.config.settings import settings  # noqa: E402
+from app.cache.exact import LLMCache  # noqa: E402
+from app.utils.audit_writer import enqueue_audit_log  # noqa: E402
 
 # Tunables / clip sizes
 TOKEN_LIMIT = 8192
@@ -39,19 +84,132 @@ MAX_RAW_TEXT_LEN = 10_000
 MAX_SUMMARY_LEN = 2_000
 MAX_CANON_BODY_LEN = 8_000
 
+# extract_canon_deltas results (JSON) by blake2b(model, source text): a
+# retry/re-run of the same text skips the extraction completion
+_canon_extract_cache = LLMCache(ttl=float(getattr(settings, "CANON_EXTRACT_CACHE_TTL", 3600)), max_entries=512)
+
+
+def _canon_extract_key(model: str, text: str) -> str:
+    return f"{model}:" + hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Whether canon_items.search_tsv exists: the main.py migration that adds it
+# is best-effort (old PG without generated columns, no ALTER privilege)
+_canon_search_tsv: Optional[bool] = None
+
+
+def _has_canon_search_tsv(db: Session) -> bool:
+    global _canon_search_tsv
+    if _canon_search_tsv is None:
+        try:
+            cols = inspect(db.get_bind()).get_columns("canon_items")
+        except Exception as e:
+            logger.warning("[Canon Search] column check failed, using ILIKE: %s", e)
+            return False
+        _canon_search_tsv = any(c["name"] == "search_tsv" for c in cols)
+        if not _canon_search_tsv:
+            logger.warning("[Canon Search] canon_items.search_tsv missing, using ILIKE")
+    return _canon_search_tsv
+
+
+class _LastSessionCache:
+    """
+    Process-wide, short-TTL memo of "latest session" lookups per
+    (role_id, project_id). This process's writes for a pair drop its entry;
+    other workers' writes show up within TTL seconds. Misses (no session
+    yet) are never cached, so a session started elsewhere is not hidden.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_keys: int = 1024):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._store: "OrderedDict[Tuple[int, str], Dict[Any, Tuple[float, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, role_id: Optional[int], project_id: Optional[str], sub: Any) -> Any:
+        if role_id is None or project_id is None:
+            return None
+        with self._lock:
+            rec = self._store.get((role_id, str(project_id)), {}).get(sub)
+            if rec is None or rec[0] < time.monotonic():
+                return None
+            return rec[1]
+
+    def set(self, role_id: Optional[int], project_id: Optional[str], sub: Any, value: Any) -> None:
+        if role_id is None or project_id is None or value is None:
+            return
+        key = (role_id, str(project_id))
+        with self._lock:
+            self._store.setdefault(key, {})[sub] = (time.monotonic() + self.ttl, value)
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_keys:
+                self._store.popitem(last=False)
+
+    def invalidate(self, role_id: Optional[int], project_id: Optional[str]) -> None:
+        with self._lock:
+            self._store.pop((role_id, str(project_id)), None)
+
+
+_last_session_cache = _LastSessionCache()
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _parse_json_array(reply: str) -> Any:
+    """
+    JSON array from an LLM reply: the outermost [...] span via orjson; if
+    that fails (e.g. prose or a second bracket after the array), the first
+    complete value decoded from the first "[".
+    """
+    payload = reply.strip()
+    start = payload.find("[")
+    if start == -1:
+        return orjson.loads(payload)
+    end = payload.rfind("]")
+    try:
+        return orjson.loads(payload[start:end + 1])
+    except orjson.JSONDecodeError:
+        return _JSON_DECODER.raw_decode(payload, start)[0]
+
+
+# extract_canon_deltas heuristic: one anchored match per (lowercased) line.
+# Branches are tried in order at position 0, so the first matching kind wins
+# exactly as in an if/elif chain of startswith/substring checks.
+_CANON_LINE_RE = re.compile(
+    r"(?P<ADR>decision|.*?adr:)"
+    r"|(?P<CHANGELOG>change|.*?(?:updated|refactor))"
+    r"|(?P<BACKLOG>.*?(?:todo|next:|backlog))"
+    r"|(?P<GLOSSARY>term:|.*?glossary)"
+)
+_CANON_LINE_TERMS = {"ADR": "decision", "CHANGELOG": "change,update", "BACKLOG": "todo,next"}
+
+# Words fed to to_tsquery: letters/digits only, so no tsquery operators leak in
+_TSQUERY_WORD_RE = re.compile(r"[^\W_]+")
+
+
+_SAFE_TEXT_CACHE_MAX_CHARS = 512
+_normalize_cached = lru_cache(maxsize=256)(normalize_unicode)  # titles/types/senders repeat
+
 
 def safe_text(text: str) -> str:
     if not isinstance(text, str):
         text = str(text or "")
     try:
-        text = unicodedata.normalize("NFKD", text)
-        text = "".join(c for c in text if unicodedata.category(c) != "Cs")
-        return text.encode("utf-8", "ignore").decode("utf-8")
+        if len(text) < _SAFE_TEXT_CACHE_MAX_CHARS:
+            return _normalize_cached(text)
+        return normalize_unicode(text)
     except Exception as e:
-        print(f"[Safe Text Error] → {e}")
+        logger.warning("[Safe Text Error] → %s", e)
         return ""
 
 
+def safe_clip(text: str, limit: int) -> str:
+    """safe_text(text)[:limit] without normalizing the part that gets cut off."""
+    if not isinstance(text, str):
+        text = str(text or "")
+    return safe_text(text[:limit])[:limit]
+
+
 def _to_int_or_none(s: Optional[str]) -> Optional[int]:
     try:
         if s is None:
@@ -64,7 +222,9 @@ def _to_int_or_none(s: Optional[str]) -> Optional[int]:
 class MemoryManager:
     def __init__(self, db: Session):
         self.db = db
-        print("🧠 MemoryManager initialized")
+        # retrieve_messages() results for this manager (one per request);
+        # dropped on every write made through the manager
+        self._retrieve_cache: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
 
     # -------------------------
     # Session helpers
@@ -75,14 +235,30 @@ class MemoryManager:
         otherwise mint a new UUID (no DB write here).
         """
         try:
-            last = self.get_last_session(role_id=role_id, project_id=str(project_id))
-            sid = (last or {}).get("chat_session_id")
+            sid = self._latest_session_id(role_id, project_id)
             if sid and str(sid).strip():
                 return str(sid).strip()
         except Exception as e:
-            print(f"[get_or_create_chat_session_id] last-session lookup failed → {e}")
+            logger.warning("[get_or_create_chat_session_id] last-session lookup failed → %s", e)
         return str(uuid4())
 
+    def _latest_session_id(self, role_id: Optional[int], project_id: Optional[str]) -> Optional[str]:
+        """
+        chat_session_id of the newest session row — get_last_session() without
+        the role JOIN and dict; one ix_mem_proj_role_ts_with_session probe.
+        """
+        sid = _last_session_cache.get(role_id, project_id, "sid")
+        if sid is not None:
+            return sid
+        stmt = select(MemoryEntry.chat_session_id).where(MemoryEntry.chat_session_id.isnot(None))
+        if role_id is not None:
+            stmt = stmt.where(MemoryEntry.role_id == role_id)
+        if project_id is not None:
+            stmt = stmt.where(MemoryEntry.project_id == str(project_id))
+        sid = self.db.execute(stmt.order_by(MemoryEntry.timestamp.desc()).limit(1)).scalar()
+        _last_session_cache.set(role_id, project_id, "sid", sid)
+        return sid
+
     def preflight_token_budget(
         self,
         texts: List[str],
@@ -95,10 +271,13 @@ class MemoryManager:
         """
         soft = int(soft if soft is not None else getattr(settings, "SOFT_TOKEN_BUDGET", 6000))
         hard = int(hard if hard is not None else getattr(settings, "HARD_TOKEN_BUDGET", 7800))
-        total = sum(self.count_tokens(t or "") for t in texts or [])
+        total = sum(self.count_tokens_batch(texts))
         near_soft = total >= int(soft * 0.80)   # 80% threshold to warn early
         over_hard = total >= hard
-        print(f"[Token Preflight] total={total} soft={soft} hard={hard} near_soft={near_soft} over_hard={over_hard}")
+        logger.debug(
+            "[Token Preflight] total=%s soft=%s hard=%s near_soft=%s over_hard=%s",
+            total, soft, hard, near_soft, over_hard,
+        )
         return {
             "total_tokens": total,
             "near_soft": bool(near_soft),
@@ -113,14 +292,34 @@ class MemoryManager:
     def count_tokens(self, text: str) -> int:
         text = text or ""
         try:
-            tokens = len(_enc.encode(text)) if _enc is not None else _count_tokens_fallback(text)
-            if getattr(settings, "LOG_TOKEN_COUNTS", True):
-                print(f"[Token Count] → {tokens} tokens in: {text[:60]}...")
+            tokens = _count_tokens(text)
+            if getattr(settings, "LOG_TOKEN_COUNTS", True) and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Token Count] → %s tokens in: %s...", tokens, text[:60])
             return tokens
         except Exception as e:
-            print(f"[Token Count Error] → {e}")
+            logger.warning("[Token Count Error] → %s", e)
             return _count_tokens_fallback(text)
 
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Token counts for many texts in one tokenizer call (no special-token checks)."""
+        texts = [t or "" for t in texts or []]
+        if not texts:
+            return []
+        try:
+            enc = get_encoding()
+            if enc is None:
+                counts = [_count_tokens_fallback(t) for t in texts]
+            elif len(texts) == 1:
+                counts = [_count_tokens(texts[0])]  # memoized single-text path
+            else:
+                counts = [len(ids) for ids in enc.encode_ordinary_batch(texts, num_threads=_ENCODE_THREADS)]
+        except Exception as e:
+            logger.warning("[Token Count Error] → %s", e)
+            counts = [_count_tokens_fallback(t) for t in texts]
+        if getattr(settings, "LOG_TOKEN_COUNTS", True):
+            logger.debug("[Token Count] → %s tokens in %s texts", sum(counts), len(texts))
+        return counts
+
     # -------------------------
     # Summaries
     # -------------------------
@@ -136,10 +335,11 @@ class MemoryManager:
                 model=SUMMARIZE_MODEL,
             )
             summary = safe_text((summary or "").strip())
-            print(f"[Summarized] → {summary[:100]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Summarized] → %s...", summary[:100])
             return summary or "Summary unavailable."
         except Exception as e:
-            print(f"[Summary Error] → {e}")
+            logger.warning("[Summary Error] → %s", e)
             return f"Summary unavailable: {e}"
 
     def summarize_text(self, text: str) -> str:
@@ -209,10 +409,10 @@ class MemoryManager:
                 max_tokens=100
             )
             result = safe_text(summary.strip())
-            print(f"[Summary Generated] {len(text)} chars → {len(result)} chars")
+            logger.debug("[Summary Generated] %s chars → %s chars", len(text), len(result))
             return result
         except Exception as e:
-            print(f"[Summary Error] {e}, using truncation fallback")
+            logger.warning("[Summary Error] %s, using truncation fallback", e)
             # Fallback: smart truncation
             return text[:500] + "..."
 
@@ -228,9 +428,9 @@ class MemoryManager:
         chat_session_id: Optional[str] = None,
         is_ai_to_ai: bool = False,
     ) -> MemoryEntry:
-        print(f"[Store Memory] role={role_id}, project={project_id}, session={chat_session_id}")
-        summary = safe_text(summary)[:MAX_SUMMARY_LEN]
-        raw_text = safe_text(raw_text)[:MAX_RAW_TEXT_LEN]
+        logger.debug("[Store Memory] role=%s, project=%s, session=%s", role_id, project_id, chat_session_id)
+        summary = safe_clip(summary, MAX_SUMMARY_LEN)
+        raw_text = safe_clip(raw_text, MAX_RAW_TEXT_LEN)
         tokens = self.count_tokens(raw_text)
         pj_int = _to_int_or_none(project_id)
 
@@ -244,15 +444,52 @@ class MemoryManager:
             raw_text=raw_text,
             is_ai_to_ai=is_ai_to_ai,
             is_summary=True,
-            timestamp=datetime.utcnow(),
         )
 
         self.db.add(entry)
-        self.db.commit()
-        self.db.refresh(entry)
-        print(f"[Memory Stored] → tokens={tokens}, summary={summary[:80]}...")
+        self.db.commit()  # id comes back via INSERT ... RETURNING; no refresh SELECT
+        self._retrieve_cache.clear()
+        _last_session_cache.invalidate(role_id, project_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[Memory Stored] → tokens=%s, summary=%s...", tokens, summary[:80])
         return entry
 
+    def store_memory_bulk(
+        self,
+        entries: List[Tuple[str, int, str, str, Optional[str], bool]],
+    ) -> int:
+        """
+        Insert many store_memory() rows in one transaction (one commit/fsync).
+        entries: (project_id, role_id, summary, raw_text, chat_session_id, is_ai_to_ai).
+        No ORM objects / PKs come back; returns the number of rows written.
+        """
+        if not entries:
+            return 0
+        raws = [safe_clip(raw, MAX_RAW_TEXT_LEN) for _, _, _, raw, _, _ in entries]
+        tokens = self.count_tokens_batch(raws)
+        rows = [
+            {
+                "project_id": str(project_id),
+                "project_id_int": _to_int_or_none(project_id),
+                "role_id": role_id,
+                "chat_session_id": chat_session_id,
+                "tokens": tok,
+                "summary": safe_clip(summary, MAX_SUMMARY_LEN),
+                "raw_text": raw,
+                "is_ai_to_ai": bool(is_ai_to_ai),
+                "is_summary": True,
+                "deleted": False,
+            }
+            for (project_id, role_id, summary, _, chat_session_id, is_ai_to_ai), raw, tok in zip(entries, raws, tokens)
+        ]
+        self.db.execute(insert(MemoryEntry), rows)
+        self.db.commit()
+        self._retrieve_cache.clear()
+        for r in rows:
+            _last_session_cache.invalidate(r["role_id"], r["project_id"])
+        logger.debug("[Memory Stored] → %s entries in one transaction", len(rows))
+        return len(rows)
+
     def store_chat_message(
         self,
         project_id: str,
@@ -270,47 +507,72 @@ class MemoryManager:
         - summary: AI-generated summary OR full text for AI context
         """
         msg_text = text if text is not None else (content or "")
-        print(f"[Store Chat Message] sender={sender}, role={role_id}, project={project_id}, session={chat_session_id}")
-        
-        # ✅ CRITICAL: NO TRUNCATION! Store full text
-        msg_text_full = safe_text(msg_text)  # Full text, NO limit
-        sender = safe_text(sender) or "assistant"
-        tokens_full = self.count_tokens(msg_text_full)
-        pj_int = _to_int_or_none(project_id)
+        return self.store_chat_messages_bulk(
+            project_id, role_id, chat_session_id, [(sender, msg_text)],
+            is_summary=is_summary, is_ai_to_ai=is_ai_to_ai,
+        )[0]
 
-        # Generate summary for AI context (if needed)
-        if self.should_generate_summary(msg_text_full, sender):
-            print(f"[Generating Summary] for {tokens_full} tokens...")
-            text_summary = self.generate_content_summary(msg_text_full, sender)
-            tokens_summary = self.count_tokens(text_summary)
-            print(f"[Summary] {tokens_full} → {tokens_summary} tokens (saved {tokens_full - tokens_summary})")
-        else:
-            # For short messages, summary = full text
-            text_summary = msg_text_full
-            tokens_summary = tokens_full
+    def store_chat_messages_bulk(
+        self,
+        project_id: str,
+        role_id: int,
+        chat_session_id: Optional[str],
+        turns: List[Tuple[str, str]],
+        is_summary: bool = False,
+        is_ai_to_ai: bool = False,
+    ) -> List[MemoryEntry]:
+        """
+        Persist consecutive (sender, text) turns of one session, stored exactly
+        like store_chat_message() but flushed as one INSERT batch (ids via
+        RETURNING) under a single commit. Returns the entries in turn order.
+        """
+        if not turns:
+            return []
+        pj_int = _to_int_or_none(project_id)
+        entries: List[MemoryEntry] = []
+        for sender, msg_text in turns:
+            logger.debug(
+                "[Store Chat Message] sender=%s, role=%s, project=%s, session=%s",
+                sender, role_id, project_id, chat_session_id,
+            )
 
-        # Store in database
-        raw_text = f"{sender}: {msg_text_full}"  # Full text for raw_text
-        
-        entry = MemoryEntry(
-            project_id=str(project_id),
-            project_id_int=pj_int,
-            role_id=role_id,
-            chat_session_id=chat_session_id,
-            tokens=tokens_full,  # Full token count
-            summary=text_summary,  # AI summary (or full if short)
-            raw_text=raw_text,  # FULL text (no limit!)
-            is_summary=is_summary,
-            is_ai_to_ai=is_ai_to_ai,
-            timestamp=datetime.utcnow(),
-        )
+            # ✅ CRITICAL: NO TRUNCATION! Store full text
+            msg_text_full = safe_text(msg_text or "")  # Full text, NO limit
+            sender = safe_text(sender) or "assistant"
+            tokens_full = self.count_tokens(msg_text_full)
+
+            # Generate summary for AI context (if needed)
+            if self.should_generate_summary(msg_text_full, sender):
+                logger.debug("[Generating Summary] for %s tokens...", tokens_full)
+                text_summary = self.generate_content_summary(msg_text_full, sender)
+                tokens_summary = self.count_tokens(text_summary)
+                logger.debug(
+                    "[Summary] %s → %s tokens (saved %s)",
+                    tokens_full, tokens_summary, tokens_full - tokens_summary,
+                )
+            else:
+                # For short messages, summary = full text
+                text_summary = msg_text_full
 
-        self.db.add(entry)
-        self.db.commit()
-        self.db.refresh(entry)
-        print(f"[Chat Message Stored] → sender={sender}, tokens={tokens_full}, text={msg_text_full[:80]}...")
-        
-        # Auto-summarization trigger (keep existing code)
+            entries.append(MemoryEntry(
+                project_id=str(project_id),
+                project_id_int=pj_int,
+                role_id=role_id,
+                chat_session_id=chat_session_id,
+                tokens=tokens_full,  # Full token count
+                summary=text_summary,  # AI summary (or full if short)
+                raw_text=f"{sender}: {msg_text_full}",  # FULL text (no limit!)
+                is_summary=is_summary,
+                is_ai_to_ai=is_ai_to_ai,
+            ))
+
+        self.db.add_all(entries)
+        self.db.commit()  # one batched INSERT ... RETURNING id; no refresh SELECT
+        self._retrieve_cache.clear()
+        _last_session_cache.invalidate(role_id, project_id)
+        logger.debug("[Chat Message Stored] → %s turns, session=%s", len(entries), chat_session_id)
+
+        # Auto-summarization trigger: every 15th message of the session
         try:
             message_count = self.db.query(MemoryEntry).filter(
                 MemoryEntry.project_id == str(project_id),
@@ -319,14 +581,18 @@ class MemoryManager:
                 MemoryEntry.is_summary == False,
                 MemoryEntry.deleted == False
             ).count()
-            
-            if message_count > 0 and message_count % 15 == 0:
-                print(f"[Auto-Summary Trigger] → {message_count} messages reached, creating summary...")
+
+            # Batch may step over a multiple of 15 (single turn: count % 15 == 0)
+            if message_count > 0 and message_count // 15 > (message_count - len(entries)) // 15:
+                logger.debug(
+                    "[Auto-Summary Trigger] → %s messages reached, creating summary...",
+                    message_count,
+                )
                 self._auto_summarize_session(project_id, role_id, chat_session_id)
         except Exception as e:
-            print(f"[Auto-Summary Trigger Error] → {e}")
-        
-        return entry
+            logger.warning("[Auto-Summary Trigger Error] → %s", e)
+
+        return entries
 
     # -------------------------
     # Canon writes
@@ -342,52 +608,61 @@ class MemoryManager:
         tags: Optional[List[str]] = None,
         terms: Optional[str] = None,
     ) -> Optional[int]:
-        if not getattr(settings, "ENABLE_CANON", False):
-            return None
+        return self.save_canon_items([{
+            "project_id": project_id,
+            "role_id": role_id,
+            "type": type,
+            "title": title,
+            "body": body,
+            "tags": tags,
+            "terms": terms,
+        }])[0]
 
-        type = safe_text(type.upper()[:32] or "CHANGELOG")
-        title = safe_text(title)[:256]
-        body = safe_text(body)[:MAX_CANON_BODY_LEN]
-        terms = safe_text(terms or "")[:1000]
-        pj_int = _to_int_or_none(project_id)
+    def save_canon_items(self, items: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        Insert canon items (dicts with store_canon_item's keyword fields) as one
+        multi-row INSERT ... RETURNING id under a single commit, and queue one
+        canon_insert audit row each. Returns the new ids in input order.
+        """
+        items = list(items or [])
+        if not items or not getattr(settings, "ENABLE_CANON", False):
+            return [None] * len(items)
+
+        now = datetime.utcnow()
+        rows: List[Dict[str, Any]] = []
+        for d in items:
+            project_id = d.get("project_id")
+            rows.append({
+                "project_id": str(project_id),
+                "project_id_int": _to_int_or_none(project_id),
+                "role_id": d.get("role_id"),
+                "type": safe_text((d.get("type") or "CHANGELOG").upper()[:32] or "CHANGELOG"),
+                "title": safe_clip(d.get("title", "Update"), 256),
+                "body": safe_clip(d.get("body", ""), MAX_CANON_BODY_LEN),
+                "tags": d.get("tags") or None,
+                "terms": safe_clip(d.get("terms") or "", 1000) or None,
+                "created_at": now,
+                "is_active": True,
+            })
 
-        item = CanonItem(
-            project_id=str(project_id),
-            project_id_int=pj_int,
-            role_id=role_id,
-            type=type,
-            title=title,
-            body=body,
-            tags=tags or None,
-            terms=terms or None,
-            created_at=datetime.utcnow(),
-            is_active=True,
-        )
-        self.db.add(item)
+        stmt = insert(CanonItem).returning(CanonItem.id, sort_by_parameter_order=True)
+        ids: List[Optional[int]] = list(self.db.execute(stmt, rows).scalars())
         self.db.commit()
-        self.db.refresh(item)
-
-        print(f"[Canon Stored] → id={item.id}, type={type}, title={title[:80]}...")
-        try:
-            self.insert_audit_log(project_id, role_id or -1, None, "internal", "canon_insert", f"{type}: {title}"[:300])
-        except Exception:
-            pass
-        return item.id
+        logger.debug("[Canon Stored] → %s items, ids=%s", len(ids), ids)
 
-    def save_canon_items(self, items: List[Dict[str, Any]]) -> List[Optional[int]]:
-        ids: List[Optional[int]] = []
-        for d in items or []:
-            ids.append(
-                self.store_canon_item(
-                    project_id=d.get("project_id"),
-                    role_id=d.get("role_id"),
-                    type=d.get("type", "CHANGELOG"),
-                    title=d.get("title", "Update"),
-                    body=d.get("body", ""),
-                    tags=d.get("tags"),
-                    terms=d.get("terms"),
-                )
-            )
+        for r in rows:
+            try:
+                enqueue_audit_log({
+                    "project_id": r["project_id"],
+                    "role_id": r["role_id"] or -1,
+                    "chat_session_id": None,
+                    "provider": "internal",
+                    "action": "canon_insert",
+                    "query": f"{r['type']}: {r['title']}"[:300],
+                    "timestamp": now,
+                })
+            except Exception as e:
+                logger.warning("[Audit Log Error] → %s", e)
         return ids
 
     # -------------------------
@@ -422,25 +697,35 @@ class MemoryManager:
             q = q.filter(CanonItem.type.in_(types_u))
 
         if query_terms:
-            term_clauses = []
-            for t in query_terms:
-                t = safe_text(t)
-                if not t:
-                    continue
-                like = f"%{t}%"
-                term_clauses.append(or_(
-                    CanonItem.title.ilike(like),
-                    CanonItem.body.ilike(like),
-                    CanonItem.terms.ilike(like),
-                ))
-            if term_clauses:
+            terms = [t for t in (safe_text(t) for t in query_terms) if t]
+            words = [w for t in terms for w in _TSQUERY_WORD_RE.findall(t)]
+            if words and self.db.get_bind().dialect.name == "postgresql" and _has_canon_search_tsv(self.db):
+                # GIN-indexed canon_items.search_tsv (see main.py migrations):
+                # every word must match, as a prefix
+                tsq = " & ".join(f"{w}:*" for w in words)
+                q = q.filter(
+                    literal_column("canon_items.search_tsv").op("@@")(func.to_tsquery("simple", tsq))
+                )
+            elif terms:
+                # SQLite (dev) or no search_tsv: leading-wildcard ILIKE, one sequential scan
+                term_clauses = []
+                for t in terms:
+                    like = f"%{t}%"
+                    term_clauses.append(or_(
+                        CanonItem.title.ilike(like),
+                        CanonItem.body.ilike(like),
+                        CanonItem.terms.ilike(like),
+                    ))
                 q = q.filter(and_(*term_clauses))
 
         q = q.order_by(CanonItem.created_at.desc())
 
         k = top_k or int(getattr(settings, "CANON_TOPK", 6))
         rows = q.limit(max(1, k)).all()
-        print(f"[Canon Search] project={project_id}, role={role_id}, terms={query_terms} → {len(rows)} hits")
+        logger.debug(
+            "[Canon Search] project=%s, role=%s, terms=%s → %s hits",
+            project_id, role_id, query_terms, len(rows),
+        )
         return rows
 
     def retrieve_context_digest(
@@ -464,7 +749,7 @@ class MemoryManager:
         sections: List[str] = []
 
         for r in rows:
-            body = safe_text(r.body or "")[:MAX_CANON_BODY_LEN]
+            body = safe_clip(r.body or "", MAX_CANON_BODY_LEN)
             snippet = body if len(body) <= 600 else (body[:580] + " …")
             header = f"[{r.type}] {r.title}"
             sections.append(f"{header}\n{snippet}")
@@ -479,7 +764,7 @@ class MemoryManager:
             })
 
         digest = "### Canonical Context (most relevant first)\n" + "\n\n".join(sections)
-        print(f"[Canon Digest] → {len(items)} items, {len(digest)} chars")
+        logger.debug("[Canon Digest] → %s items, %s chars", len(items), len(digest))
         return digest, items
 
     # -------------------------
@@ -495,10 +780,18 @@ class MemoryManager:
         if not getattr(settings, "ENABLE_CANON", False):
             return []
 
-        text = safe_text(text or "")[:MAX_RAW_TEXT_LEN]
+        text = safe_clip(text or "", MAX_RAW_TEXT_LEN)
         if not text.strip():
             return []
 
+        model = getattr(settings, "CANON_EXTRACT_MODEL", "gpt-4o-mini")
+        use_cache = _canon_extract_cache.ttl > 0
+        llm_key = _canon_extract_key(model, text)
+        hit = _canon_extract_cache.get(llm_key) if use_cache else None
+        if hit is not None:
+            logger.debug("[Canon Extract LLM] → cache hit")
+            return json.loads(hit)  # fresh lists/dicts per caller
+
         # 1) Try LLM JSON extraction
         try:
             system = (
@@ -511,13 +804,9 @@ class MemoryManager:
             user = f"Source text:\n{text}"
             raw = ask_openai(
                 messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-                model=getattr(settings, "CANON_EXTRACT_MODEL", "gpt-4o-mini"),
+                model=model,
             )
-            payload = (raw or "").strip()
-            start = payload.find("["); end = payload.rfind("]")
-            if start != -1 and end != -1 and end > start:
-                payload = payload[start:end + 1]
-            data = json.loads(payload)
+            data = _parse_json_array(raw or "")
             results: List[Dict[str, Any]] = []
             allowed = {"ADR", "CHANGELOG", "BACKLOG", "GLOSSARY", "PMD"}
             for item in data if isinstance(data, list) else []:
@@ -526,43 +815,45 @@ class MemoryManager:
                     continue
                 results.append({
                     "type": t,
-                    "title": safe_text(item.get("title", ""))[:256],
-                    "body": safe_text(item.get("body", ""))[:1000],
+                    "title": safe_clip(item.get("title", ""), 256),
+                    "body": safe_clip(item.get("body", ""), 1000),
                     "tags": [safe_text(x) for x in (item.get("tags") or []) if safe_text(x)],
-                    "terms": safe_text(item.get("terms", ""))[:500],
+                    "terms": safe_clip(item.get("terms", ""), 500),
                 })
             if results:
-                print(f"[Canon Extract LLM] → {len(results)} items")
+                logger.debug("[Canon Extract LLM] → %s items", len(results))
+                if use_cache:
+                    _canon_extract_cache.set(llm_key, json.dumps(results, ensure_ascii=False))
                 return results
         except Exception as e:
-            print(f"[Canon Extract LLM Error] → {e}")
+            logger.warning("[Canon Extract LLM Error] → %s", e)
 
-        # 2) Heuristic fallback
+        # 2) Heuristic fallback (not cached: a transient LLM failure must not
+        # pin heuristic results for the TTL)
         lines = [ln.strip(" •-\t") for ln in (text.splitlines() if text else []) if ln.strip()]
         results: List[Dict[str, Any]] = []
         for ln in lines:
-            low = ln.lower()
-            if low.startswith("decision") or "adr:" in low:
-                results.append({"type": "ADR", "title": ln[:200], "body": ln, "tags": [], "terms": "decision"})
-            elif low.startswith("change") or "updated" in low or "refactor" in low:
-                results.append({"type": "CHANGELOG", "title": ln[:200], "body": ln, "tags": [], "terms": "change,update"})
-            elif "todo" in low or "next:" in low or "backlog" in low:
-                results.append({"type": "BACKLOG", "title": ln[:200], "body": ln, "tags": [], "terms": "todo,next"})
-            elif low.startswith("term:") or "glossary" in low:
+            m = _CANON_LINE_RE.match(ln.lower())
+            if m is None:
+                continue
+            kind = m.lastgroup
+            if kind == "GLOSSARY":
                 title = ln.split(":", 1)[1].strip() if ":" in ln else ln
-                results.append({"type": "GLOSSARY", "title": title[:200], "body": ln, "tags": [], "terms": title})
-        print(f"[Canon Extract Heuristic] → {len(results)} items")
+                results.append({"type": kind, "title": title[:200], "body": ln, "tags": [], "terms": title})
+            else:
+                results.append({"type": kind, "title": ln[:200], "body": ln, "tags": [], "terms": _CANON_LINE_TERMS[kind]})
+        logger.debug("[Canon Extract Heuristic] → %s items", len(results))
         return results
 
     # -------------------------
     # Reads
     # -------------------------
     def _split_sender_content(self, raw: str) -> Tuple[str, str]:
-        raw = (raw or "").strip()
-        if ":" in raw:
-            parts = raw.split(":", 1)
-            return parts[0].strip(), parts[1].strip()
-        return "assistant", raw
+        # No up-front raw.strip(): that would copy the whole (long) content once more
+        sender, sep, content = (raw or "").partition(":")
+        if sep:
+            return sender.strip(), content.strip()
+        return "assistant", sender.strip()
 
     def retrieve_messages(
         self,
@@ -588,10 +879,36 @@ class MemoryManager:
         CRITICAL: Always fetches MORE messages initially (FETCH_BUFFER), then trims by TOKEN BUDGET.
         This prevents context loss from premature SQL LIMIT application.
         """
-        print(f"[Retrieve Messages] role={role_id}, project={project_id}, session={chat_session_id}, limit={limit}, for_display={for_display}, user_id={user_id}")
-        
-        # Step 1: Build query
-        query = self.db.query(MemoryEntry).filter(
+        logger.debug(
+            "[Retrieve Messages] role=%s, project=%s, session=%s, limit=%s, for_display=%s, user_id=%s",
+            role_id, project_id, chat_session_id, limit, for_display, user_id,
+        )
+
+        cache_key = (str(project_id), role_id, limit, chat_session_id, include_summaries, max_tokens, for_display, user_id)
+        cached = self._retrieve_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("[Retrieve Messages] → reused result from this request")
+            return {**cached, "messages": [dict(m) for m in cached["messages"]]}
+
+        # Step 1: Build query — only the columns we render (no ORM objects,
+        # no 1536-dim embedding per row; summary is unused in display mode)
+        raw_text_col: Any = MemoryEntry.raw_text
+        cap = int(getattr(settings, "MSG_RETURN_CAP", 4000) or 0)
+        if not for_display and cap > 0:
+            # AI context reads the summary; raw_text only supplies the sender
+            # and the summary-less fallback — truncate it in the DB
+            raw_text_col = func.substr(MemoryEntry.raw_text, 1, cap).label("raw_text")
+        columns = [
+            MemoryEntry.id,
+            MemoryEntry.role_id,
+            MemoryEntry.project_id,
+            MemoryEntry.chat_session_id,
+            raw_text_col,
+            MemoryEntry.is_summary,
+        ]
+        if not for_display:
+            columns.append(MemoryEntry.summary)
+        stmt = select(*columns, MemoryEntry.timestamp).where(
             MemoryEntry.project_id == str(project_id),
             MemoryEntry.role_id == role_id,
         )
@@ -599,38 +916,57 @@ class MemoryManager:
         # Add user_id filtering via JOIN with Project table
         if user_id is not None:
             from app.memory.models import Project
-            query = query.join(
+            stmt = stmt.join(
                 Project,
                 MemoryEntry.project_id_int == Project.id
-            ).filter(
+            ).where(
                 Project.user_id == user_id
             )
         if chat_session_id:
-            query = query.filter(MemoryEntry.chat_session_id == chat_session_id)
+            stmt = stmt.where(MemoryEntry.chat_session_id == chat_session_id)
         if not include_summaries:
-            query = query.filter(MemoryEntry.is_summary == False)  # noqa: E712
+            stmt = stmt.where(MemoryEntry.is_summary == False)  # noqa: E712
 
-        query = query.filter(MemoryEntry.deleted == False)
+        stmt = stmt.where(MemoryEntry.deleted == False)  # noqa: E712
 
         # Step 2: Fetch messages - respect limit for AI context
         if for_display:
             # Display mode: large buffer for pagination
             FETCH_BUFFER = 200
-            rows = query.order_by(MemoryEntry.timestamp.desc()).limit(FETCH_BUFFER).all()
-            print(f"[Fetched Buffer] → {len(rows)} messages from DB (display mode)")
+            fetch_limit = FETCH_BUFFER
         else:
             # AI context mode: respect the limit parameter (usually 5 for Smart Context)
-            rows = query.order_by(MemoryEntry.timestamp.desc()).limit(limit).all()
-            print(f"[Fetched Buffer] → {len(rows)} messages from DB (AI context, limit={limit})")
+            fetch_limit = limit
+        # Newest N inside, re-sorted oldest-first outside: rows arrive in
+        # output order, no reversed() pass over the result
+        newest = (
+            stmt.order_by(MemoryEntry.timestamp.desc(), MemoryEntry.id.desc())
+            .limit(fetch_limit)
+            .subquery()
+        )
+        rows = self.db.execute(
+            select(*(c for c in newest.c if c.name != "timestamp"))
+            .order_by(newest.c.timestamp.asc(), newest.c.id.asc())
+        ).all()
+        logger.debug(
+            "[Fetched Buffer] → %s messages from DB (for_display=%s, limit=%s)",
+            len(rows), for_display, fetch_limit,
+        )
 
         # Step 3: Convert to messages
         messages: List[dict] = []
-        for row in reversed(rows):  # ASC order (oldest first)
+        for row in rows:  # ASC order (oldest first)
             raw = safe_text(row.raw_text or "")
             if not raw:
                 continue
-            sender, content_from_raw = self._split_sender_content(raw)
-            
+            # Inlined _split_sender_content (per-row hot loop)
+            sender, sep, content_from_raw = raw.partition(":")
+            if sep:
+                sender, content_from_raw = sender.strip(), content_from_raw.strip()
+            else:
+                sender, content_from_raw = "assistant", sender.strip()
+
+
             # ✅ KEY CHANGE: Choose text based on for_display
             if for_display:
                 # For UI - use FULL text from raw_text
@@ -652,7 +988,7 @@ class MemoryManager:
             })
 
         if not messages:
-            print("[Retrieve Messages] No chat messages found, creating starter")
+            logger.debug("[Retrieve Messages] No chat messages found, creating starter")
             messages.append({
                 "id": None,
                 "sender": "user",
@@ -664,52 +1000,55 @@ class MemoryManager:
                 "isSummary": False,
             })
 
-        # Step 4-5: Token budget - SKIP for Smart Context (limit ≤ 10)
-        if not for_display:
-            if limit <= 10:
-                # Smart Context mode - no trimming needed
-                total_tokens = 0
-                print(f"[Smart Context Mode] → {len(messages)} messages, NO token budget applied")
-            else:
-                # Traditional mode - apply token budget
-                total_tokens = sum(self.count_tokens(m.get('text', '')) for m in messages)
-                print(f"[Token Budget] → {len(messages)} messages = {total_tokens} tokens (budget: {max_tokens})")
-                while total_tokens > max_tokens and len(messages) > 1:
-                    removed = messages.pop(0)
-                    removed_tokens = self.count_tokens(removed.get('text', ''))
-                    total_tokens -= removed_tokens
-                    print(f"[Token Trim] → Removed message ({removed_tokens} tokens)")
-                print(f"[Context Limited] → {len(messages)} messages, {total_tokens} tokens (budget: {max_tokens})")
+        # Step 4-5: Token budget - newest messages win, oldest dropped first.
+        # Applied for every AI-context fetch (one long old message must not
+        # inflate every later prompt); pass max_tokens=None to opt out.
+        if not for_display and max_tokens:
+            counts = self.count_tokens_batch([m.get('text', '') for m in messages])
+            total_tokens = sum(counts)
+            drop = 0
+            while total_tokens > max_tokens and drop < len(messages) - 1:
+                total_tokens -= counts[drop]
+                drop += 1
+            if drop:
+                messages = messages[drop:]
+                logger.debug("[Token Trim] → Removed %s oldest message(s)", drop)
+            logger.debug(
+                "[Context Limited] → %s messages, %s tokens (budget: %s)",
+                len(messages), total_tokens, max_tokens,
+            )
         else:
-            # Display mode - no token limits
+            # Display mode (or no budget) - no token limits
             total_tokens = 0
-            print(f"[Display Mode] → {len(messages)} messages WITHOUT token limits")
+            logger.debug("[Display Mode] → %s messages WITHOUT token limits", len(messages))
 
         # Step 6: Return result
         result = {
             "messages": messages,
             "total_tokens": total_tokens,
-            "max_tokens": max_tokens if not for_display else 0,
+            "max_tokens": (max_tokens or 0) if not for_display else 0,
             "message_count": len(messages),
             "for_display": for_display
         }
+        self._retrieve_cache[cache_key] = {**result, "messages": [dict(m) for m in messages]}
         return result
 
     def load_recent_summaries(self, project_id: str, role_id: int, limit: int = 5) -> List[str]:
-        print(f"[Load Summaries] role={role_id}, project={project_id}, limit={limit}")
-        rows = (
-            self.db.query(MemoryEntry.summary)
-            .filter(
+        logger.debug("[Load Summaries] role=%s, project=%s, limit=%s", role_id, project_id, limit)
+        stmt = (
+            select(MemoryEntry.summary)
+            .where(
                 MemoryEntry.project_id == str(project_id),
                 MemoryEntry.role_id == role_id,
                 MemoryEntry.is_summary == True,  # noqa: E712
             )
             .order_by(MemoryEntry.timestamp.desc())
             .limit(max(1, int(limit)))
-            .all()
         )
-        print(f"[Summaries Loaded] → count={len(rows)}")
-        return [safe_text(getattr(r, "summary", "")) for r in rows]
+        summaries = self.db.execute(stmt).scalars().all()
+        logger.debug("[Summaries Loaded] → count=%s", len(summaries))
+        # Every is_summary writer stores safe_text'd summaries: no re-sanitizing
+        return [s or "" for s in summaries]
 
     # -------------------------
     # Cleanup / housekeeping
@@ -721,7 +1060,10 @@ class MemoryManager:
         chat_session_id: Optional[str] = None,
         keep_summaries: bool = True,
     ) -> None:
-        print(f"[Delete Messages] project={project_id}, role={role_id}, session={chat_session_id}")
+        logger.debug(
+            "[Delete Messages] project=%s, role=%s, session=%s",
+            project_id, role_id, chat_session_id,
+        )
         try:
             query = self.db.query(MemoryEntry).filter(
                 MemoryEntry.project_id == str(project_id),
@@ -734,20 +1076,46 @@ class MemoryManager:
 
             deleted_count = query.delete()
             self.db.commit()
-            print(f"[Cleanup] Deleted {deleted_count} chat messages.")
+            self._retrieve_cache.clear()
+            _last_session_cache.invalidate(role_id, project_id)
+            logger.debug("[Cleanup] Deleted %s chat messages.", deleted_count)
         except Exception as e:
-            print(f"[Cleanup Error] → {e}")
+            logger.warning("[Cleanup Error] → %s", e)
 
     # -------------------------
     # Discovery
     # -------------------------
+    def session_has_history(
+        self,
+        project_id: str,
+        role_id: int,
+        chat_session_id: Optional[str],
+        more_than: int = 0,
+    ) -> bool:
+        """True if the session already holds more than `more_than` entries (reads at most more_than+1 ids)."""
+        if not chat_session_id:
+            return False
+        stmt = (
+            select(MemoryEntry.id)
+            .where(
+                MemoryEntry.project_id == str(project_id),
+                MemoryEntry.role_id == role_id,
+                MemoryEntry.chat_session_id == chat_session_id,
+            )
+            .limit(more_than + 1)
+        )
+        return len(self.db.execute(stmt).all()) > more_than
+
     def get_last_session(
         self,
         role_id: Optional[int] = None,
         project_id: Optional[str] = None,
         user_id: Optional[int] = None,
     ) -> Optional[dict]:
-        print(f"[Get Last Session] role={role_id}, project={project_id}, user_id={user_id}")
+        logger.debug("[Get Last Session] role=%s, project=%s, user_id=%s", role_id, project_id, user_id)
+        cached = _last_session_cache.get(role_id, project_id, ("last", user_id))
+        if cached is not None:
+            return dict(cached)
         query = (
             self.db.query(
                 MemoryEntry.project_id,
@@ -779,18 +1147,20 @@ class MemoryManager:
 
         row = query.first()
         if row:
-            print(
-                f"[Last Session] → project_id={row.project_id}, role_id={row.role_id}, "
-                f"session_id={row.chat_session_id}, role_name={row.role_name}"
+            logger.debug(
+                "[Last Session] → project_id=%s, role_id=%s, session_id=%s, role_name=%s",
+                row.project_id, row.role_id, row.chat_session_id, row.role_name,
             )
-            return {
+            last = {
                 "project_id": row.project_id,
                 "role_id": row.role_id,
                 "chat_session_id": row.chat_session_id,
                 "role_name": row.role_name,
             }
+            _last_session_cache.set(role_id, project_id, ("last", user_id), last)
+            return dict(last)
 
-        print("[Last Session] → None found")
+        logger.debug("[Last Session] → None found")
         return None
 
     # -------------------------
@@ -807,31 +1177,26 @@ class MemoryManager:
         model_version: Optional[str] = None,
     ) -> None:
         """
-        Local-import AuditLog to avoid NameError when hot-reload loads manager.py
-        before models.AuditLog class is created.
+        Queue one audit_logs row for the background audit writer (batched,
+        off the request path); written inline when no writer is running.
         """
-        print(
-            f"[Insert Audit Log] provider={provider}, action={action}, role={role_id}, "
-            f"project={project_id}, session={chat_session_id}"
+        logger.debug(
+            "[Insert Audit Log] provider=%s, action=%s, role=%s, project=%s, session=%s",
+            provider, action, role_id, project_id, chat_session_id,
         )
         try:
-            from app.memory.models import AuditLog as _AuditLog  # type: ignore
-
-            entry = _AuditLog(
-                project_id=str(project_id),
-                role_id=role_id,
-                chat_session_id=chat_session_id,
-                provider=safe_text(provider),
-                action=safe_text(action),
-                query=safe_text(query) if query else None,
-                model_version=model_version,
-                timestamp=datetime.utcnow(),
-            )
-            self.db.add(entry)
-            self.db.commit()
-            print(f"[Audit Log] → provider={provider}, action={action}, version={model_version}")
+            enqueue_audit_log({
+                "project_id": str(project_id),
+                "role_id": role_id,
+                "chat_session_id": chat_session_id,
+                "provider": safe_text(provider),
+                "action": safe_text(action),
+                "query": safe_text(query) if query else None,
+                "model_version": model_version,
+                "timestamp": datetime.utcnow(),
+            })
         except Exception as e:
-            print(f"[Audit Log Error] → {e}")
+            logger.warning("[Audit Log Error] → %s", e)
 
     # -------------------------
     # Auto-Summarization
@@ -855,31 +1220,38 @@ class MemoryManager:
         Returns:
             Summary entry ID or None if failed
         """
-        print(f"[Auto-Summarize] Starting for session {chat_session_id}, last {message_count} messages")
+        logger.debug(
+            "[Auto-Summarize] Starting for session %s, last %s messages",
+            chat_session_id, message_count,
+        )
         
         try:
-            # Get last N non-summary messages
-            rows = self.db.query(MemoryEntry).filter(
+            # Get last N non-summary messages — raw_text only (no ORM rows,
+            # no embedding vectors), streamed newest-first
+            stmt = select(MemoryEntry.raw_text).where(
                 MemoryEntry.project_id == str(project_id),
                 MemoryEntry.role_id == role_id,
                 MemoryEntry.chat_session_id == chat_session_id,
-                MemoryEntry.is_summary == False,
-                MemoryEntry.deleted == False
-            ).order_by(MemoryEntry.timestamp.desc()).limit(message_count).all()
-            
-            if not rows:
-                print("[Auto-Summarize] No messages found")
-                return None
-            
+                MemoryEntry.is_summary == False,  # noqa: E712
+                MemoryEntry.deleted == False,  # noqa: E712
+            ).order_by(MemoryEntry.timestamp.desc()).limit(message_count)
+
             # Convert to text list (newest last)
-            messages = []
-            for row in reversed(rows):
-                raw = safe_text(row.raw_text or "")
+            newest_last: deque = deque()
+            found = False
+            for raw_text in self.db.execute(stmt.execution_options(yield_per=64)).scalars():
+                found = True
+                raw = safe_text(raw_text or "")
                 if raw:
-                    messages.append(raw)
+                    newest_last.appendleft(raw)
+
+            if not found:
+                logger.debug("[Auto-Summarize] No messages found")
+                return None
+            messages = list(newest_last)
             
             if not messages:
-                print("[Auto-Summarize] No valid message text")
+                logger.debug("[Auto-Summarize] No valid message text")
                 return None
             
             # Create summary using existing function
@@ -895,9 +1267,9 @@ class MemoryManager:
                 is_ai_to_ai=False
             )
             
-            print(f"[Auto-Summarize] ✅ Created summary entry ID {summary_entry.id}")
+            logger.debug("[Auto-Summarize] ✅ Created summary entry ID %s", summary_entry.id)
             return summary_entry.id
             
         except Exception as e:
-            print(f"[Auto-Summarize Error] → {e}")
+            logger.warning("[Auto-Summarize Error] → %s", e)
             return None
@@ -1,8 +1,10 @@
 from datetime import datetime, timedelta
 from sqlalchemy import (
-    Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index, JSON
+    Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index, JSON, text
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.sql.expression import FunctionElement
 from passlib.hash import bcrypt
 
 # pgvector support (graceful import for SQLite compatibility)
@@ -14,6 +16,27 @@ except ImportError:
 
 Base = declarative_base()
 
+
+class utcnow(FunctionElement):
+    """
+    DB-side naive-UTC "now" (matches the datetime.utcnow() values stored
+    elsewhere). Evaluated per row at sub-second resolution, so rows written
+    by one statement still sort in insert order.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "(strftime('%Y-%m-%d %H:%M:%f', 'now'))"  # SQLite: UTC, milliseconds
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_pg(element, compiler, **kw):
+    # clock_timestamp(), not now(): now() is fixed for the whole transaction
+    return "(clock_timestamp() AT TIME ZONE 'utc')"
+
 __all__ = [
     "Base",
     "Role",
@@ -143,7 +166,10 @@ class MemoryEntry(Base):
     role_id = Column(Integer, ForeignKey("roles.id", ondelete="SET NULL"), nullable=True, index=True)
     chat_session_id = Column(String(255), nullable=True, index=True)
 
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # Stamped by the database clock, not each worker's: default= renders
+    # utcnow() into every ORM/Core INSERT (also on tables created before the
+    # server_default), server_default covers raw-SQL writers
+    timestamp = Column(DateTime, default=utcnow(), server_default=utcnow(), index=True)
     tokens = Column(Integer, nullable=True)
     summary = Column(Text, nullable=True)
     raw_text = Column(Text, nullable=True)
@@ -175,6 +201,15 @@ class MemoryEntry(Base):
     __table_args__ = (
         Index("ix_mem_role_proj_sess_time", "role_id", "project_id", "chat_session_id", "timestamp"),
         Index("ix_mem_proj_role_is_summary_time", "project_id", "role_id", "is_summary", "timestamp"),
+        # Role-wide "latest N" reads (no project filter): range scan, read backwards
+        Index("ix_memory_role_ts", "role_id", "timestamp"),
+        # get_last_session: newest row that belongs to a session (partial —
+        # session-less rows never enter the index)
+        Index(
+            "ix_mem_proj_role_ts_with_session", "project_id", "role_id", "timestamp",
+            postgresql_where=text("chat_session_id IS NOT NULL"),
+            sqlite_where=text("chat_session_id IS NOT NULL"),
+        ),
     )
 
     attachments = relationship(
@@ -1,25 +1,16 @@
 # File: app/memory/utils.py
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, List
 import unicodedata
 
 from sqlalchemy.orm import Session
 
+from app.config.settings import settings
 from app.memory.models import Project
 
-# ---- Optional tiktoken import (safe at import time) ----
-try:
-    import tiktoken  # type: ignore
-    try:
-        _ENC = tiktoken.get_encoding("o200k_base")
-    except Exception:
-        try:
-            _ENC = tiktoken.get_encoding("cl100k_base")
-        except Exception:
-            _ENC = None
-except Exception:
-    _ENC = None  # type: ignore
+# ---- Optional tiktoken encoding (shared, loaded on first use) ----
+from app.utils.tokenizer import get_encoding
 
 DEFAULT_MAX_MEMORY_TOKENS = 1000
 _CHARS_PER_TOKEN_APPROX = 4  # fallback heuristic
@@ -35,13 +26,14 @@ def count_tokens(text: str) -> int:
     if not text:
         return 0
 
-    if _ENC is None:
+    enc = get_encoding()
+    if enc is None:
         # ~4 chars per token rough heuristic
         tokens = max(1, len(text) // _CHARS_PER_TOKEN_APPROX)
         return tokens
 
     try:
-        return len(_ENC.encode(text))
+        return len(enc.encode(text))
     except Exception:
         # Defensive fallback; do not break the request pipeline.
         return max(1, len(text) // _CHARS_PER_TOKEN_APPROX)
@@ -65,17 +57,18 @@ def trim_memory(texts: Iterable[str], max_tokens: int = DEFAULT_MAX_MEMORY_TOKEN
 
     joined = "\n\n".join(pieces)
 
-    if _ENC is None:
+    enc = get_encoding()
+    if enc is None:
         # Heuristic fallback: slice last N*4 chars
         approx_chars = max_tokens * _CHARS_PER_TOKEN_APPROX
         tail = joined[-approx_chars:]
         return tail
 
     try:
-        toks = _ENC.encode(joined)
+        toks = enc.encode(joined)
         if len(toks) > max_tokens:
             toks = toks[-max_tokens:]
-        return _ENC.decode(toks)
+        return enc.decode(toks)
     except Exception as e:
         # If anything goes wrong, do not crash—fallback to simple tail slice
         print(f"[utils.trim_memory] decode fallback due to: {e}")
@@ -83,6 +76,27 @@ def trim_memory(texts: Iterable[str], max_tokens: int = DEFAULT_MAX_MEMORY_TOKEN
         return joined[-approx_chars:]
 
 
+# Stored sender → provider message role; any other sender is dropped
+SENDER_ROLES: Dict[str, str] = {
+    "user": "user",
+    "openai": "assistant",
+    "anthropic": "assistant",
+    "assistant": "assistant",
+    "final": "assistant",
+}
+
+
+def rows_to_messages(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Map retrieve_messages() rows → provider messages; keep only user/assistant turns."""
+    out: List[Dict[str, str]] = []
+    for r in rows:
+        role = SENDER_ROLES.get((r.get("sender") or "").strip().lower())
+        text = (r.get("text") or "").strip()
+        if role and text:
+            out.append({"role": role, "content": text})
+    return out
+
+
 def get_project_structure(db: Session, project_id: int) -> str:
     """
     Retrieve the project's `project_structure` markdown text, safely.
@@ -104,6 +118,34 @@ def get_project_structure(db: Session, project_id: int) -> str:
     return safe_text(text)
 
 
+_NORM_FORMS = {"NFC", "NFKC", "NFD", "NFKD"}
+UNICODE_NORM_FORM = (settings.UNICODE_NORM_FORM or "NFC").upper()
+if UNICODE_NORM_FORM not in _NORM_FORMS:
+    UNICODE_NORM_FORM = "NFC"
+
+# Lone surrogates (category Cs) are the only code points that can't be
+# UTF-8 encoded; translate() drops them without a Python-level char loop
+_SURROGATE_TABLE = dict.fromkeys(range(0xD800, 0xE000))
+
+
+def normalize_unicode(s: str) -> str:
+    """
+    Normalize to UNICODE_NORM_FORM (default NFC: composed, lossless, stable
+    for the tokenizer) and drop surrogates. ASCII is returned as-is — every
+    normalization form is a no-op on it. Already-normalized text (e.g. rows
+    this app wrote) costs two C-level scans: normalize()'s quick check and a
+    UTF-8 encode probe; the per-char translate() only runs on surrogates.
+    """
+    if s.isascii():
+        return s
+    s = unicodedata.normalize(UNICODE_NORM_FORM, s)
+    try:
+        s.encode("utf-8")
+    except UnicodeEncodeError:
+        return s.translate(_SURROGATE_TABLE)
+    return s
+
+
 def safe_text(s: str) -> str:
     """
     Remove invalid unicode (surrogates), normalize, and ensure UTF-8 safety.
@@ -113,11 +155,7 @@ def safe_text(s: str) -> str:
         s = str(s or "")
 
     try:
-        # Normalize and drop surrogate characters
-        s = unicodedata.normalize("NFKD", s)
-        s = "".join(c for c in s if unicodedata.category(c) != "Cs")
-        # Ensure it's valid utf-8
-        return s.encode("utf-8", "ignore").decode("utf-8")
+        return normalize_unicode(s)
     except Exception as e:
         print(f"[safe_text warning] {e}")
         return ""
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app.memory.manager import MemoryManager
 from app.memory.utils import get_project_structure
+from app.utils.tokenizer import get_encoding
 
 # Settings (with safe fallbacks)
 try:
@@ -26,11 +27,9 @@ def _count_tokens(text: str) -> int:
     - Falls back to a rough heuristic if not
     """
     try:
-        import tiktoken  # local import to avoid hard dep at import-time
-        try:
-            enc = tiktoken.get_encoding("o200k_base")
-        except Exception:
-            enc = tiktoken.get_encoding("cl100k_base")
+        enc = get_encoding()
+        if enc is None:
+            raise RuntimeError("tiktoken unavailable")
         return len(enc.encode(text or ""))
     except Exception:
         s = text or ""
@@ -1,6 +1,9 @@
 # app/providers/claude_provider.py
 from __future__ import annotations
+import asyncio
 import os
+import random
+import re
 from typing import Any, List, Optional
 from tenacity import retry, stop_after_attempt, wait_exponential
 
@@ -11,14 +14,19 @@ try:
 except Exception:
     _SETTINGS_OK = False
 
+from app.cache.exact import cached_completion
+from app.providers.errors import ProviderErrorText
+
 # ---------------- Type-safe imports / fallbacks ----------------
 try:
     from anthropic import Anthropic  # type: ignore
+    from anthropic import AsyncAnthropic  # type: ignore
     from anthropic import APIError as _AnthropicAPIError  # type: ignore
     from anthropic import RateLimitError as _AnthropicRateLimitError  # type: ignore
     _HAVE_ANTHROPIC = True
 except Exception:  # pragma: no cover
     Anthropic = None  # type: ignore
+    AsyncAnthropic = None  # type: ignore
     _AnthropicAPIError = Exception  # type: ignore
     _AnthropicRateLimitError = Exception  # type: ignore
     _HAVE_ANTHROPIC = False
@@ -36,8 +44,13 @@ MAX_TOKENS = int(os.getenv("ANTHROPIC_MAX_TOKENS", "8192"))
 TEMPERATURE = float(os.getenv("ANTHROPIC_TEMPERATURE", "0.7"))
 MAX_RETRIES = int(os.getenv("ANTHROPIC_MAX_RETRIES", "3"))
 TIMEOUT_SECS = float(os.getenv("ANTHROPIC_TIMEOUT", "120"))
+# Max concurrent async Claude requests per worker (queue instead of 429 storms)
+CONCURRENCY = max(1, int(os.getenv("ANTHROPIC_CONCURRENCY", "50")))
 
 _client: Optional[Any] = None
+_async_client: Optional[Any] = None
+_async_http: Optional[Any] = None  # shared httpx.AsyncClient pool
+_async_sem = asyncio.Semaphore(CONCURRENCY)
 
 
 def _get_client() -> Any:
@@ -175,6 +188,83 @@ def _normalize_messages(messages: List[dict]) -> List[dict]:
     return out
 
 
+def _build_request(
+    messages: List[dict],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    system: Optional[str],
+    cache_system: bool,
+) -> dict:
+    """messages.create kwargs with clamped params (shared by sync/async)."""
+    normalized = _normalize_messages(messages)
+    
+    # Clamp params
+    try:
+        temperature = float(temperature)
+    except Exception:
+        temperature = TEMPERATURE
+    temperature = max(0.0, min(1.0, temperature))
+
+    try:
+        max_tokens = int(max_tokens)
+    except Exception:
+        max_tokens = MAX_TOKENS
+    max_tokens = max(1, max_tokens)
+
+    kwargs: dict = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "messages": normalized,
+    }
+    if system and cache_system:
+        kwargs["system"] = [
+            {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+        ]
+    elif system:
+        kwargs["system"] = system
+    return kwargs
+
+
+def _response_text(response: Any, model: str, max_tokens: int) -> str:
+    """Extract text (or a guarded error string) and log usage."""
+    if not response or not getattr(response, "content", None):
+        print("⚠️ [Claude Warning] Empty response from API")
+        return ProviderErrorText("[Claude Error] No content in response")
+
+    # Extract text
+    content = getattr(response, "content", [])
+    if isinstance(content, list) and content:
+        first = content[0]
+        if hasattr(first, "text"):
+            text = str(getattr(first, "text", "")).strip()
+        elif isinstance(first, dict) and "text" in first:
+            text = str(first["text"]).strip()
+        else:
+            text = str(first).strip()
+    else:
+        text = str(content).strip()
+
+    if not text:
+        print("⚠️ [Claude Warning] No text content in response")
+        return ProviderErrorText("[Claude Error] No text content")
+
+    # Usage log (best effort)
+    try:
+        usage = getattr(response, "usage", None)
+        if usage:
+            in_toks = getattr(usage, "input_tokens", None)
+            out_toks = getattr(usage, "output_tokens", None)
+            print(f"✅ [Claude] model={model} max_tokens={max_tokens} usage in={in_toks} out={out_toks}")
+        else:
+            print(f"✅ [Claude] model={model} max_tokens={max_tokens}")
+    except Exception:
+        pass
+
+    return text
+
+
 @retry(
     stop=stop_after_attempt(5),
     wait=wait_exponential(multiplier=2, min=4, max=30),
@@ -187,83 +277,139 @@ def ask_claude(
     max_tokens: int = MAX_TOKENS,
     system: Optional[str] = None,
     api_key: Optional[str] = None,
+    cache_system: bool = False,
 ) -> str:
     """
     Chat wrapper with robust fallbacks and retry logic.
+
+    cache_system=True marks the system prompt as an ephemeral cache breakpoint,
+    so a static system prompt is billed/prefilled once and reused across calls.
     """
     try:
         # Use user-provided API key if available, otherwise use env/cached client
         client = _get_client_with_key(api_key) if api_key else _get_client()
-        normalized = _normalize_messages(messages)
-        
-        # Clamp params
-        try:
-            temperature = float(temperature)
-        except Exception:
-            temperature = TEMPERATURE
-        temperature = max(0.0, min(1.0, temperature))
+        kwargs = _build_request(messages, model, temperature, max_tokens, system, cache_system)
+        response = client.messages.create(**kwargs)  # type: ignore[attr-defined]
+        return _response_text(response, model, kwargs["max_tokens"])
 
-        try:
-            max_tokens = int(max_tokens)
-        except Exception:
-            max_tokens = MAX_TOKENS
-        max_tokens = max(1, max_tokens)
-
-        kwargs: dict = {
-            "model": model,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "messages": normalized,
-        }
-        if system:
-            kwargs["system"] = system
+    except _AnthropicRateLimitError as e:  # type: ignore[name-defined]
+        print(f"❌ [Claude Rate Limit] {e}")
+        return ProviderErrorText(f"[Claude Error] Rate limit exceeded: {str(e)}")
+    except _AnthropicAPIError as e:  # type: ignore[name-defined]
+        print(f"❌ [Claude API Error] {e}")
+        return ProviderErrorText(f"[Claude Error] API failure: {str(e)}")
+    except RuntimeError as e:
+        print(f"❌ [Claude Config Error] {e}")
+        return ProviderErrorText(f"[Claude Error] {str(e)}")
+    except Exception as e:
+        print(f"❌ [Claude Unexpected Error] {e}")
+        return ProviderErrorText(f"[Claude Error] {str(e)}")
 
-        response = client.messages.create(**kwargs)  # type: ignore[attr-defined]
 
-        if not response or not getattr(response, "content", None):
-            print("⚠️ [Claude Warning] Empty response from API")
-            return "[Claude Error] No content in response"
-
-        # Extract text
-        content = getattr(response, "content", [])
-        if isinstance(content, list) and content:
-            first = content[0]
-            if hasattr(first, "text"):
-                text = str(getattr(first, "text", "")).strip()
-            elif isinstance(first, dict) and "text" in first:
-                text = str(first["text"]).strip()
-            else:
-                text = str(first).strip()
-        else:
-            text = str(content).strip()
+# ---------------- Native async path ----------------
 
-        if not text:
-            print("⚠️ [Claude Warning] No text content in response")
-            return "[Claude Error] No text content"
+def _get_async_client(api_key: Optional[str] = None) -> Any:
+    """AsyncAnthropic on one pooled httpx.AsyncClient; cached for the env key."""
+    global _async_client, _async_http
+    if not _HAVE_ANTHROPIC:
+        raise RuntimeError(
+            "[Claude Error] anthropic package not installed; cannot create client"
+        )
+    if not api_key and _async_client is not None:
+        return _async_client
 
-        # Usage log (best effort)
-        try:
-            usage = getattr(response, "usage", None)
-            if usage:
-                in_toks = getattr(usage, "input_tokens", None)
-                out_toks = getattr(usage, "output_tokens", None)
-                print(f"✅ [Claude] model={model} max_tokens={max_tokens} usage in={in_toks} out={out_toks}")
-            else:
-                print(f"✅ [Claude] model={model} max_tokens={max_tokens}")
-        except Exception:
-            pass
+    key = api_key or os.getenv("ANTHROPIC_API_KEY")
+    if not key:
+        raise RuntimeError("[Claude Error] Missing ANTHROPIC_API_KEY in environment")
 
-        return text
+    if _async_http is None:
+        import httpx
+
+        _async_http = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout=120.0, connect=30.0, read=90.0, write=30.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=30.0),
+        )
+
+    client = AsyncAnthropic(
+        api_key=key,
+        base_url=os.getenv("ANTHROPIC_BASE_URL") or None,
+        http_client=_async_http,
+        max_retries=0,  # ask_claude_async_retry owns retries
+    )  # type: ignore[call-arg]
+    if not api_key:
+        _async_client = client
+    return client
+
+
+@cached_completion("anthropic")
+async def ask_claude_async(
+    messages: List[dict],
+    model: str = DEFAULT_MODEL,
+    temperature: float = TEMPERATURE,
+    max_tokens: int = MAX_TOKENS,
+    system: Optional[str] = None,
+    api_key: Optional[str] = None,
+    cache_system: bool = False,
+) -> str:
+    """Awaitable ask_claude() on AsyncAnthropic — same guarded-string contract."""
+    try:
+        client = _get_async_client(api_key)
+        kwargs = _build_request(messages, model, temperature, max_tokens, system, cache_system)
+        async with _async_sem:
+            response = await client.messages.create(**kwargs)  # type: ignore[attr-defined]
+        return _response_text(response, model, kwargs["max_tokens"])
 
     except _AnthropicRateLimitError as e:  # type: ignore[name-defined]
         print(f"❌ [Claude Rate Limit] {e}")
-        return f"[Claude Error] Rate limit exceeded: {str(e)}"
+        return ProviderErrorText(f"[Claude Error] Rate limit exceeded: {str(e)}")
     except _AnthropicAPIError as e:  # type: ignore[name-defined]
         print(f"❌ [Claude API Error] {e}")
-        return f"[Claude Error] API failure: {str(e)}"
+        return ProviderErrorText(f"[Claude Error] API failure: {str(e)}")
     except RuntimeError as e:
         print(f"❌ [Claude Config Error] {e}")
-        return f"[Claude Error] {str(e)}"
+        return ProviderErrorText(f"[Claude Error] {str(e)}")
     except Exception as e:
         print(f"❌ [Claude Unexpected Error] {e}")
-        return f"[Claude Error] {str(e)}"
+        return ProviderErrorText(f"[Claude Error] {str(e)}")
+
+
+# ---------------- Retry classification ----------------
+# Statuses worth another attempt: timeouts, conflicts, rate limits, 5xx and
+# 529 "overloaded". 4xx auth/validation errors fail the same way every time.
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+_STATUS_RE = re.compile(r"error code:\s*(\d{3})", re.IGNORECASE)
+_TRANSIENT_HINTS = ("overloaded", "rate limit", "timed out", "timeout", "connection error")
+
+
+def is_retryable_error(answer: Optional[str]) -> bool:
+    """True for guarded "[Claude Error] ..." answers that may succeed on retry."""
+    low = (answer or "").lower()
+    m = _STATUS_RE.search(low)
+    if m:
+        return int(m.group(1)) in _RETRYABLE_STATUS
+    return any(h in low for h in _TRANSIENT_HINTS)
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter before retry number attempt+1."""
+    return min(30.0, 1.5 * 2 ** attempt) + random.random()
+
+
+async def ask_claude_async_retry(messages: List[dict], retries: int = 2, **kwargs: Any) -> str:
+    """
+    ask_claude_async() with retries only for transient failures, using
+    exponential backoff with jitter. Non-retryable errors return at once.
+    """
+    last = ""
+    for attempt in range(retries + 1):
+        try:
+            ans = await ask_claude_async(messages, **kwargs)
+        except Exception as e:
+            ans = ProviderErrorText(f"[Claude Exception] {e}")
+        last = ans or ""
+        if ans and not isinstance(ans, ProviderErrorText):
+            return ans
+        if attempt == retries or (ans and not is_retryable_error(ans)):
+            break
+        await asyncio.sleep(retry_delay(attempt))
+    return last or ProviderErrorText("[Claude Retry Failed]")
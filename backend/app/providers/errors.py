@@ -0,0 +1,17 @@
+"""
+Typed failure answers from the provider wrappers.
+
+The wrappers keep their str contract — callers that only display or store
+the reply still get the same "[OpenAI Error] ..." text — but a failure is
+a ProviderErrorText, so caches and retry loops can tell it apart from a
+real answer by type instead of by matching the text.
+"""
+
+
+class ProviderErrorText(str):
+    """Guarded error message returned in place of a model answer."""
+
+    __slots__ = ()
+
+
+__all__ = ["ProviderErrorText"]
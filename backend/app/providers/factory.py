@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import os
+from dataclasses import replace
 from typing import List, Optional, Dict, Any
 
 from app.config.settings import settings
-from app.config.model_registry import MODEL_REGISTRY
+from app.config.model_registry import MODEL_REGISTRY, ModelInfo, get_model
 from app.providers.openai_provider import ask_openai
 from app.providers.claude_provider import ask_claude
 from app.providers.glm_provider import ask_glm
+from app.providers.errors import ProviderErrorText
 
 
 def _normalize_messages(messages: List[dict]) -> List[Dict[str, str]]:
@@ -43,7 +45,7 @@ def _ensure_user_last(msgs: List[Dict[str, str]]) -> List[Dict[str, str]]:
 
 def _is_bad(answer: Optional[str]) -> bool:
     """Treat empty/error/overload responses as bad."""
-    if not answer or not str(answer).strip():
+    if not answer or not str(answer).strip() or isinstance(answer, ProviderErrorText):
         return True
     s = str(answer).strip()
     low = s.lower()
@@ -64,7 +66,7 @@ def _registry_key_for_model_name(model_name: Optional[str]) -> Optional[str]:
     if not model_name:
         return None
     for k, v in MODEL_REGISTRY.items():
-        if v.get("model") == model_name:
+        if v.model == model_name:
             return k
     return None
 
@@ -133,6 +135,7 @@ def ask_model(
     temperature: float = 0.7,
     max_tokens: int = 4096,
     api_key: Optional[str] = None,
+    cache_system: bool = False,
 ) -> str:
     """
     Unified LLM caller. Picks provider+model via registry key and adds resilience:
@@ -141,31 +144,32 @@ def ask_model(
       • single repair retry for other failure modes
       • provider-level registry fallback if needed
       • (OpenAI) optionally omits temperature for reasoning families
+      • (Anthropic) cache_system=True marks a static system prompt cacheable;
+        OpenAI caches long identical prefixes automatically
     """
     # Resolve primary registry entry
     requested_key = (model_key or settings.DEFAULT_MODEL) or ""
-    info = MODEL_REGISTRY.get(requested_key)
+    info: Optional[ModelInfo] = get_model(requested_key)
     if not info:
         fallback_key = settings.DEFAULT_MODEL
-        info = MODEL_REGISTRY.get(fallback_key)
+        info = get_model(fallback_key)
         print(f"⚠️ Unknown model_key '{requested_key}'. Falling back to '{fallback_key}'.")
         if not info:
             raise RuntimeError("MODEL_REGISTRY missing DEFAULT_MODEL mapping")
         
     # TEMPORARY FIX: Override max_tokens for Claude models
-    if info and info.get("provider") == "anthropic":
-        current_tokens = info.get("max_tokens", 0)
+    if info and info.provider == "anthropic":
+        current_tokens = info.max_tokens
         if current_tokens < 8192:
             print(f"⚠️ [OVERRIDE] Claude max_tokens {current_tokens} → 8192")
-            info = dict(info)  # Make mutable copy
-            info["max_tokens"] = 8192
+            info = replace(info, max_tokens=8192)  # frozen → overridden copy
 
-    provider = info["provider"]
-    model = info["model"]
-    temp = float(info.get("temperature", temperature))
+    provider = info.provider
+    model = info.model
+    temp = float(info.temperature if info.temperature is not None else temperature)
     # Use passed max_tokens if explicitly provided (not default 4096)
     # Otherwise fall back to registry value
-    registry_tokens = int(info.get("max_tokens", 4096))
+    registry_tokens = int(info.max_tokens)
     out_tokens = max_tokens if max_tokens != 4096 else registry_tokens
 
     print(f"📊 [TOKENS] Requested: {max_tokens}, Registry: {registry_tokens}, Using: {out_tokens}")
@@ -199,6 +203,7 @@ def ask_model(
             "system": sys_prompt,
             "temperature": temp,
             "max_tokens": out_tokens,
+            "cache_system": cache_system,
         }
         if api_key:
             claude_kwargs["api_key"] = api_key
@@ -220,15 +225,15 @@ def ask_model(
     # Immediate fast-fallback on Anthropic overload (avoid looping)
     if provider == "anthropic" and getattr(settings, "CLAUDE_OVERLOAD_SHORTCIRCUIT", True) and _is_overloaded(answer):
         fb_key = _fallback_key_for_provider(provider)
-        if fb_key and fb_key in MODEL_REGISTRY:
-            fb = MODEL_REGISTRY[fb_key]
-            print(f"🛟 Anthropic overloaded → switching immediately to fallback '{fb_key}' ({fb['model']})")
+        fb = get_model(fb_key)
+        if fb:
+            print(f"🛟 Anthropic overloaded → switching immediately to fallback '{fb_key}' ({fb.model})")
             return ask_claude(
                 messages=norm_messages,
-                model=fb["model"],
+                model=fb.model,
                 system=sys_prompt,
-                temperature=float(fb.get("temperature", temp)),
-                max_tokens=int(fb.get("max_tokens", out_tokens)),
+                temperature=float(fb.temperature if fb.temperature is not None else temp),
+                max_tokens=int(fb.max_tokens),
             )
 
     if not _is_bad(answer):
@@ -258,6 +263,7 @@ def ask_model(
             "system": sys_prompt,
             "temperature": temp,
             "max_tokens": out_tokens,
+            "cache_system": cache_system,
         }
         if api_key:
             claude_kwargs2["api_key"] = api_key
@@ -276,15 +282,15 @@ def ask_model(
 
     if provider == "anthropic" and getattr(settings, "CLAUDE_OVERLOAD_SHORTCIRCUIT", True) and _is_overloaded(answer2):
         fb_key = _fallback_key_for_provider(provider)
-        if fb_key and fb_key in MODEL_REGISTRY:
-            fb = MODEL_REGISTRY[fb_key]
-            print(f"🛟 Anthropic overloaded (retry) → switching to fallback '{fb_key}' ({fb['model']})")
+        fb = get_model(fb_key)
+        if fb:
+            print(f"🛟 Anthropic overloaded (retry) → switching to fallback '{fb_key}' ({fb.model})")
             claude_fb_kwargs: Dict[str, Any] = {
                 "messages": repaired,
-                "model": fb["model"],
+                "model": fb.model,
                 "system": sys_prompt,
-                "temperature": float(fb.get("temperature", temp)),
-                "max_tokens": int(fb.get("max_tokens", out_tokens)),
+                "temperature": float(fb.temperature if fb.temperature is not None else temp),
+                "max_tokens": int(fb.max_tokens),
             }
             if api_key:
                 claude_fb_kwargs["api_key"] = api_key
@@ -295,18 +301,18 @@ def ask_model(
 
     # ---- attempt #3: provider-level fallback model
     fb_key = _fallback_key_for_provider(provider)
-    if fb_key and fb_key in MODEL_REGISTRY:
-        fb = MODEL_REGISTRY[fb_key]
-        print(f"🛟 Switching to provider fallback '{fb_key}' → model={fb['model']}")
+    fb = get_model(fb_key)
+    if fb:
+        print(f"🛟 Switching to provider fallback '{fb_key}' → model={fb.model}")
         if provider == "openai":
             openai_kwargs3: Dict[str, Any] = {
                 "messages": repaired,
-                "model": fb["model"],
-                "max_tokens": int(fb.get("max_tokens", out_tokens)),
+                "model": fb.model,
+                "max_tokens": int(fb.max_tokens),
                 "system_prompt": sys_prompt,
             }
-            if not (_OMIT_TEMP_FOR_REASONING and _is_reasoning_model(fb["model"])):
-                openai_kwargs3["temperature"] = float(fb.get("temperature", temp))
+            if not (_OMIT_TEMP_FOR_REASONING and _is_reasoning_model(fb.model)):
+                openai_kwargs3["temperature"] = float(fb.temperature if fb.temperature is not None else temp)
             if getattr(settings, "JSON_MODE_DEFAULT", False):
                 openai_kwargs3["json_mode"] = True
             if api_key:
@@ -315,10 +321,10 @@ def ask_model(
         elif provider == "anthropic":
             claude_kwargs3: Dict[str, Any] = {
                 "messages": repaired,
-                "model": fb["model"],
+                "model": fb.model,
                 "system": sys_prompt,
-                "temperature": float(fb.get("temperature", temp)),
-                "max_tokens": int(fb.get("max_tokens", out_tokens)),
+                "temperature": float(fb.temperature if fb.temperature is not None else temp),
+                "max_tokens": int(fb.max_tokens),
             }
             if api_key:
                 claude_kwargs3["api_key"] = api_key
@@ -326,10 +332,10 @@ def ask_model(
         else:  # glm
             glm_kwargs3: Dict[str, Any] = {
                 "messages": repaired,
-                "model": fb["model"],
+                "model": fb.model,
                 "system": sys_prompt,
-                "temperature": float(fb.get("temperature", temp)),
-                "max_tokens": int(fb.get("max_tokens", out_tokens)),
+                "temperature": float(fb.temperature if fb.temperature is not None else temp),
+                "max_tokens": int(fb.max_tokens),
             }
             if api_key:
                 glm_kwargs3["api_key"] = api_key
@@ -338,4 +344,4 @@ def ask_model(
             return str(answer3).strip()
 
     print(f"❌ Fallbacks exhausted for provider={provider}. Returning guarded error text.")
-    return f"[{provider.capitalize()} Error] Unable to produce a text answer right now."
+    return ProviderErrorText(f"[{provider.capitalize()} Error] Unable to produce a text answer right now.")
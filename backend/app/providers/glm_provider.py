@@ -10,6 +10,8 @@ from typing import Any, List, Optional
 
 import httpx
 
+from app.providers.errors import ProviderErrorText
+
 try:
     from app.config.settings import settings
     _SETTINGS_OK = True
@@ -75,7 +77,7 @@ def ask_glm(
 ) -> str:
     resolved_api_key = api_key or _resolve("GLM_API_KEY", "GLM_API_KEY", "")
     if not resolved_api_key:
-        return "[GLM Error] Missing GLM_API_KEY in environment"
+        return ProviderErrorText("[GLM Error] Missing GLM_API_KEY in environment")
 
     base_url = _resolve("GLM_BASE_URL", "GLM_BASE_URL", _DEFAULT_BASE_URL)
     resolved_model = model or _resolve("GLM_MODEL", "GLM_MODEL", _DEFAULT_MODEL)
@@ -110,7 +112,7 @@ def ask_glm(
             text = str(content).strip()
 
         if not text:
-            return "[GLM Error] No text content"
+            return ProviderErrorText("[GLM Error] No text content")
 
         try:
             usage = getattr(response, "usage", None)
@@ -125,7 +127,7 @@ def ask_glm(
 
     except RuntimeError as e:
         print(f"❌ [GLM Config Error] {e}")
-        return f"[GLM Error] {str(e)}"
+        return ProviderErrorText(f"[GLM Error] {str(e)}")
     except Exception as e:
         print(f"❌ [GLM Unexpected Error] {e}")
-        return f"[GLM Error] {str(e)}"
+        return ProviderErrorText(f"[GLM Error] {str(e)}")
@@ -1,6 +1,7 @@
 # app/providers/openai_provider.py
 from __future__ import annotations
 
+import asyncio
 import os
 from typing import Any, List, Optional, Dict
 
@@ -14,15 +15,20 @@ try:
 except Exception:
     _SETTINGS_OK = False
 
+from app.cache.exact import cached_completion
+from app.providers.errors import ProviderErrorText
+
 # ---------------- Type-safe imports / fallbacks ----------------
 try:
     from openai import OpenAI as _RuntimeOpenAIClient  # type: ignore
+    from openai import AsyncOpenAI as _RuntimeAsyncOpenAIClient  # type: ignore
     from openai import APIError as _RuntimeAPIError  # type: ignore
     from openai import AuthenticationError as _RuntimeAuthError  # type: ignore
     from openai import RateLimitError as _RuntimeRateLimitError  # type: ignore
     _HAVE_OPENAI = True
 except Exception:  # pragma: no cover
     _RuntimeOpenAIClient = None  # type: ignore
+    _RuntimeAsyncOpenAIClient = None  # type: ignore
     _RuntimeAPIError = Exception  # type: ignore
     _RuntimeAuthError = Exception  # type: ignore
     _RuntimeRateLimitError = Exception  # type: ignore
@@ -41,6 +47,9 @@ MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "4096"))
 TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
 MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
 TIMEOUT_SECS = float(os.getenv("OPENAI_TIMEOUT", "60"))
+# Max concurrent async OpenAI requests per worker: bursts queue here instead
+# of turning into 429s + retries upstream
+CONCURRENCY = max(1, int(os.getenv("OPENAI_CONCURRENCY", "50")))
 
 # JSON mode default (settings) or env override
 JSON_MODE_DEFAULT = (
@@ -52,6 +61,9 @@ JSON_MODE = JSON_MODE_DEFAULT or JSON_MODE_ENV
 FORCE_TEXT_ONLY = (os.getenv("OPENAI_FORCE_TEXT_RESPONSES") or "").strip().lower() in {"1", "true", "yes", "on"}
 
 _client: Optional[Any] = None  # lazy singleton
+_async_client: Optional[Any] = None  # lazy singleton (AsyncOpenAI)
+_async_sem = asyncio.Semaphore(CONCURRENCY)
+_async_http: Optional[httpx.AsyncClient] = None  # shared connection pool
 
 
 def _get_client() -> Any:
@@ -442,10 +454,10 @@ def ask_openai(
                             )
                         except Exception as e3:
                             print(f"❌ [OpenAI] Chat->Responses retry failed. first={e1} second={e2} third={e3}")
-                            return f"[OpenAI Error] {e3}"
+                            return ProviderErrorText(f"[OpenAI Error] {e3}")
                     else:
                         print(f"❌ [OpenAI] Retry failed. first={e1} second={e2}")
-                        return f"[OpenAI Error] {e2}"
+                        return ProviderErrorText(f"[OpenAI Error] {e2}")
             elif responses_hint:
                 try:
                     resp = _call_responses_create(
@@ -460,10 +472,10 @@ def ask_openai(
                     )
                 except Exception as e2:
                     print(f"❌ [OpenAI] Responses API call failed: {e2}")
-                    return f"[OpenAI Error] {e2}"
+                    return ProviderErrorText(f"[OpenAI Error] {e2}")
             else:
                 print(f"❌ [OpenAI] Call failed: {e1}")
-                return f"[OpenAI Error] {e1}"
+                return ProviderErrorText(f"[OpenAI Error] {e1}")
 
         # Extract text from either API path
         text = ""
@@ -499,19 +511,19 @@ def ask_openai(
 
     except _RuntimeAuthError as e:  # type: ignore[name-defined]
         print(f"❌ [OpenAI Auth Error] {e}")
-        return f"[OpenAI Error] Invalid API key: {str(e)}"
+        return ProviderErrorText(f"[OpenAI Error] Invalid API key: {str(e)}")
     except _RuntimeRateLimitError as e:  # type: ignore[name-defined]
         print(f"❌ [OpenAI Rate Limit] {e}")
-        return f"[OpenAI Error] Rate limit exceeded: {str(e)}"
+        return ProviderErrorText(f"[OpenAI Error] Rate limit exceeded: {str(e)}")
     except _RuntimeAPIError as e:  # type: ignore[name-defined]
         print(f"❌ [OpenAI API Error] {e}")
-        return f"[OpenAI Error] API failure: {str(e)}"
+        return ProviderErrorText(f"[OpenAI Error] API failure: {str(e)}")
     except RuntimeError as e:
         print(f"❌ [OpenAI Config Error] {e}")
-        return f"[OpenAI Error] {str(e)}"
+        return ProviderErrorText(f"[OpenAI Error] {str(e)}")
     except Exception as e:
         print(f"❌ [OpenAI Unexpected Error] {e}")
-        return f"[OpenAI Error] {str(e)}"
+        return ProviderErrorText(f"[OpenAI Error] {str(e)}")
 
 
 def _fallback_plain_text(client: Any, *, fallback_messages: List[dict]) -> str:
@@ -550,14 +562,159 @@ def _fallback_plain_text(client: Any, *, fallback_messages: List[dict]) -> str:
 
         resp2 = client2.chat.completions.create(**kwargs)  # type: ignore[attr-defined]
         if not resp2 or not getattr(resp2, "choices", None):
-            return "[OpenAI Error] Empty response from fallback model"
+            return ProviderErrorText("[OpenAI Error] Empty response from fallback model")
 
         text2 = _extract_text_from_choice(resp2.choices[0]).strip()
         if not text2:
             print("⚠️ [OpenAI Warning] Fallback also had no content")
-            return "[OpenAI Error] No content in response"
+            return ProviderErrorText("[OpenAI Error] No content in response")
         print(f"✅ [OpenAI] Fallback model={fb_model} produced text")
         return text2
     except Exception as e:
         print(f"❌ [OpenAI Fallback Error] {e}")
-        return f"[OpenAI Error] {e}"
+        return ProviderErrorText(f"[OpenAI Error] {e}")
+
+
+# ---------------- Native async path ----------------
+
+def _get_async_http() -> httpx.AsyncClient:
+    """One pooled AsyncClient shared by every AsyncOpenAI instance (incl. BYOK)."""
+    global _async_http
+    if _async_http is None:
+        _async_http = httpx.AsyncClient(
+            timeout=httpx.Timeout(TIMEOUT_SECS, connect=10.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+            trust_env=False,  # same as the sync client: ignore proxy env
+        )
+    return _async_http
+
+
+def _get_async_client(api_key: Optional[str] = None) -> Any:
+    """AsyncOpenAI client: cached for the env key, per-call for BYOK keys."""
+    global _async_client
+    if not _HAVE_OPENAI:
+        raise RuntimeError("[OpenAI Error] openai package not installed; cannot create client")
+
+    if not api_key and _async_client is not None:
+        return _async_client
+
+    key = api_key or os.getenv("CHATITNOW_API_KEY") or os.getenv("OPENAI_API_KEY")
+    if not key:
+        raise RuntimeError("[OpenAI Error] API key not configured (CHATITNOW_API_KEY or OPENAI_API_KEY)")
+
+    client = _RuntimeAsyncOpenAIClient(
+        api_key=key,
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        organization=os.getenv("OPENAI_ORG") or None,
+        http_client=_get_async_http(),
+    )
+    if not api_key:
+        _async_client = client
+    return client
+
+
+@cached_completion("openai")
+async def ask_openai_async(
+    messages: List[dict],
+    model: str = DEFAULT_MODEL,
+    temperature: float = TEMPERATURE,
+    max_tokens: int = MAX_TOKENS,
+    system_prompt: Optional[str] = None,
+    *,
+    json_mode: Optional[bool] = None,
+    force_text_only: Optional[bool] = None,
+    api_key: Optional[str] = None,
+) -> str:
+    """
+    Awaitable ask_openai(): Chat Completions on AsyncOpenAI, no threadpool hop.
+    Same contract — returns text or an "[OpenAI Error] ..." string. The rare
+    paths (Responses API, empty-content fallback) delegate to the sync
+    wrapper in a worker thread.
+    """
+    sync_kwargs: Dict[str, Any] = dict(
+        model=model, temperature=temperature, max_tokens=max_tokens,
+        system_prompt=system_prompt, json_mode=json_mode,
+        force_text_only=force_text_only, api_key=api_key,
+    )
+    try:
+        client = _get_async_client(api_key)
+        final_messages = _build_messages(messages, system_prompt, force_text_only=bool(force_text_only))
+
+        try:
+            temperature = max(0.0, min(2.0, float(temperature)))
+        except Exception:
+            temperature = TEMPERATURE
+        try:
+            max_tokens = max(1, int(max_tokens))
+        except Exception:
+            max_tokens = MAX_TOKENS
+
+        use_completion = _should_use_max_completion_tokens(model)
+        include_temp = _supports_temperature(model)
+        json_mode_flag = JSON_MODE if json_mode is None else bool(json_mode)
+
+        def _kwargs(include_temp: bool, use_completion: bool) -> Dict[str, Any]:
+            kw: Dict[str, Any] = {"model": model, "messages": final_messages, "timeout": TIMEOUT_SECS}
+            if include_temp:
+                kw["temperature"] = temperature
+            kw["max_completion_tokens" if use_completion else "max_tokens"] = max_tokens
+            if json_mode_flag:
+                kw["response_format"] = {"type": "json_object"}
+            return kw
+
+        async def _create(kw: Dict[str, Any]) -> Any:
+            async with _async_sem:
+                return await client.chat.completions.create(**kw)
+
+        try:
+            resp = await _create(_kwargs(include_temp, use_completion))
+        except Exception as e1:
+            msg = str(e1).lower()
+            param_err = ("unsupported parameter" in msg or "unrecognized request argument" in msg) and \
+                        ("max_tokens" in msg or "max_completion_tokens" in msg)
+            temp_err = ("unsupported value" in msg and "temperature" in msg) or \
+                       ("does not support" in msg and "temperature" in msg)
+            if not (param_err or temp_err):
+                if "responses" in msg:
+                    # Responses-API-only model: the sync wrapper handles that path
+                    return await asyncio.to_thread(ask_openai, messages, **sync_kwargs)
+                raise  # auth / rate limit / API errors → typed handlers below
+            try:
+                resp = await _create(_kwargs(
+                    False if temp_err else include_temp,
+                    (not use_completion) if param_err else use_completion,
+                ))
+            except Exception as e2:
+                if "responses" not in str(e2).lower():
+                    raise
+                return await asyncio.to_thread(ask_openai, messages, **sync_kwargs)
+
+        text = _extract_text_from_choice(resp.choices[0]).strip() if getattr(resp, "choices", None) else ""
+        if not text:
+            print("⚠️ [OpenAI Warning] No text content; trying fallback plain-text pass")
+            return await asyncio.to_thread(_fallback_plain_text, _get_client_with_key(api_key) if api_key else _get_client(),
+                                           fallback_messages=final_messages)
+
+        usage = getattr(resp, "usage", None)
+        if usage:
+            print(f"✅ [OpenAI] model={model} out≤{max_tokens} usage total={getattr(usage, 'total_tokens', None)} "
+                  f"prompt={getattr(usage, 'prompt_tokens', None)} completion={getattr(usage, 'completion_tokens', None)}")
+        else:
+            print(f"✅ [OpenAI] model={model} out≤{max_tokens}")
+        return text
+
+    except _RuntimeAuthError as e:  # type: ignore[name-defined]
+        print(f"❌ [OpenAI Auth Error] {e}")
+        return ProviderErrorText(f"[OpenAI Error] Invalid API key: {str(e)}")
+    except _RuntimeRateLimitError as e:  # type: ignore[name-defined]
+        print(f"❌ [OpenAI Rate Limit] {e}")
+        return ProviderErrorText(f"[OpenAI Error] Rate limit exceeded: {str(e)}")
+    except _RuntimeAPIError as e:  # type: ignore[name-defined]
+        print(f"❌ [OpenAI API Error] {e}")
+        return ProviderErrorText(f"[OpenAI Error] API failure: {str(e)}")
+    except RuntimeError as e:
+        print(f"❌ [OpenAI Config Error] {e}")
+        return ProviderErrorText(f"[OpenAI Error] {str(e)}")
+    except Exception as e:
+        print(f"❌ [OpenAI Unexpected Error] {e}")
+        return ProviderErrorText(f"[OpenAI Error] {str(e)}")
@@ -10,6 +10,8 @@ from typing import AsyncIterator, List, Optional, Dict, Any
 
 import httpx
 
+from app.providers.errors import ProviderErrorText
+
 # ---------------- Settings (optional) ----------------
 try:
     from app.config.settings import settings
@@ -265,27 +267,27 @@ async def stream_openai(
     except _OpenAIAuthError as e:  # type: ignore
         error_msg = f"[OpenAI Streaming Auth Error] {e}"
         print(f"❌ {error_msg}")
-        yield error_msg
+        yield ProviderErrorText(error_msg)
         
     except _OpenAIRateLimitError as e:  # type: ignore
         error_msg = f"[OpenAI Streaming Rate Limit] {e}"
         print(f"❌ {error_msg}")
-        yield error_msg
+        yield ProviderErrorText(error_msg)
         
     except _OpenAIAPIError as e:  # type: ignore
         error_msg = f"[OpenAI Streaming API Error] {e}"
         print(f"❌ {error_msg}")
-        yield error_msg
+        yield ProviderErrorText(error_msg)
         
     except RuntimeError as e:
         error_msg = f"[OpenAI Streaming Config Error] {e}"
         print(f"❌ {error_msg}")
-        yield error_msg
+        yield ProviderErrorText(error_msg)
         
     except Exception as e:
         error_msg = f"[OpenAI Streaming Error] {e}"
         print(f"❌ {error_msg}")
-        yield error_msg
+        yield ProviderErrorText(error_msg)
 
 
 async def stream_claude(
@@ -294,6 +296,8 @@ async def stream_claude(
     temperature: float = 0.7,
     max_tokens: int = ANTHROPIC_MAX_TOKENS,
     system: Optional[str] = None,
+    cache_system: bool = False,
+    api_key: Optional[str] = None,
 ) -> AsyncIterator[str]:
     """
     Async streaming version of ask_claude().
@@ -307,6 +311,8 @@ async def stream_claude(
         temperature: Temperature for generation (0.0-1.0)
         max_tokens: Maximum tokens to generate
         system: Optional system prompt
+        cache_system: Mark the (static) system prompt as a cache breakpoint
+        api_key: Optional per-user key (BYOK); defaults to ANTHROPIC_API_KEY
         
     Yields:
         str: Text chunks as they arrive from the API
@@ -315,7 +321,13 @@ async def stream_claude(
         RuntimeError: If Claude client cannot be initialized
     """
     try:
-        client = _get_claude_async_client()
+        if api_key:
+            # BYOK: per-key client on claude_provider's shared connection pool
+            from app.providers.claude_provider import _get_async_client
+
+            client = _get_async_client(api_key)
+        else:
+            client = _get_claude_async_client()
         
         # Normalize messages
         norm_messages = _normalize_messages(messages)
@@ -367,7 +379,11 @@ async def stream_claude(
             max_tokens=max_tokens,
             temperature=temperature,
             messages=claude_messages,
-            system=system_prompt,
+            system=(
+                [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+                if cache_system
+                else system_prompt
+            ),
         ) as stream:
             # Iterate through text chunks
             async for text in stream.text_stream:
@@ -379,14 +395,14 @@ async def stream_claude(
     except _AnthropicAPIError as e:  # type: ignore
         error_msg = f"[Claude Streaming API Error] {e}"
         print(f"❌ {error_msg}")
-        yield error_msg
+        yield ProviderErrorText(error_msg)
         
     except RuntimeError as e:
         error_msg = f"[Claude Streaming Config Error] {e}"
         print(f"❌ {error_msg}")
-        yield error_msg
+        yield ProviderErrorText(error_msg)
         
     except Exception as e:
         error_msg = f"[Claude Streaming Error] {e}"
         print(f"❌ {error_msg}")
-        yield error_msg
+        yield ProviderErrorText(error_msg)
@@ -2,13 +2,16 @@
 Re-export router modules so callers can do:
     from app.routers import ask, chat, ...
 Keep this list in sync with main.py.
+
+Submodules are imported lazily (PEP 562 module __getattr__): importing one
+router no longer pulls in every other router and its SDK/DB dependencies.
 """
 
 from __future__ import annotations
 
+import importlib
 import os
 from types import ModuleType
-from typing import Optional
 
 # Enable extra logging with ROUTERS_DEBUG=1|true|yes|on
 _DEBUG = (os.getenv("ROUTERS_DEBUG") or "").strip().lower() in {"1", "true", "yes", "on"}
@@ -20,50 +23,7 @@ def _log(msg: str) -> None:
 
 
 # ---- Required routers (import must succeed; fail fast if missing) ----
-try:
-    from . import ask
-    _log("Loaded: ask")
-    from . import ask_ai_to_ai
-    _log("Loaded: ask_ai_to_ai")
-    from . import ask_ai_to_ai_turn
-    _log("Loaded: ask_ai_to_ai_turn")
-    from . import youtube
-    _log("Loaded: youtube")
-    from . import chat
-    _log("Loaded: chat")
-    from . import projects
-    _log("Loaded: projects")
-    from . import audit
-    _log("Loaded: audit")
-    from . import roles
-    _log("Loaded: roles")
-    from . import balance
-    _log("Loaded: balance")
-    from . import debate
-    _log("Loaded: debate")
-except Exception as e:
-    # Fail fast with a clear message about which router chain caused the error
-    raise ImportError(f"[routers.__init__] Failed importing required routers: {e}") from e
-
-
-# ---- Optional routers (ok if missing) ----
-def _try_import_optional(name: str) -> Optional[ModuleType]:
-    try:
-        mod = __import__(f"{__name__}.{name}", fromlist=[name])
-        _log(f"Loaded (optional): {name}")
-        return getattr(mod, name) if hasattr(mod, name) else mod  # export module or 'router' module
-    except Exception as exc:
-        _log(f"Optional router '{name}' not available: {exc}")
-        return None
-
-
-_upload_file_mod = _try_import_optional("upload_file")
-_prompt_template_mod = _try_import_optional("prompt_template")
-_telegram_mod = _try_import_optional("telegram")
-
-# Public exports
-__all__ = [
-    # required
+_REQUIRED = (
     "ask",
     "ask_ai_to_ai",
     "ask_ai_to_ai_turn",
@@ -74,15 +34,31 @@ __all__ = [
     "roles",
     "balance",
     "debate",
-]
+)
+
+# ---- Optional routers (ok if missing) ----
+_OPTIONAL = (
+    "upload_file",
+    "prompt_template",
+    "telegram",
+)
 
-# add optionals only if present
-if _upload_file_mod is not None:
-    __all__.append("upload_file")
-    upload_file = _upload_file_mod  # type: ignore[assignment]
-if _prompt_template_mod is not None:
-    __all__.append("prompt_template")
-    prompt_template = _prompt_template_mod  # type: ignore[assignment]
-if _telegram_mod is not None:
-    __all__.append("telegram")
-    telegram = _telegram_mod  # type: ignore[assignment]
+# Public exports (optionals resolve to AttributeError if their import fails)
+__all__ = list(_REQUIRED)
+
+
+def __getattr__(name: str) -> ModuleType:
+    if name not in _REQUIRED and name not in _OPTIONAL:
+        # Any other submodule still resolves through the normal import system
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        mod = importlib.import_module(f".{name}", __name__)
+    except Exception as e:
+        if name in _REQUIRED:
+            # Fail fast with a clear message about which router chain caused the error
+            raise ImportError(f"[routers.__init__] Failed importing required router '{name}': {e}") from e
+        _log(f"Optional router '{name}' not available: {e}")
+        raise AttributeError(f"optional router {name!r} not available: {e}") from e
+    _log(f"Loaded: {name}")
+    globals()[name] = mod
+    return mod
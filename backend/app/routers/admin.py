@@ -1,10 +1,11 @@
 """Admin/superuser endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
 
+from app.config.settings import reload_thresholds
 from app.memory.db import get_db
 from app.memory.models import User
 from app.deps import get_superuser
@@ -107,3 +108,10 @@ async def delete_user(
     db.commit()
     
     return {"message": "User deleted successfully"}
+
+@router.post("/reload-config")
+async def reload_config(request: Request, superuser: User = Depends(get_superuser)):
+    """Drop memoized config lookups so env changes take effect (superuser only)"""
+    reload_thresholds()
+    request.app.state.config_bytes = None  # rebuilt by the next /api/config hit
+    return {"message": "Config caches cleared"}
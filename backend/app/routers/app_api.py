@@ -225,14 +225,14 @@ async def message(
                 ocr_text = ""
             if ocr_text.strip():
                 full = f"{prompt}\n{ocr_text}".strip() if prompt else ocr_text.strip()
-                result = await save_note(project.id, full, "ocr", extra_tags=["photo", "ocr"])
+                result = await save_note(project.id, full, "ocr", extra_tags=["photo", "ocr"], db=db)
             else:
                 try:
                     description = await describe_image(image_bytes)
                 except Exception as exc:
                     raise HTTPException(status_code=502, detail=f"Image description failed: {exc}")
                 full = f"{prompt}\n{description}".strip() if prompt else description
-                result = await save_note(project.id, full, kind)
+                result = await save_note(project.id, full, kind, db=db)
             return {
                 "mode": "save",
                 "model_used": None,
@@ -254,7 +254,7 @@ async def message(
                 status_code=400,
                 detail="Nothing to save: provide text, audio, or image",
             )
-        result = await save_note(project.id, prompt, kind)
+        result = await save_note(project.id, prompt, kind, db=db)
         return {
             "mode": "save",
             "model_used": None,
@@ -278,6 +278,7 @@ async def message(
                 preferred_provider=model,
                 image_bytes=image_bytes,
                 location=resolved_location,
+                db=db,
             )
         except Exception as exc:
             logger.error("[app/message] chat failed user=%d: %s", current_user.id, exc)
@@ -331,7 +332,7 @@ async def message(
                 detail="Provide a query for web search (text or audio)",
             )
         try:
-            answer, sources = await web_answer(session_key=sk, query=prompt, location=resolved_location)
+            answer, sources = await web_answer(session_key=sk, query=prompt, location=resolved_location, db=db)
         except Exception as exc:
             logger.error("[app/message] web search failed user=%d: %s", current_user.id, exc)
             raise HTTPException(status_code=502, detail=f"Web search failed: {exc}")
@@ -7,6 +7,7 @@ from typing import Literal, Union, Optional, List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from uuid import uuid4
+from functools import lru_cache
 import re
 import asyncio
 
@@ -17,16 +18,17 @@ from app.memory.db import get_db
 from app.memory.models import Role, Project, User
 from app.prompts.prompt_builder import generate_prompt_from_db
 from app.config.settings import settings
-from app.config.model_registry import MODEL_REGISTRY
+from app.config.model_registry import MODEL_REGISTRY, get_model
 from app.services.vector_service import store_message_with_embedding, get_relevant_context
 from sse_starlette.sse import EventSourceResponse
-import json
-from app.deps import get_current_active_user
+from app.deps import get_current_active_user, get_memory
 from app.utils.api_key_resolver import get_openai_key, get_anthropic_key
+from app.utils.sse import sse_event
 from app.services.smart_context import build_smart_context
+from app.cache.semantic import semantic_cache, embed_text, is_error_answer
 
 # ✅ Deterministic YouTube path
-from app.services.youtube_service import search_videos
+from app.services.youtube_service import search_videos_async
 
 # Optional dynamic thresholds + token preflight
 try:
@@ -161,29 +163,27 @@ YOUTUBE_FORMAT_RULE = """
 - Keep response brief and conversational"""
 
 
+@lru_cache(maxsize=32)
 def build_system_prompt(
-    smart_context: str,
     mode: str = "plain",
     has_youtube: bool = False,
     query_type: str = "general"
 ) -> str:
     """
-    Build optimal system prompt with correct ordering.
-    
-    ORDER (based on "Lost in the Middle" research):
-    1. ROLE & CAPABILITIES (START - high attention)
-    2. FORMAT RULES (START - high attention)
-    3. SMART CONTEXT (MIDDLE - structure, summaries, messages)
-    4. RELEVANT CODE (END - high attention, in smart_context)
+    Build the STATIC system prompt (role + format rules).
+
+    It depends only on (mode, has_youtube, query_type), so it is byte-identical
+    across requests and users — provider prompt caches (Anthropic
+    cache_control, OpenAI automatic prefix caching) can reuse it. Per-request
+    smart context goes into the user turn via build_user_turn().
     
     Args:
-        smart_context: Pre-built context from build_smart_context()
         mode: Output mode (plain/code/doc)
         has_youtube: Whether YouTube results are included
         query_type: Type of query for specialized formatting
     
     Returns:
-        Complete system prompt string
+        System prompt string
     """
     
     parts = []
@@ -202,51 +202,58 @@ def build_system_prompt(
     if has_youtube:
         parts.append(YOUTUBE_FORMAT_RULE)
     
-    # 4. SMART CONTEXT - Already ordered optimally:
-    #    - Project Tree (START of context)
-    #    - Summaries (MIDDLE)
-    #    - Messages (MIDDLE)
-    #    - Semantic (MIDDLE)
-    #    - Code (END of context - high attention)
-    if smart_context:
-        parts.append("\n\n## 📊 PROJECT CONTEXT (from database):")
-        parts.append(smart_context)
-    
     return "\n".join(parts)
 
 
+def build_user_turn(smart_context: str, query: str) -> Dict[str, str]:
+    """
+    User message = dynamic context first, question last.
+
+    Smart context is already ordered optimally (Project Tree → Summaries →
+    Messages → Semantic → Code), so the code sits right before the question.
+    """
+    if not smart_context:
+        return {"role": "user", "content": query}
+    return {
+        "role": "user",
+        "content": f"## 📊 PROJECT CONTEXT (from database):\n{smart_context}\n\n## QUESTION:\n{query}",
+    }
+
+
+def _phrase_re(*phrases: str) -> "re.Pattern[str]":
+    """One case-insensitive alternation — substring semantics of `any(p in q ...)`."""
+    return re.compile("|".join(map(re.escape, phrases)), re.IGNORECASE)
+
+
+# File/directory listing queries
+_FILE_LISTING_RE = _phrase_re(
+    "what files", "list files", "show files",
+    "what's in", "what is in",
+    "directory", "folder", "structure",
+    "files are in", "files in",
+)
+# Code generation queries
+_CODE_GENERATION_RE = _phrase_re(
+    "write code", "create function", "implement",
+    "generate code", "code for", "script for",
+)
+# Explanation queries
+_EXPLANATION_RE = _phrase_re(
+    "explain", "how does", "what does",
+    "why does", "describe",
+)
+
+
 def detect_query_type(query: str) -> str:
     """
     Detect the type of query for specialized formatting.
     """
-    q = query.lower()
-    
-    # File/directory listing queries
-    file_patterns = [
-        "what files", "list files", "show files",
-        "what's in", "what is in",
-        "directory", "folder", "structure",
-        "files are in", "files in"
-    ]
-    if any(p in q for p in file_patterns):
+    if _FILE_LISTING_RE.search(query):
         return "file_listing"
-    
-    # Code generation queries
-    code_patterns = [
-        "write code", "create function", "implement",
-        "generate code", "code for", "script for"
-    ]
-    if any(p in q for p in code_patterns):
+    if _CODE_GENERATION_RE.search(query):
         return "code_generation"
-    
-    # Explanation queries
-    explain_patterns = [
-        "explain", "how does", "what does",
-        "why does", "describe"
-    ]
-    if any(p in q for p in explain_patterns):
+    if _EXPLANATION_RE.search(query):
         return "explanation"
-    
     return "general"
 
 
@@ -277,6 +284,13 @@ _DOC_HINTS = (
     "outline", "list", "checklist", "pros and cons", "pros & cons",
     "advantages", "disadvantages", "compare", "vs "
 )
+_DOC_HINTS_RE = _phrase_re(*_DOC_HINTS)
+_CODE_INTENT_RE = _phrase_re(
+    " in code", " code", "snippet", "snippets", "script",
+    "program", "function", "class ", "write a", "write an",
+    "example in ", "show code", "give code", "source code",
+)
+_FENCE_LABEL_RE = re.compile(r"```([A-Za-z0-9#+.-]*)")
 
 _CODE_FENCE_RE = re.compile(r"```([a-zA-Z0-9#.+-]*)\n([\s\S]*?)```", re.MULTILINE)
 _LIST_LINE_RE = re.compile(r"^\s*(?:[-*•·]|(?:\d+)[.)])\s+\S+", re.MULTILINE)
@@ -296,22 +310,15 @@ def _detect_output_mode(
     q = q or ""
     ql = q.lower()
 
-    if "```" in q:
-        m = re.search(r"```([A-Za-z0-9#+.-]*)", q)
-        label = (m.group(1) or "").lower() if m else ""
+    m = _FENCE_LABEL_RE.search(q)
+    if m:
+        label = (m.group(1) or "").lower()
         lang = _LANG_HINTS.get(label, label) if label else None
         return "code", (lang or None)
 
-    explicit_code_intent = any(
-        key in ql
-        for key in (
-            " in code", " code", "snippet", "snippets", "script",
-            "program", "function", "class ", "write a", "write an",
-            "example in ", "show code", "give code", "source code"
-        )
-    )
+    explicit_code_intent = _CODE_INTENT_RE.search(ql) is not None
 
-    words = set(w.lower() for w in _LANG_WORD_RE.findall(ql))
+    words = set(_LANG_WORD_RE.findall(ql))
     lang: Optional[str] = None
     for alias, norm in _LANG_HINTS.items():
         al = alias.lower()
@@ -321,9 +328,9 @@ def _detect_output_mode(
             lang = norm
             break
 
-    if explicit_code_intent and (lang or "```" in q):
+    if explicit_code_intent and lang:
         return "code", lang
-    if any(k in ql for k in _DOC_HINTS):
+    if _DOC_HINTS_RE.search(ql):
         return "doc", None
     return "plain", None
 
@@ -416,6 +423,7 @@ def _generate_smart_filename(code: str, language: str, counters: Dict[str, int])
     Generate smart filename based on code content and language.
     """
     lang = language.lower()
+    code_lower = code.lower()
     
     # Increment counter for this language
     counters[lang] = counters.get(lang, 0) + 1
@@ -424,7 +432,6 @@ def _generate_smart_filename(code: str, language: str, counters: Dict[str, int])
     # Language-specific smart naming
     if lang == 'sql':
         # Check for common SQL patterns
-        code_lower = code.lower()
         if 'create table' in code_lower or 'create database' in code_lower:
             return 'database.sql'
         elif 'create index' in code_lower:
@@ -455,9 +462,9 @@ def _generate_smart_filename(code: str, language: str, counters: Dict[str, int])
         
         # PHP API patterns
         if lang == 'php':
-            if 'api' in code.lower() or '$_POST' in code or '$_GET' in code:
+            if 'api' in code_lower or '$_POST' in code or '$_GET' in code:
                 return 'api.php' if count == 1 else f'api{count}.php'
-            elif 'database' in code.lower() or 'mysqli' in code or 'PDO' in code:
+            elif 'database' in code_lower or 'mysqli' in code or 'PDO' in code:
                 return 'database.php'
             return 'index.php' if count == 1 else f'script{count}.php'
         
@@ -465,7 +472,7 @@ def _generate_smart_filename(code: str, language: str, counters: Dict[str, int])
         if lang == 'python':
             if 'def main(' in code or 'if __name__' in code:
                 return 'main.py'
-            elif 'flask' in code.lower() or 'fastapi' in code.lower():
+            elif 'flask' in code_lower or 'fastapi' in code_lower:
                 return 'app.py'
             elif 'import unittest' in code or 'import pytest' in code:
                 return 'test.py' if count == 1 else f'test{count}.py'
@@ -473,7 +480,7 @@ def _generate_smart_filename(code: str, language: str, counters: Dict[str, int])
         
         # JavaScript/TypeScript patterns
         if lang in ('javascript', 'typescript'):
-            if 'express' in code.lower() or 'app.listen' in code:
+            if 'express' in code_lower or 'app.listen' in code:
                 return 'server.js' if lang == 'javascript' else 'server.ts'
             elif 'export default' in code or 'module.exports' in code:
                 return 'index.js' if lang == 'javascript' else 'index.ts'
@@ -488,9 +495,9 @@ def _generate_smart_filename(code: str, language: str, counters: Dict[str, int])
         return 'styles.css' if count == 1 else f'styles{count}.css'
     
     elif lang == 'json':
-        if 'package' in code.lower() or '"name"' in code:
+        if 'package' in code_lower or '"name"' in code:
             return 'package.json'
-        elif 'tsconfig' in code.lower():
+        elif 'tsconfig' in code_lower:
             return 'tsconfig.json'
         return 'config.json' if count == 1 else f'data{count}.json'
     
@@ -503,7 +510,7 @@ def _generate_smart_filename(code: str, language: str, counters: Dict[str, int])
         return 'Dockerfile'
     
     elif lang == 'yaml' or lang == 'yml':
-        if 'docker-compose' in code.lower():
+        if 'docker-compose' in code_lower:
             return 'docker-compose.yml'
         return 'config.yml' if count == 1 else f'config{count}.yml'
     
@@ -594,8 +601,7 @@ async def _safe_youtube(topic: str) -> List[Dict[str, str]]:
 
     try:
         items = await asyncio.wait_for(
-            asyncio.to_thread(
-                search_videos,
+            search_videos_async(
                 query=topic,
                 max_results=maxn,
                 since_months=since_months,
@@ -657,19 +663,6 @@ class AskRequest(BaseModel):
             raise ValueError("project_id must be a positive integer")
         return s  # MemoryManager expects string project_id
 
-def _db_rows_to_chat_messages(rows: List[Dict[str, Any]], memory: MemoryManager) -> List[Dict[str, str]]:
-    out: List[Dict[str, str]] = []
-    for r in rows:
-        sender = (r.get("sender") or "").strip().lower()
-        text = (r.get("text") or "").strip()
-        if not text:
-            continue
-        if sender in {"openai", "anthropic", "assistant", "final"}:
-            out.append({"role": "assistant", "content": text})
-        elif sender == "user":
-            out.append({"role": "user", "content": text})
-    return out
-
 def _clip_history_by_tokens(memory: MemoryManager, messages: List[Dict[str, str]], max_tokens: int) -> List[Dict[str, str]]:
     if not messages:
         return messages
@@ -690,7 +683,7 @@ def _registry_key_for_model_name(model_name: Optional[str]) -> Optional[str]:
     if not model_name:
         return None
     for k, v in MODEL_REGISTRY.items():
-        if v.get("model") == model_name:
+        if v.model == model_name:
             return k
     return None
 
@@ -699,7 +692,8 @@ def _default_key_for_provider(provider: str) -> str:
     if p == "anthropic":
         anth_raw = getattr(settings, "ANTHROPIC_DEFAULT_MODEL", None)
         return _registry_key_for_model_name(anth_raw) or "claude-3-5-sonnet"
-    if settings.DEFAULT_MODEL in MODEL_REGISTRY and MODEL_REGISTRY[settings.DEFAULT_MODEL]["provider"] == "openai":
+    default_info = get_model(settings.DEFAULT_MODEL)
+    if default_info and default_info.provider == "openai":
         return settings.DEFAULT_MODEL
     openai_raw = getattr(settings, "OPENAI_DEFAULT_MODEL", None)
     return _registry_key_for_model_name(openai_raw) or "gpt-4o"
@@ -712,7 +706,7 @@ async def _auto_summarize_if_needed(memory: MemoryManager, role_id: int, project
             return
         texts = [(r.get("text") or "") for r in rows]
         texts = [t for t in texts if not t.startswith("[OpenAI Error]")]
-        total_tokens = sum(memory.count_tokens(t) for t in texts)
+        total_tokens = sum(memory.count_tokens_batch(texts))
         print(f"🔍 Token check → total={total_tokens}, threshold={SUMMARIZE_TRIGGER_TOKENS}")
         if total_tokens <= SUMMARIZE_TRIGGER_TOKENS:
             return
@@ -736,6 +730,7 @@ async def _auto_summarize_if_needed(memory: MemoryManager, role_id: int, project
 async def ask_route(
     data: AskRequest,
     db: Session = Depends(get_db),
+    memory: MemoryManager = Depends(get_memory),
     current_user: User = Depends(get_current_active_user),
     debug: Optional[bool] = Query(default=False, description="Include token thresholds and preflight info"),
 ):
@@ -754,8 +749,6 @@ async def ask_route(
         raise HTTPException(status_code=400, detail=f"Unknown project_id={project_id_int}. Create/link the project first.")
     project_id = project_id_str  # MemoryManager expects string
 
-    memory = MemoryManager(db)
-
     # Get user API keys based on provider
     user_api_key: Optional[str] = None
     if data.provider == "openai" or data.provider == "all":
@@ -778,45 +771,78 @@ async def ask_route(
     print(f"📥 User: {data.query[:120]}")
 
     try:
+        # 0) Semantic cache: a paraphrase of a recent question in the same
+        #    namespace reuses the stored answer. YouTube queries are live data,
+        #    and a session with history makes the answer conversation-specific.
+        cache_ns: Optional[Tuple[Any, ...]] = None
+        query_emb: Optional[List[float]] = None
+        cached: Optional[Dict[str, Any]] = None
+        if (
+            settings.ENABLE_SEMANTIC_CACHE
+            and not _detect_youtube_intent(data.query)
+            and not memory.session_has_history(
+                project_id, role_id, chat_session_id, more_than=settings.SEMANTIC_CACHE_MAX_HISTORY
+            )
+        ):
+            query_emb = await asyncio.to_thread(embed_text, data.query)
+            if query_emb is not None:
+                cache_ns = (
+                    current_user.id, project_id_int, role_id, data.provider, data.model_key,
+                    data.output_mode, data.language, data.presentation,
+                )
+                cached = semantic_cache.query(cache_ns, query_emb)
+                if cached is not None:
+                    print("⚡ [SemanticCache] hit")
+
         # 1) write user msg + audit
         user_entry = memory.store_chat_message(project_id, role_id, chat_session_id, "user", data.query)
         memory.insert_audit_log(project_id, role_id, chat_session_id, data.provider, "ask", query=data.query)
         
         # 1a) Generate embedding for user message (async, don't block on errors)
         try:
-            store_message_with_embedding(db, user_entry.id, data.query)
+            store_message_with_embedding(db, user_entry.id, data.query, embedding=query_emb)
         except Exception as e:
             print(f"[Embedding] User message skipped: {e}")
 
-        # 2) Build Smart Context (replaces full history loading)
-        print(f"🎯 [Smart Context] Building context for query: {data.query[:50]}...")
-        smart_context_text = await build_smart_context(
-            project_id=project_id_int,
-            role_id=role_id,
-            query=data.query,
-            session_id=chat_session_id,
-            db=db,
-            memory=memory
-        )
-
-        print(f"🔍 [DEBUG ask.py] smart_context_text length: {len(smart_context_text)} chars")
-        print(f"✅ [Smart Context] Context ready (~{len(smart_context_text) // 4} tokens)")
-
-        # 3) YouTube intent detection
-        youtube_items: List[Dict[str, str]] = []
+        # 2a) YouTube intent: start the search now so it overlaps the smart
+        #     context build instead of running after it
         yt_topic = None
+        yt_task: Optional[asyncio.Task] = None
         if bool(getattr(settings, "ENABLE_YT_IN_CHAT", True)):
             yt_topic = _detect_youtube_intent(data.query)
             if yt_topic:
                 print(f"[YT] intent detected → topic='{yt_topic}'")
-                youtube_items = await _safe_youtube(yt_topic)
-                if youtube_items:
-                    try:
-                        memory.insert_audit_log(
-                            project_id, role_id, chat_session_id, "youtube", "search", yt_topic[:200]
-                        )
-                    except Exception:
-                        pass
+                yt_task = asyncio.create_task(_safe_youtube(yt_topic))
+
+        # 2) Build Smart Context (replaces full history loading; not needed on a cache hit)
+        if cached is None:
+            print(f"🎯 [Smart Context] Building context for query: {data.query[:50]}...")
+            smart_context_text = await build_smart_context(
+                project_id=project_id_int,
+                role_id=role_id,
+                query=data.query,
+                session_id=chat_session_id,
+                db=db,
+                memory=memory,
+                query_embedding=query_emb,
+            )
+        else:
+            smart_context_text = ""
+
+        print(f"🔍 [DEBUG ask.py] smart_context_text length: {len(smart_context_text)} chars")
+        print(f"✅ [Smart Context] Context ready (~{len(smart_context_text) // 4} tokens)")
+
+        # 3) YouTube results (search started in 2a)
+        youtube_items: List[Dict[str, str]] = []
+        if yt_task is not None:
+            youtube_items = await yt_task
+            if youtube_items:
+                try:
+                    memory.insert_audit_log(
+                        project_id, role_id, chat_session_id, "youtube", "search", yt_topic[:200]
+                    )
+                except Exception:
+                    pass
 
         # 4) Detect output mode and query type
         mode, lang = _detect_output_mode(data.query, data.output_mode, data.language)
@@ -832,10 +858,8 @@ async def ask_route(
         elif force_plain:
             mode, lang = "plain", None
 
-        # 5) Build optimized system prompt
-        # ORDER: Role → Format Rules → Smart Context (Tree→Summaries→Messages→Semantic→Code)
+        # 5) Build the static system prompt (Role → Format Rules); cacheable prefix
         full_prompt = build_system_prompt(
-            smart_context=smart_context_text,
             mode=mode,
             has_youtube=bool(youtube_items),
             query_type=query_type
@@ -843,8 +867,8 @@ async def ask_route(
         
         print(f"✅ [ask.py] System prompt built ({len(full_prompt)} chars)")
 
-        # 6) Prepare message history (just current query with Smart Context in system)
-        history = [{"role": "user", "content": data.query}]
+        # 6) Prepare message history: Smart Context (Tree→Summaries→Messages→Semantic→Code) + query
+        history = [build_user_turn(smart_context_text, data.query)]
 
         debug_info: Optional[Dict[str, Any]] = None
         if debug:
@@ -854,7 +878,8 @@ async def ask_route(
                 "query_type": query_type,
                 "presentation": data.presentation,
                 "yt_topic": yt_topic,
-                "prompt_length": len(full_prompt),
+                "prompt_length": len(full_prompt) + len(history[0]["content"]),
+                "semantic_cache": "hit" if cached is not None else ("miss" if cache_ns else "off"),
             }
 
         def store_and_respond(sender: str, text: str, render: Optional[Dict[str, Any]] = None):
@@ -917,37 +942,52 @@ async def ask_route(
 
         # 7) Provider selection and model call
         if data.provider == "all":
-            if data.model_key and MODEL_REGISTRY.get(data.model_key, {}).get("provider") == "openai":
+            requested_info = get_model(data.model_key)
+            default_info = get_model(settings.DEFAULT_MODEL)
+            if requested_info and requested_info.provider == "openai":
                 openai_key = data.model_key
-            elif settings.DEFAULT_MODEL in MODEL_REGISTRY and MODEL_REGISTRY[settings.DEFAULT_MODEL]["provider"] == "openai":
+            elif default_info and default_info.provider == "openai":
                 openai_key = settings.DEFAULT_MODEL
             else:
                 openai_key = _registry_key_for_model_name(getattr(settings, "OPENAI_DEFAULT_MODEL", None)) or "gpt-4o"
 
-            if data.model_key and MODEL_REGISTRY.get(data.model_key, {}).get("provider") == "anthropic":
+            if requested_info and requested_info.provider == "anthropic":
                 anthropic_key = data.model_key
             else:
                 anthropic_key = _registry_key_for_model_name(getattr(settings, "ANTHROPIC_DEFAULT_MODEL", None)) or "claude-3-5-sonnet"
 
-            openai_api_key = get_openai_key(current_user, db, required=True)
-            anthropic_api_key = get_anthropic_key(current_user, db, required=True)
-            
-            openai_reply = ask_model(history, model_key=openai_key, system_prompt=full_prompt, api_key=openai_api_key)
-            claude_reply = ask_model(history, model_key=anthropic_key, system_prompt=full_prompt, api_key=anthropic_api_key)
-
-            openai_reply, openai_render = _post_process(openai_reply)
-            claude_reply, claude_render = _post_process(claude_reply)
-
-            summary_prompt = (
-                "Summarize both AI responses in a fair, concise, plain-text way. "
-                "Avoid any fenced code unless explicitly asked for code.\n\n"
-                f"OpenAI:\n{openai_reply}\n\nClaude:\n{claude_reply}\n"
+            if cached is not None:
+                openai_reply, openai_render = cached["openai"], cached["openai_render"]
+                claude_reply, claude_render = cached["claude"], cached["anthropic_render"]
+                final_summary = cached["summary"]
+            else:
+                openai_api_key = get_openai_key(current_user, db, required=True)
+                anthropic_api_key = get_anthropic_key(current_user, db, required=True)
+                
+                openai_raw = ask_model(history, model_key=openai_key, system_prompt=full_prompt, api_key=openai_api_key, cache_system=True)
+                claude_raw = ask_model(history, model_key=anthropic_key, system_prompt=full_prompt, api_key=anthropic_api_key, cache_system=True)
+
+                openai_reply, openai_render = _post_process(openai_raw)
+                claude_reply, claude_render = _post_process(claude_raw)
+
+                summary_prompt = (
+                    "Summarize both AI responses in a fair, concise, plain-text way. "
+                    "Avoid any fenced code unless explicitly asked for code.\n\n"
+                    f"OpenAI:\n{openai_reply}\n\nClaude:\n{claude_reply}\n"
+                )
+                final_summary = ask_model([{"role": "user", "content": summary_prompt}], model_key=openai_key, system_prompt=full_prompt, api_key=openai_api_key, cache_system=True)
+
+                if cache_ns and not any(map(is_error_answer, (openai_raw, claude_raw, final_summary))):
+                    semantic_cache.put(cache_ns, query_emb, {
+                        "openai": openai_reply, "openai_render": openai_render,
+                        "claude": claude_reply, "anthropic_render": claude_render,
+                        "summary": final_summary,
+                    })
+
+            openai_entry, claude_entry, final_entry = memory.store_chat_messages_bulk(
+                project_id, role_id, chat_session_id,
+                [("openai", openai_reply), ("anthropic", claude_reply), ("final", final_summary)],
             )
-            final_summary = ask_model([{"role": "user", "content": summary_prompt}], model_key=openai_key, system_prompt=full_prompt, api_key=openai_api_key)
-
-            openai_entry = memory.store_chat_message(project_id, role_id, chat_session_id, "openai", openai_reply)
-            claude_entry = memory.store_chat_message(project_id, role_id, chat_session_id, "anthropic", claude_reply)
-            final_entry = memory.store_chat_message(project_id, role_id, chat_session_id, "final", final_summary)
             
             # Generate embeddings for all responses (async, don't block on errors)
             try:
@@ -973,15 +1013,20 @@ async def ask_route(
             return resp
 
         chosen_key = data.model_key or _default_key_for_provider(data.provider)
-        reg = MODEL_REGISTRY.get(chosen_key)
-        if reg and data.provider in {"openai", "anthropic"} and reg["provider"] != data.provider:
+        reg = get_model(chosen_key)
+        if reg and data.provider in {"openai", "anthropic"} and reg.provider != data.provider:
             chosen_key = _default_key_for_provider(data.provider)
 
-        answer_raw = ask_model(history, model_key=chosen_key, system_prompt=full_prompt, api_key=user_api_key)
+        if cached is not None:
+            return store_and_respond(cached["sender"], cached["answer"], render=cached["render"])
+
+        answer_raw = ask_model(history, model_key=chosen_key, system_prompt=full_prompt, api_key=user_api_key, cache_system=True)
         answer, render_meta = _post_process(answer_raw)
 
-        info = MODEL_REGISTRY.get(chosen_key)
-        sender = info["provider"] if info else ("openai" if chosen_key.startswith("gpt-") else "anthropic")
+        info = get_model(chosen_key)
+        sender = info.provider if info else ("openai" if chosen_key.startswith("gpt-") else "anthropic")
+        if cache_ns and not is_error_answer(answer_raw):
+            semantic_cache.put(cache_ns, query_emb, {"sender": sender, "answer": answer, "render": render_meta})
         return store_and_respond(sender, answer, render=render_meta)
 
     except IntegrityError as e:
@@ -995,6 +1040,7 @@ async def ask_route(
 async def ask_stream_route(
     data: AskRequest,
     db: Session = Depends(get_db),
+    memory: MemoryManager = Depends(get_memory),
 ):
     """
     Streaming version of /ask endpoint using Server-Sent Events.
@@ -1015,8 +1061,6 @@ async def ask_stream_route(
         raise HTTPException(status_code=400, detail=f"Unknown project_id={project_id_int}. Create/link the project first.")
     project_id = project_id_str
 
-    memory = MemoryManager(db)
-
     # Stable session id
     if data.chat_session_id:
         chat_session_id = data.chat_session_id.strip()
@@ -1038,7 +1082,7 @@ async def ask_stream_route(
             memory.insert_audit_log(project_id, role_id, chat_session_id, data.provider, "ask_stream", query=data.query)
 
             # Send initial status
-            yield f"{json.dumps({'event': 'status', 'data': {'status': 'processing'}})}\n\n"
+            yield sse_event("status", {'status': 'processing'})
 
             # 2) Build Smart Context
             print(f"🎯 [Smart Context] Building context for streaming query: {data.query[:50]}...")
@@ -1063,9 +1107,8 @@ async def ask_stream_route(
             elif force_plain:
                 mode, lang = "plain", None
 
-            # 4) Build optimized system prompt
+            # 4) Build the static system prompt (cacheable prefix)
             full_prompt = build_system_prompt(
-                smart_context=smart_context_text,
                 mode=mode,
                 has_youtube=False,
                 query_type=query_type
@@ -1073,20 +1116,24 @@ async def ask_stream_route(
             
             print(f"✅ [ask-stream] System prompt built ({len(full_prompt)} chars)")
 
-            # 5) Prepare message history
-            history = [{"role": "user", "content": data.query}]
+            # 5) Prepare message history: Smart Context + query
+            history = [build_user_turn(smart_context_text, data.query)]
 
             # 6) Determine model and parameters
             chosen_key = data.model_key or _default_key_for_provider(data.provider)
-            reg = MODEL_REGISTRY.get(chosen_key)
-            if reg and data.provider in {"openai", "anthropic"} and reg["provider"] != data.provider:
+            reg = get_model(chosen_key)
+            if reg and data.provider in {"openai", "anthropic"} and reg.provider != data.provider:
                 chosen_key = _default_key_for_provider(data.provider)
 
-            model_info = MODEL_REGISTRY.get(chosen_key, {})
-            chosen_model = model_info.get("model", "gpt-4o-mini")
-            actual_provider = model_info.get("provider", data.provider)
-            max_tokens = model_info.get("max_tokens", 4096)
-            temperature = model_info.get("temperature", 0.7)
+            model_info = get_model(chosen_key)
+            chosen_model = model_info.model if model_info else "gpt-4o-mini"
+            actual_provider = model_info.provider if model_info else data.provider
+            max_tokens = model_info.max_tokens if model_info else 4096
+            temperature = (
+                model_info.temperature
+                if model_info and model_info.temperature is not None
+                else 0.7
+            )
 
             # 7) Stream based on provider
             full_response = ""
@@ -1100,7 +1147,7 @@ async def ask_stream_route(
                     temperature=temperature
                 ):
                     full_response += chunk
-                    yield f"{json.dumps({'event': 'chunk', 'data': {'content': chunk, 'accumulated': full_response}})}\n\n"
+                    yield sse_event("chunk", {'content': chunk, 'accumulated': full_response})
 
             elif actual_provider == "anthropic":
                 async for chunk in stream_claude(
@@ -1108,14 +1155,15 @@ async def ask_stream_route(
                     model=chosen_model,
                     system=full_prompt,
                     max_tokens=max_tokens,
-                    temperature=temperature
+                    temperature=temperature,
+                    cache_system=True,
                 ):
                     full_response += chunk
-                    yield f"{json.dumps({'event': 'chunk', 'data': {'content': chunk, 'accumulated': full_response}})}\n\n"
+                    yield sse_event("chunk", {'content': chunk, 'accumulated': full_response})
             else:
                 error_msg = f"Unsupported provider for streaming: {actual_provider}"
                 print(f"❌ {error_msg}")
-                yield f"{json.dumps({'event': 'error', 'data': {'error': error_msg}})}\n\n"
+                yield sse_event("error", {'error': error_msg})
                 return
 
             # 8) Detect and stream multiple files separately
@@ -1125,21 +1173,21 @@ async def ask_stream_route(
                 # Multiple files detected - stream each separately
                 print(f"📁 [Multi-File Detection] Found {len(code_blocks)} code files")
                 
-                yield f"{json.dumps({'event': 'files_detected', 'data': {'total_files': len(code_blocks), 'files': [{'filename': f[0], 'language': f[1], 'size': len(f[2])} for f in code_blocks]}})}\n\n"
+                yield sse_event("files_detected", {'total_files': len(code_blocks), 'files': [{'filename': f[0], 'language': f[1], 'size': len(f[2])} for f in code_blocks]})
                 
                 for idx, (filename, language, code) in enumerate(code_blocks, 1):
                     # File start event
-                    yield f"{json.dumps({'event': 'file_start', 'data': {'filename': filename, 'language': language, 'index': idx, 'total': len(code_blocks)}})}\n\n"
+                    yield sse_event("file_start", {'filename': filename, 'language': language, 'index': idx, 'total': len(code_blocks)})
                     
                     # Stream file content in chunks
                     chunks = chunk_text(code, chunk_size=500)
                     for chunk in chunks:
-                        yield f"{json.dumps({'event': 'file_chunk', 'data': {'filename': filename, 'content': chunk}})}\n\n"
+                        yield sse_event("file_chunk", {'filename': filename, 'content': chunk})
                         # Small delay to prevent overwhelming frontend
                         await asyncio.sleep(0.01)
                     
                     # File end event
-                    yield f"{json.dumps({'event': 'file_end', 'data': {'filename': filename, 'size': len(code)}})}\n\n"
+                    yield sse_event("file_end", {'filename': filename, 'size': len(code)})
                     
                     print(f"  ✅ File {idx}/{len(code_blocks)}: {filename} ({len(code)} chars)")
 
@@ -1161,13 +1209,13 @@ async def ask_stream_route(
 
             # 10) Send completion event
             token_count = memory.count_tokens(full_response)
-            yield f"{json.dumps({'event': 'done', 'data': {'status': 'completed', 'full_response': full_response, 'tokens': token_count, 'model': chosen_model, 'provider': actual_provider, 'chat_session_id': chat_session_id}})}\n\n"
+            yield sse_event("done", {'status': 'completed', 'full_response': full_response, 'tokens': token_count, 'model': chosen_model, 'provider': actual_provider, 'chat_session_id': chat_session_id})
 
             print(f"✅ [Stream Complete] provider={actual_provider} model={chosen_model} tokens={token_count}")
 
         except Exception as e:
             error_msg = str(e)
             print(f"❌ [Stream Error] {error_msg}")
-            yield f"{json.dumps({'event': 'error', 'data': {'error': error_msg}})}\n\n"
+            yield sse_event("error", {'error': error_msg})
 
     return EventSourceResponse(event_generator())
\ No newline at end of file
@@ -7,32 +7,34 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
+from sse_starlette.sse import EventSourceResponse
 from pydantic import BaseModel, field_validator
 from typing import Literal, Optional, Union, List, Dict, Any, Tuple, Iterable
 from uuid import uuid4
 import asyncio
 import re
-import json
 
-from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.memory.db import get_db
 from app.memory.manager import MemoryManager
 from app.memory.models import Project, User
-from app.providers.openai_provider import ask_openai
-from app.providers.claude_provider import ask_claude
+from app.providers.openai_provider import ask_openai_async
+from app.providers.claude_provider import ask_claude_async_retry, is_retryable_error, retry_delay
+from app.providers.streaming import stream_claude
 from app.services.youtube_http import perform_youtube_search
 from app.services.web_search_service import perform_google_search
 from app.prompts.prompt_builder import build_full_prompt
 from app.config.settings import settings
-from app.deps import get_current_active_user
+from app.deps import get_current_active_user, get_memory
 from app.utils.api_key_resolver import get_openai_key, get_anthropic_key
+from app.utils.sse import sse_event
 
 # ✅ Import unified build_smart_context
 from app.services.smart_context import build_smart_context
+from app.cache.semantic import semantic_cache, embed_text, is_error_answer
 
-from app.config.debate_prompts import get_round_config, get_mode_info
+from app.config.debate_prompts import get_round_config, get_mode_info, FINAL_STRUCTURE_END
 
 router = APIRouter(tags=["Chat"])
 
@@ -174,6 +176,9 @@ class AiToAiRequest(BaseModel):
     web_search: bool = False
     youtube_search: bool = False
 
+    # Debate only: stream the final synthesis over SSE instead of one JSON body
+    stream: bool = False
+
     @field_validator("role", mode="before")
     @classmethod
     def convert_role(cls, v):
@@ -228,9 +233,10 @@ async def claude_with_retry(
     system: Optional[str] = None,
     retries: int = 2,
     api_key: Optional[str] = None,
-    model: str = "claude-sonnet-4-20250514"
+    model: str = "claude-sonnet-4-20250514",
+    cache_system: bool = False
 ) -> str:
-    """Claude wrapper with simple retries/backoff"""
+    """Claude wrapper: retries transient failures only (jittered exponential backoff)"""
     filtered_messages = [m for m in messages if m.get("role") != "system"]
     
     if system is None:
@@ -239,23 +245,14 @@ async def claude_with_retry(
                 system = m.get("content", "")
                 break
     
-    last = ""
-    for attempt in range(retries + 1):
-        try:
-            ans = await run_in_threadpool(
-                ask_claude, 
-                filtered_messages, 
-                system=system,
-                model=model,
-                api_key=api_key
-            )
-            last = ans or ""
-            if ans and "[Claude Error]" not in ans and "overloaded" not in ans.lower():
-                return ans
-        except Exception as e:
-            last = f"[Claude Exception] {e}"
-        await asyncio.sleep(1.5 + attempt)
-    return last or "[Claude Retry Failed]"
+    return await ask_claude_async_retry(
+        filtered_messages,
+        retries,
+        system=system,
+        model=model,
+        api_key=api_key,
+        cache_system=cache_system,
+    )
 
 
 # ============================================================
@@ -272,6 +269,8 @@ async def _handle_simple_mode(
     chat_session_id: str,
     openai_key: str,
     anthropic_key: str,
+    cache_ns: Optional[Tuple[Any, ...]] = None,
+    query_emb: Optional[List[float]] = None,
 ) -> JSONResponse:
     """
     SIMPLE mode: Single model response for questions, lookups, explanations.
@@ -316,21 +315,29 @@ Provide a helpful, focused answer:"""
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ]
-            response = await run_in_threadpool(ask_openai, messages, api_key=openai_key)
+            response = await ask_openai_async(messages, api_key=openai_key)
             model_used = "openai"
             
     except Exception as e:
         print(f"❌ [SIMPLE] Model error: {e}")
         raise HTTPException(status_code=502, detail=f"Model failed: {e}")
     
+    failed = is_error_answer(response)
     response = response.strip()
+    if cache_ns and not failed:
+        semantic_cache.put(cache_ns, query_emb, {"answer": response, "model_used": model_used})
     
     # Store in memory
-    memory.store_chat_message(project_id, role_id, chat_session_id, "user", data.topic, is_ai_to_ai=False)
-    memory.store_chat_message(project_id, role_id, chat_session_id, model_used, response, is_ai_to_ai=False)
+    memory.store_chat_messages_bulk(
+        project_id, role_id, chat_session_id, [("user", data.topic), (model_used, response)], is_ai_to_ai=False
+    )
     
     print(f"✅ [SIMPLE] Response: {len(response)} chars from {model_used}")
     
+    return _simple_response(response, model_used, chat_session_id)
+
+
+def _simple_response(response: str, model_used: str, chat_session_id: str) -> JSONResponse:
     return JSONResponse(content={
         "mode": "simple",
         "intent": "simple",
@@ -347,27 +354,19 @@ Provide a helpful, focused answer:"""
 # 🔄 DEBATE MODE HANDLER (Multi-Model Discussion)
 # ============================================================
 
-async def _handle_debate_mode(
+async def _debate_rounds(
     data: AiToAiRequest,
     memory: MemoryManager,
-    db: Session,
     smart_context: str,
     role_id: int,
     project_id: str,
     chat_session_id: str,
     openai_key: str,
     anthropic_key: str,
-    project: Optional[Project] = None,
-) -> JSONResponse:
+) -> Tuple[str, str, str, str]:
     """
-    DEBATE mode: Multi-model discussion for complex topics.
-    
-    Flow:
-    1. Starter model provides initial answer
-    2. Claude reviews and critiques
-    3. Final synthesis combines both perspectives
-    
-    Perfect for: comparisons, architecture decisions, best practices
+    DEBATE rounds 1-2 (starter answer + Claude review), both persisted.
+    Returns (starter_sender, first_reply, claude_review, synthesis_prompt).
     """
     
     print(f"🔄 [DEBATE] Starting multi-model discussion...")
@@ -389,8 +388,7 @@ Provide a thorough, well-structured response:"""
 
     try:
         if data.starter == "openai":
-            first_reply = await run_in_threadpool(
-                ask_openai,
+            first_reply = await ask_openai_async(
                 [
                     {"role": "system", "content": base_system},
                     {"role": "user", "content": starter_prompt}
@@ -460,11 +458,58 @@ Create a final, comprehensive response that:
 
 Format with clear markdown headings and structure:"""
 
+    return starter_sender, first_reply, claude_review, synthesis_prompt
+
+
+_DEBATE_SYNTH_SYSTEM = "You are synthesizing multiple perspectives into a comprehensive final answer."
+_DEBATE_SYNTH_MODEL = "claude-sonnet-4-5-20250929"  # Use best model for synthesis
+_DEBATE_STREAM_RETRIES = 2  # same budget as claude_with_retry
+
+
+def _debate_payload(starter_sender: str, first_reply: str, claude_review: str, final_reply: str, chat_session_id: str) -> Dict[str, Any]:
+    return {
+        "mode": "debate",
+        "intent": "debate",
+        "messages": [
+            {"sender": starter_sender, "answer": first_reply, "role": "initial"},
+            {"sender": "anthropic", "answer": claude_review, "role": "review"},
+        ],
+        "summary": final_reply,
+        "chat_session_id": chat_session_id,
+    }
+
+
+async def _handle_debate_mode(
+    data: AiToAiRequest,
+    memory: MemoryManager,
+    db: Session,
+    smart_context: str,
+    role_id: int,
+    project_id: str,
+    chat_session_id: str,
+    openai_key: str,
+    anthropic_key: str,
+    project: Optional[Project] = None,
+) -> JSONResponse:
+    """
+    DEBATE mode: Multi-model discussion for complex topics.
+    
+    Flow:
+    1. Starter model provides initial answer
+    2. Claude reviews and critiques
+    3. Final synthesis combines both perspectives
+    
+    Perfect for: comparisons, architecture decisions, best practices
+    """
+    starter_sender, first_reply, claude_review, synthesis_prompt = await _debate_rounds(
+        data, memory, smart_context, role_id, project_id, chat_session_id, openai_key, anthropic_key
+    )
+
     try:
         final_reply = await claude_with_retry(
             [{"role": "user", "content": synthesis_prompt}],
-            system="You are synthesizing multiple perspectives into a comprehensive final answer.",
-            model="claude-sonnet-4-5-20250929",  # Use best model for synthesis
+            system=_DEBATE_SYNTH_SYSTEM,
+            model=_DEBATE_SYNTH_MODEL,
             api_key=anthropic_key
         )
     except Exception as e:
@@ -475,16 +520,70 @@ Format with clear markdown headings and structure:"""
     memory.store_chat_message(project_id, role_id, chat_session_id, "final", final_reply, is_ai_to_ai=True)
     print(f"✅ [DEBATE] Complete!")
 
-    return JSONResponse(content={
-        "mode": "debate",
-        "intent": "debate",
-        "messages": [
-            {"sender": starter_sender, "answer": first_reply, "role": "initial"},
-            {"sender": "anthropic", "answer": claude_review, "role": "review"},
-        ],
-        "summary": final_reply,
-        "chat_session_id": chat_session_id,
-    })
+    return JSONResponse(content=_debate_payload(starter_sender, first_reply, claude_review, final_reply, chat_session_id))
+
+
+def _handle_debate_mode_stream(
+    data: AiToAiRequest,
+    memory: MemoryManager,
+    smart_context: str,
+    role_id: int,
+    project_id: str,
+    chat_session_id: str,
+    openai_key: str,
+    anthropic_key: str,
+) -> EventSourceResponse:
+    """
+    DEBATE mode over SSE (data.stream=True), same event shape as /ask/stream:
+    status → message (initial) → message (review) → chunk… (synthesis) → done.
+    The final payload in `done` matches the JSON response of the buffered mode.
+    """
+
+    async def event_generator():
+        try:
+            yield sse_event("status", {"status": "processing", "intent": "debate"})
+            starter_sender, first_reply, claude_review, synthesis_prompt = await _debate_rounds(
+                data, memory, smart_context, role_id, project_id, chat_session_id, openai_key, anthropic_key
+            )
+            yield sse_event("message", {"sender": starter_sender, "answer": first_reply, "role": "initial"})
+            yield sse_event("message", {"sender": "anthropic", "answer": claude_review, "role": "review"})
+
+            # stream_claude yields a failure as a ProviderErrorText chunk; retry
+            # transient ones like claude_with_retry, unless text already went out
+            final_reply = ""
+            for attempt in range(_DEBATE_STREAM_RETRIES + 1):
+                failure: Optional[str] = None
+                async for chunk in stream_claude(
+                    messages=[{"role": "user", "content": synthesis_prompt}],
+                    model=_DEBATE_SYNTH_MODEL,
+                    system=_DEBATE_SYNTH_SYSTEM,
+                    api_key=anthropic_key,
+                ):
+                    if is_error_answer(chunk):
+                        failure = chunk  # always the stream's last item
+                        continue
+                    final_reply += chunk
+                    yield sse_event("chunk", {"content": chunk, "accumulated": final_reply})
+                if failure is None or final_reply or attempt == _DEBATE_STREAM_RETRIES or not is_retryable_error(failure):
+                    break
+                await asyncio.sleep(retry_delay(attempt))
+
+            if failure is not None or is_error_answer(final_reply.strip()):
+                print(f"❌ [DEBATE] Synthesis stream failed: {failure}")
+                yield sse_event("error", {"error": "Synthesis failed"})
+                return
+
+            final_reply = final_reply.strip()
+            memory.store_chat_message(project_id, role_id, chat_session_id, "final", final_reply, is_ai_to_ai=True)
+            print("✅ [DEBATE] Stream complete!")
+            yield sse_event("done", _debate_payload(starter_sender, first_reply, claude_review, final_reply, chat_session_id))
+        except HTTPException as e:
+            yield sse_event("error", {"error": e.detail})
+        except Exception as e:
+            print(f"❌ [DEBATE] Stream error: {e}")
+            yield sse_event("error", {"error": str(e)})
+
+    return EventSourceResponse(event_generator())
 
 
 # ============================================================
@@ -524,19 +623,18 @@ async def _handle_build_mode(
     # ---- Round 1: Generate Structure (GPT-4o) ----
     print(f"🏗️ [BUILD] Round 1: GPT-4o generating structure...")
     
-    generator_prompt = round1_config["prompt_template"].format(topic=data.topic)
-    
-    # Add smart context
-    full_prompt = f"""Project Context:
-{smart_context}
-
-{generator_prompt}"""
+    # Add smart context (dynamic → user turn; static instructions stay in system)
+    full_prompt = "".join(
+        round1_config["user_template"].render_into(
+            ["Project Context:\n", smart_context, "\n\n"],
+            topic=data.topic,
+        )
+    )
     
     try:
-        first_reply = await run_in_threadpool(
-            ask_openai,
+        first_reply = await ask_openai_async(
             [
-                {"role": "system", "content": "You are an expert software architect. Generate clean, well-organized project structures."},
+                {"role": "system", "content": round1_config["system_prompt"]},
                 {"role": "user", "content": full_prompt}
             ],
             api_key=openai_key
@@ -552,13 +650,14 @@ async def _handle_build_mode(
     # ---- Round 2: Review & Enhance (Claude Sonnet) ----
     print(f"🏗️ [BUILD] Round 2: Claude reviewing...")
     
-    reviewer_prompt = round2_config["prompt_template"].format(previous_solution=first_reply)
+    reviewer_prompt = round2_config["user_template"].render(previous_solution=first_reply)
     
     try:
         claude_review = await claude_with_retry(
             [{"role": "user", "content": reviewer_prompt}],
-            system="You are a thorough code reviewer. Identify issues and suggest improvements.",
-            api_key=anthropic_key
+            system=round2_config["system_prompt"],
+            api_key=anthropic_key,
+            cache_system=True
         )
     except Exception as e:
         print(f"❌ [BUILD] Reviewer error: {e}")
@@ -571,7 +670,7 @@ async def _handle_build_mode(
     # ---- Final: Merge (Claude Sonnet 4.5) ----
     print(f"🏗️ [BUILD] Final: Claude Sonnet 4.5 creating final structure...")
     
-    merger_prompt = final_config["prompt_template"].format(
+    merger_prompt = final_config["user_template"].render(
         topic=data.topic,
         round1=first_reply,
         round2=claude_review
@@ -580,9 +679,10 @@ async def _handle_build_mode(
     try:
         final_reply = await claude_with_retry(
             [{"role": "user", "content": merger_prompt}],
-            system="You are a project architecture expert. Create the best possible final structure.",
+            system=final_config["system_prompt"],
             model="claude-sonnet-4-5-20250929",
-            api_key=anthropic_key
+            api_key=anthropic_key,
+            cache_system=True
         )
     except Exception as e:
         print(f"❌ [BUILD] Merger error: {e}")
@@ -597,7 +697,7 @@ async def _handle_build_mode(
     files_count = 0
     
     try:
-        if "===FINAL_STRUCTURE_END===" in final_reply or "```" in final_reply:
+        if FINAL_STRUCTURE_END in final_reply or "```" in final_reply:
             print(f"📦 [BUILD] Detected project structure, auto-saving...")
             
             proj_id_int = int(project_id) if str(project_id).isdigit() else None
@@ -713,6 +813,7 @@ async def _handle_build_mode(
 async def ask_ai_to_ai_route(
     data: AiToAiRequest, 
     db: Session = Depends(get_db),
+    memory: MemoryManager = Depends(get_memory),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -727,8 +828,7 @@ async def ask_ai_to_ai_route(
     1. Specified by frontend via `intent` parameter
     2. Auto-detected from message content
     """
-    
-    memory = MemoryManager(db)
+
     role_id = data.role
     project_id = data.project_id
     chat_session_id = _get_or_create_session_id(memory, role_id, project_id, data.chat_session_id)
@@ -757,6 +857,32 @@ async def ask_ai_to_ai_route(
 
     print(f"⚙️ [{intent.upper()}] topic='{data.topic[:80]}...' | role={role_id} | project={project_id}")
 
+    # ============================================================
+    # SEMANTIC CACHE (simple intent only — debate/build have side effects;
+    # fresh sessions only — a follow-up's answer depends on the conversation)
+    # ============================================================
+
+    cache_ns: Optional[Tuple[Any, ...]] = None
+    query_emb: Optional[List[float]] = None
+    if (
+        intent == "simple"
+        and settings.ENABLE_SEMANTIC_CACHE
+        and not memory.session_has_history(
+            project_id, role_id, chat_session_id, more_than=settings.SEMANTIC_CACHE_MAX_HISTORY
+        )
+    ):
+        query_emb = await asyncio.to_thread(embed_text, data.topic)
+        if query_emb is not None:
+            cache_ns = ("ai2ai", current_user.id, str(project_id), role_id, data.starter)
+            cached = semantic_cache.query(cache_ns, query_emb)
+            if cached is not None:
+                print("⚡ [SIMPLE] Semantic cache hit")
+                memory.store_chat_messages_bulk(
+                    project_id, role_id, chat_session_id,
+                    [("user", data.topic), (cached["model_used"], cached["answer"])], is_ai_to_ai=False,
+                )
+                return _simple_response(cached["answer"], cached["model_used"], chat_session_id)
+
     # ============================================================
     # BUILD SMART CONTEXT
     # ============================================================
@@ -778,7 +904,8 @@ async def ask_ai_to_ai_route(
             query=data.topic,
             session_id=chat_session_id,
             db=db,
-            memory=memory
+            memory=memory,
+            query_embedding=query_emb,
         )
         print(f"✅ Smart context ready (~{len(smart_context) // 4} tokens)")
     except Exception as e:
@@ -803,8 +930,22 @@ async def ask_ai_to_ai_route(
             chat_session_id=chat_session_id,
             openai_key=openai_key,
             anthropic_key=anthropic_key,
+            cache_ns=cache_ns,
+            query_emb=query_emb,
         )
     
+    elif intent == "debate" and data.stream:
+        return _handle_debate_mode_stream(
+            data=data,
+            memory=memory,
+            smart_context=smart_context,
+            role_id=role_id,
+            project_id=project_id,
+            chat_session_id=chat_session_id,
+            openai_key=openai_key,
+            anthropic_key=anthropic_key,
+        )
+
     elif intent == "debate":
         return await _handle_debate_mode(
             data=data,
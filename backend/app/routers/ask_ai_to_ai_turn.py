@@ -3,18 +3,16 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, field_validator
-from typing import List, Optional, Union, Literal, Dict, Any
-from sqlalchemy.orm import Session
+from typing import List, Optional, Union, Literal, Dict
 from uuid import uuid4
-import asyncio
 
-from starlette.concurrency import run_in_threadpool
-
-from app.memory.db import get_db
 from app.memory.manager import MemoryManager
+from app.memory.utils import rows_to_messages
+from app.deps import get_memory
+from app.utils.memory_writer import enqueue_memory_write
 from app.config.settings import settings
-from app.providers.openai_provider import ask_openai
-from app.providers.claude_provider import ask_claude
+from app.providers.openai_provider import ask_openai_async
+from app.providers.claude_provider import ask_claude_async_retry
 
 router = APIRouter(tags=["Chat"])
 
@@ -47,8 +45,7 @@ class AiToAiTurnRequest(BaseModel):
 
 async def _ask_openai_async(messages: List[Dict[str, str]], *, system: Optional[str] = None) -> str:
     # Use keyword args to match the wrapper signature and force plain-text answers
-    return await run_in_threadpool(
-        ask_openai,
+    return await ask_openai_async(
         messages=messages,
         system_prompt=(system or ""),
         json_mode=False,
@@ -57,32 +54,7 @@ async def _ask_openai_async(messages: List[Dict[str, str]], *, system: Optional[
 
 
 async def _ask_claude_with_retry(messages: List[Dict[str, str]], retries: int = 2, *, system: Optional[str] = None) -> str:
-    last = ""
-    for attempt in range(retries + 1):
-        try:
-            ans = await run_in_threadpool(ask_claude, messages=messages, system=system)
-            last = ans or ""
-            if ans and "[Claude Error]" not in ans and "overloaded" not in ans.lower():
-                return ans
-        except Exception as e:
-            last = f"[Claude Exception] {e}"
-        await asyncio.sleep(1.5 + attempt)
-    return last or "[Claude Retry Failed]"
-
-
-def _rows_to_messages(rows: List[Dict[str, Any]]) -> List[Dict[str, str]]:
-    """Map DB rows → OpenAI/Claude message format, keeping only user/assistant."""
-    out: List[Dict[str, str]] = []
-    for r in rows:
-        sender = (r.get("sender") or "").strip().lower()
-        text = (r.get("text") or "").strip()
-        if not text:
-            continue
-        if sender == "user":
-            out.append({"role": "user", "content": text})
-        elif sender in {"openai", "anthropic", "assistant", "final"}:
-            out.append({"role": "assistant", "content": text})
-    return out
+    return await ask_claude_async_retry(messages, retries, system=system)
 
 
 def _clip_by_tokens(mm: MemoryManager, msgs: List[Dict[str, str]], max_tokens: int) -> List[Dict[str, str]]:
@@ -108,7 +80,10 @@ def _clip_by_tokens(mm: MemoryManager, msgs: List[Dict[str, str]], max_tokens: i
 
 
 @router.post("/ask-ai-to-ai-turn")
-async def ask_ai_to_ai_turn_route(data: AiToAiTurnRequest, db: Session = Depends(get_db)):
+async def ask_ai_to_ai_turn_route(
+    data: AiToAiTurnRequest,
+    memory: MemoryManager = Depends(get_memory),
+):
     """
     Lightweight 'turn' flow:
       1) Starter model answers the topic (with trimmed history as context).
@@ -117,7 +92,6 @@ async def ask_ai_to_ai_turn_route(data: AiToAiTurnRequest, db: Session = Depends
       4) Everything is persisted + a long-term summary is saved.
     """
     try:
-        memory = MemoryManager(db)
         role_id = int(data.role_id)
         project_id = str(data.project_id)
 
@@ -143,7 +117,7 @@ async def ask_ai_to_ai_turn_route(data: AiToAiTurnRequest, db: Session = Depends
             limit=HISTORY_FETCH_LIMIT,
         )
         rows = messages_data.get("messages", [])
-        hist = _rows_to_messages(rows)
+        hist = rows_to_messages(rows)
         hist = _clip_by_tokens(memory, hist, HISTORY_MAX_TOKENS)
 
         # Compose and store the user turn
@@ -217,7 +191,7 @@ async def ask_ai_to_ai_turn_route(data: AiToAiTurnRequest, db: Session = Depends
         except Exception:
             pass
 
-        # 4) Persist long-term summary
+        # 4) Persist long-term summary (summarized + stored after the response)
         try:
             transcript = (
                 hist
@@ -226,8 +200,7 @@ async def ask_ai_to_ai_turn_route(data: AiToAiTurnRequest, db: Session = Depends
                 + [{"role": "assistant", "content": merged}]
             )
             raw_text = "\n".join([f"{m['role']}: {m['content']}" for m in transcript])
-            summary = memory.summarize_messages([raw_text])
-            memory.store_memory(project_id, role_id, summary, raw_text, chat_session_id, is_ai_to_ai=True)
+            enqueue_memory_write(project_id, role_id, raw_text, chat_session_id, is_ai_to_ai=True)
         except Exception as e:
             print(f"[AI-to-AI turn: summary error] {e}")
 
@@ -9,13 +9,13 @@ from pydantic import BaseModel, field_validator, Field
 from sqlalchemy.orm import Session
 
 from app.memory.db import get_db  # ✅ use the same get_db as the rest of the app
-from app.deps import get_current_user
+from app.deps import get_current_user, get_memory
 from app.memory.manager import MemoryManager
 from app.memory.utils import safe_text
 from app.config.settings import settings  # flags and thresholds
 
 # ✅ Deterministic YouTube path (same as /ask)
-from app.services.youtube_service import search_videos
+from app.services.youtube_service import search_videos_async
 
 import asyncio
 import re
@@ -286,7 +286,7 @@ def _detect_youtube_intent(q: str) -> Optional[str]:
 async def _safe_youtube(topic: str) -> List[Dict[str, str]]:
     """
     Fetch YouTube sidecar using the deterministic service.
-    Runs in a background thread to keep the event loop snappy.
+    Awaits the REST calls directly on the shared httpx client (no worker thread).
     """
     timeout = float(getattr(settings, "YT_SEARCH_TIMEOUT", 6.0))
     maxn = int(getattr(settings, "YT_SEARCH_MAX_RESULTS", 3))
@@ -296,8 +296,7 @@ async def _safe_youtube(topic: str) -> List[Dict[str, str]]:
 
     try:
         items = await asyncio.wait_for(
-            asyncio.to_thread(
-                search_videos,
+            search_videos_async(
                 query=topic,
                 max_results=maxn,
                 since_months=since_months,
@@ -497,6 +496,7 @@ async def get_chat_history(
     include_youtube: bool = Query(True, description="If true, rehydrate YouTube cards by re-running the deterministic search for the most recent YouTube-intent user message."),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
+    memory: MemoryManager = Depends(get_memory),
 ):
     """
     Returns chat history and summaries for the given (optional) session,
@@ -528,7 +528,6 @@ async def get_chat_history(
 
     try:
         project_id = str(project_id).strip()
-        memory = MemoryManager(db)
 
         messages_data = memory.retrieve_messages(
             project_id=project_id,
@@ -682,8 +681,8 @@ def summarize_chat(
         # Token count to decide auto-rotation (best-effort)
         total_tokens = 0
         try:
-            if hasattr(memory, "count_tokens"):
-                total_tokens = sum(memory.count_tokens(safe_text(m.get("text", ""))) for m in msgs)
+            if hasattr(memory, "count_tokens_batch"):
+                total_tokens = sum(memory.count_tokens_batch([safe_text(m.get("text", "")) for m in msgs]))
         except Exception:
             total_tokens = 0
 
@@ -8,7 +8,7 @@ import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query
 from openai import OpenAI
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 
 from app.memory.db import get_db
 from app.memory.models import CanonItem, MemoryEntry, Role, User
@@ -102,6 +102,8 @@ def list_memory(
 
     q = (
         db.query(MemoryEntry)
+        # Only MemoryOut's columns: skip raw_text and the embedding vector
+        .options(load_only(MemoryEntry.id, MemoryEntry.timestamp, MemoryEntry.summary, MemoryEntry.project_id))
         .filter(MemoryEntry.role_id == role_id, MemoryEntry.is_summary == True)  # noqa: E712
     )
     if project_id:
@@ -20,6 +20,7 @@ import urllib.parse
 from typing import Any, Dict
 
 import httpx
+import orjson
 from fastapi import APIRouter, BackgroundTasks, Header, Request
 from sqlalchemy import text
 from sqlalchemy.orm import Session
@@ -105,7 +106,8 @@ async def github_webhook(
     if x_github_event != "push":
         return {"status": "ignored", "event": x_github_event}
 
-    payload: Dict[str, Any] = await request.json()
+    # Parse the bytes already read for the HMAC check (no second body read)
+    payload: Dict[str, Any] = orjson.loads(body)
 
     full_name: str = payload.get("repository", {}).get("full_name", "")
     sha: str = payload.get("after") or payload.get("ref", "").removeprefix("refs/heads/") or "main"
@@ -31,6 +31,7 @@ from sqlalchemy.orm import Session
 from app.config.settings import settings
 from app.memory.db import SessionLocal
 from app.memory.models import CanonItem, MemoryEntry, Project
+from app.memory.utils import safe_text
 
 logger = logging.getLogger(__name__)
 
@@ -183,9 +184,12 @@ def _save_note_sync(
     content: str,
     kind: str,
     extra_tags: Optional[list] = None,
+    db: Optional[Session] = None,
 ) -> dict:
     """Dual-write: CanonItem(INBOX) + MemoryEntry + embedding. Sync."""
-    db = SessionLocal()
+    own_session = db is None
+    if db is None:
+        db = SessionLocal()
     try:
         now = datetime.utcnow()
         pid_str = str(project_id)
@@ -215,7 +219,7 @@ def _save_note_sync(
             project_id_int=project_id,
             role_id=role_id,
             chat_session_id="mobile-inbox",
-            summary=content[:2000],
+            summary=safe_text(content[:2000])[:2000],  # summaries are read back as-is
             raw_text=content,
             is_summary=True,
             is_ai_to_ai=False,
@@ -233,7 +237,8 @@ def _save_note_sync(
 
         return {"saved_title": title, "canon_item_id": item.id}
     finally:
-        db.close()
+        if own_session:
+            db.close()
 
 
 async def save_note(
@@ -241,14 +246,16 @@ async def save_note(
     content: str,
     kind: str = "text",
     extra_tags: Optional[list] = None,
+    db: Optional[Session] = None,
 ) -> dict:
     """Save text/voice/photo to Brain (CanonItem INBOX + MemoryEntry + embedding).
 
-    Creates its own DB session — safe to call from background tasks.
+    Pass the request ``db`` from HTTP handlers; without it a session is
+    created internally — safe to call from background tasks.
     extra_tags overrides the default ["mobile", kind] tag list.
     Returns ``{"saved_title": str, "canon_item_id": int}``.
     """
-    return await asyncio.to_thread(_save_note_sync, project_id, content, kind, extra_tags)
+    return await asyncio.to_thread(_save_note_sync, project_id, content, kind, extra_tags, db)
 
 
 async def delete_note(db: Session, project_id: int, note_id: int) -> dict:
@@ -412,36 +419,41 @@ async def parse_reminder_text(directive: str, tz: str = "Europe/Bratislava") ->
 #   Telegram users:  tg_user_id  (positive, typically 6-10 digit)
 #   Mobile users:   -(user.id)  (negative, no collision possible)
 
-def _load_chat_history_sync(session_key: int) -> list[dict]:
-    db = SessionLocal()
-    try:
-        rows = db.execute(
-            text("""
-                SELECT role, content FROM telegram_chat_history
-                WHERE tg_user_id = :uid
-                ORDER BY created_at DESC
-                LIMIT :lim
-            """),
-            {"uid": session_key, "lim": _CHAT_HISTORY_LIMIT},
-        ).fetchall()
-        return [{"role": r.role, "content": r.content} for r in reversed(rows)]
-    finally:
-        db.close()
+def _load_chat_history_sync(db: Session, session_key: int) -> list[dict]:
+    rows = db.execute(
+        text("""
+            SELECT role, content FROM telegram_chat_history
+            WHERE tg_user_id = :uid
+            ORDER BY created_at DESC
+            LIMIT :lim
+        """),
+        {"uid": session_key, "lim": _CHAT_HISTORY_LIMIT},
+    ).fetchall()
+    return [{"role": r.role, "content": r.content} for r in reversed(rows)]
 
 
-def _save_chat_turn_sync(session_key: int, role: str, content: str) -> None:
-    db = SessionLocal()
+def _save_chat_turns_sync(db: Session, session_key: int, turns: list[tuple[str, str]]) -> None:
+    """Insert (role, content) turns in one transaction."""
+    db.execute(
+        text("""
+            INSERT INTO telegram_chat_history (tg_user_id, role, content, created_at)
+            VALUES (:uid, :role, :content, NOW())
+        """),
+        [{"uid": session_key, "role": role, "content": content} for role, content in turns],
+    )
+    db.commit()
+
+
+def _record_chat_turns_sync(db: Optional[Session], session_key: int, turns: list[tuple[str, str]]) -> None:
+    """_save_chat_turns_sync on ``db``, or on a short-lived session when None."""
+    if db is not None:
+        _save_chat_turns_sync(db, session_key, turns)
+        return
+    own = SessionLocal()
     try:
-        db.execute(
-            text("""
-                INSERT INTO telegram_chat_history (tg_user_id, role, content, created_at)
-                VALUES (:uid, :role, :content, NOW())
-            """),
-            {"uid": session_key, "role": role, "content": content},
-        )
-        db.commit()
+        _save_chat_turns_sync(own, session_key, turns)
     finally:
-        db.close()
+        own.close()
 
 
 # ── Provider completions (sync) ───────────────────────────────
@@ -613,14 +625,24 @@ def _do_chat_sync(
     system: str,
     image_bytes: Optional[bytes],
     preferred_provider: Optional[str],
+    db: Optional[Session] = None,
 ) -> tuple[str, str]:
-    history = _load_chat_history_sync(session_key)
-    user_content = prompt or "Опиши это изображение."
-    messages = [{"role": "system", "content": system}] + history + [{"role": "user", "content": user_content}]
-    answer, provider = _chat_complete_sync(messages, image_bytes, preferred_provider)
-    _save_chat_turn_sync(session_key, "user", user_content)
-    _save_chat_turn_sync(session_key, "assistant", answer)
-    return answer, provider
+    own_session = db is None
+    if db is None:
+        db = SessionLocal()
+    try:
+        history = _load_chat_history_sync(db, session_key)
+        if own_session:
+            # Don't hold a pooled connection across the provider call
+            db.close()
+        user_content = prompt or "Опиши это изображение."
+        messages = [{"role": "system", "content": system}] + history + [{"role": "user", "content": user_content}]
+        answer, provider = _chat_complete_sync(messages, image_bytes, preferred_provider)
+        _save_chat_turns_sync(db, session_key, [("user", user_content), ("assistant", answer)])
+        return answer, provider
+    finally:
+        if own_session:
+            db.close()
 
 
 async def chat(
@@ -630,11 +652,13 @@ async def chat(
     image_bytes: Optional[bytes] = None,
     system: Optional[str] = None,
     location: str = "",
+    db: Optional[Session] = None,
 ) -> tuple[str, str]:
     """Multi-provider chat with persistent history. Returns (answer, provider_used).
 
     session_key: positive int for Telegram (tg_user_id), negative int for mobile (-(user_id)).
-    Creates its own DB session internally — safe for background tasks.
+    Reuses ``db`` when given (HTTP handlers); otherwise creates its own
+    session internally — safe for background tasks.
     Always injects current date into the system prompt.
     Realtime queries (weather, current prices, news) are auto-routed to web_answer.
     """
@@ -646,13 +670,13 @@ async def chat(
     # Auto-route realtime queries (weather, current events, etc.) to Tavily web search
     if not image_bytes and _is_realtime_query(prompt) and getattr(settings, "TAVILY_API_KEY", ""):
         logger.info("[brain/chat] realtime intent detected — routing to web: %r", prompt[:80])
-        answer, sources = await web_answer(session_key=session_key, query=prompt, location=location)
+        answer, sources = await web_answer(session_key=session_key, query=prompt, location=location, db=db)
         if sources:
             answer += "\n\nИсточники:\n" + "\n".join(f"• {u}" for u in sources)
         return answer, "web"
 
     return await asyncio.to_thread(
-        _do_chat_sync, session_key, prompt, sys_prompt, image_bytes, preferred_provider
+        _do_chat_sync, session_key, prompt, sys_prompt, image_bytes, preferred_provider, db
     )
 
 
@@ -775,10 +799,12 @@ async def web_answer(
     session_key: int,
     query: str,
     location: str = "",
+    db: Optional[Session] = None,
 ) -> tuple[str, list[str]]:
     """Tavily search → AI answer. Returns (answer_text, source_urls).
 
-    Creates its own DB session for history — safe for background tasks.
+    Records history on ``db`` when given, else on its own short-lived
+    session — safe for background tasks.
     Always injects current date; appends location when not already in the query.
     """
     today = _today_utc()
@@ -826,8 +852,7 @@ async def web_answer(
 
     def _do_complete() -> tuple[str, list[str]]:
         raw_answer, _ = _chat_complete_sync(messages)
-        _save_chat_turn_sync(session_key, "user", f"[web] {query}")
-        _save_chat_turn_sync(session_key, "assistant", raw_answer)
+        _record_chat_turns_sync(db, session_key, [("user", f"[web] {query}"), ("assistant", raw_answer)])
         clean = _SOURCES_STRIP_RE.sub("", raw_answer).rstrip()
         sources = [r.get("url", "").strip() for r in results[:5] if r.get("url")]
         return clean, sources
@@ -3,18 +3,29 @@ Debate Manager Service
 Управляет процессом дебатов между AI моделями
 """
 
+import hashlib
 import uuid
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 from datetime import datetime
 
 from app.providers.factory import ask_model
 from app.config.debate_prompts import (
     get_round_config,
-    PROPOSER_PROMPT,
-    CRITIC_PROMPT,
-    DEFENDER_PROMPT,
-    JUDGE_PROMPT
+    prompt_cache_key,
+    PromptTemplate,
+    ROUND_SUMMARY_SYSTEM_PROMPT
 )
+from app.memory.utils import count_tokens
+from app.cache.exact import LLMCache
+from app.cache.semantic import is_error_answer
+
+
+# ---- Кэш сжатых раундов (sha256 текста → summary) ----
+_summary_cache = LLMCache(ttl=float("inf"), max_entries=128)  # без TTL: тот же текст → тот же summary
+
+
+# ---- Кэш ответов раундов (prompt_cache_key → content) ----
+_response_cache = LLMCache(max_entries=256)
 
 
 class DebateManager:
@@ -115,28 +126,22 @@ class DebateManager:
         """
         config = get_round_config(round_num)
         
-        # Формируем промпт для раунда
+        # Формируем промпт для раунда (статика в system, данные в user)
         prompt = self._format_prompt(
-            config["prompt_template"],
+            config["user_template"],
             topic=topic,
             **context
         )
         
         # Вызываем модель
         try:
-            # ask_model returns a string directly, not a dict
-            content = ask_model(
-                messages=[{"role": "user", "content": prompt}],
-                model_key=config["model_key"],
-                system_prompt=None,  # Промпт уже в сообщении
-                max_tokens=config["max_tokens"]
-            )
+            content, cached = self._ask_cached(config, prompt, topic=topic, **context)
             
             # Estimate tokens from content length (rough estimate)
             tokens_used = len(content.split()) * 1.3  # Rough token estimate
             
-            # Примерный расчет стоимости (можно улучшить)
-            cost = self._estimate_cost(config["model_key"], tokens_used)
+            # Примерный расчет стоимости (можно улучшить); из кэша — бесплатно
+            cost = 0.0 if cached else self._estimate_cost(config["model_key"], tokens_used)
             
             round_result = {
                 "round_num": round_num,
@@ -177,8 +182,16 @@ class DebateManager:
         """
         config = get_round_config("final")
         
+        # Сжимаем ранние раунды, чтобы ограничить prefill судьи
+        budget = config.get("summarize_above")
+        if budget:
+            summary_model = config.get("summary_model_key", "gpt-4o-mini")
+            round1 = self._maybe_summarize(round1, budget, summary_model)
+            round2 = self._maybe_summarize(round2, budget, summary_model)
+        
         # Формируем финальный промпт
-        prompt = JUDGE_PROMPT.format(
+        prompt = self._format_prompt(
+            config["user_template"],
             topic=topic,
             round1=round1,
             round2=round2,
@@ -186,17 +199,13 @@ class DebateManager:
         )
         
         try:
-            # ask_model returns a string directly
-            content = ask_model(
-                messages=[{"role": "user", "content": prompt}],
-                model_key=config["model_key"],
-                system_prompt=None,
-                max_tokens=config["max_tokens"]
+            content, cached = self._ask_cached(
+                config, prompt, topic=topic, round1=round1, round2=round2, round3=round3
             )
             
             # Estimate tokens from content length
             tokens_used = len(content.split()) * 1.3
-            cost = self._estimate_cost(config["model_key"], tokens_used)
+            cost = 0.0 if cached else self._estimate_cost(config["model_key"], tokens_used)
             
             self.total_tokens += tokens_used
             self.total_cost += cost
@@ -212,19 +221,96 @@ class DebateManager:
         except Exception as e:
             raise Exception(f"Final synthesis failed: {str(e)}")
     
-    def _format_prompt(self, template: str, **kwargs) -> str:
+    def _ask_cached(
+        self,
+        config: Mapping[str, Any],
+        prompt: str,
+        **prompt_kwargs: Any
+    ) -> Tuple[str, bool]:
+        """
+        Вызывает модель раунда, используя кэш ответов при cache_ttl > 0
+        
+        Args:
+            config: Конфиг раунда
+            prompt: Отрендеренный user-промпт
+            **prompt_kwargs: Переменные шаблона (для ключа кэша)
+            
+        Returns:
+            (content, cached)
+        """
+        ttl = config.get("cache_ttl", 0)
+        key = prompt_cache_key(config, **prompt_kwargs) if ttl else None
+        if key:
+            hit = _response_cache.get(key)
+            if hit is not None:
+                return hit, True
+        
+        # ask_model returns a string directly, not a dict
+        content = ask_model(
+            messages=[{"role": "user", "content": prompt}],
+            model_key=config["model_key"],
+            system_prompt=config["system_prompt"],
+            max_tokens=config["max_tokens"],
+            cache_system=True
+        )
+        if key and not is_error_answer(content):
+            _response_cache.set(key, content, ttl)
+        return content, False
+    
+    def _maybe_summarize(self, text: str, budget_tokens: int, model_key: str) -> str:
+        """
+        Сжимает текст раунда, если он длиннее budget_tokens
+        
+        Args:
+            text: Контент раунда
+            budget_tokens: Порог в токенах
+            model_key: Дешёвая модель для сжатия
+            
+        Returns:
+            Исходный текст (в пределах бюджета или при ошибке) либо summary
+        """
+        if count_tokens(text) <= budget_tokens:
+            return text
+        
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        cached = _summary_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            summary = ask_model(
+                messages=[{"role": "user", "content": text}],
+                model_key=model_key,
+                system_prompt=ROUND_SUMMARY_SYSTEM_PROMPT,
+                max_tokens=budget_tokens
+            )
+        except Exception:
+            return text
+        
+        if is_error_answer(summary):
+            return text
+        
+        tokens_used = len(summary.split()) * 1.3
+        cost = self._estimate_cost(model_key, tokens_used)
+        self.total_tokens += tokens_used
+        self.total_cost += cost
+        
+        _summary_cache.set(key, summary)
+        return summary
+    
+    def _format_prompt(self, template: PromptTemplate, **kwargs) -> str:
         """
         Форматирует промпт с подстановкой переменных
         
         Args:
-            template: Шаблон промпта
+            template: Предкомпилированный шаблон промпта
             **kwargs: Переменные для подстановки
             
         Returns:
             Отформатированный промпт
         """
         try:
-            return template.format(**kwargs)
+            return template.render(**kwargs)
         except KeyError as e:
             raise ValueError(f"Missing required prompt variable: {e}")
     
@@ -130,16 +130,19 @@ def semantic_search(
     query: str,
     project_id: int,
     db: Session,
-    limit: int = 15
+    limit: int = 15,
+    query_embedding: Optional[List[float]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Semantic search using pgvector cosine similarity.
     
-    Finds files with similar meaning to query.
+    Finds files with similar meaning to query. query_embedding, if given,
+    is the precomputed embedding of query (skips the API call).
     """
     try:
         # Generate query embedding
-        query_embedding = vector_service.create_embedding(query)
+        if query_embedding is None:
+            query_embedding = vector_service.create_embedding(query)
         
         result = db.execute(text("""
             SELECT 
@@ -318,7 +321,8 @@ def hybrid_search(
     db: Session,
     config: Optional[HybridSearchConfig] = None,
     preset: Optional[str] = None,
-    limit: int = 10
+    limit: int = 10,
+    query_embedding: Optional[List[float]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Hybrid search combining semantic, FTS, and graph search.
@@ -330,6 +334,7 @@ def hybrid_search(
         config: Custom weight configuration
         preset: Use preset config ("default", "code", "exact", "related")
         limit: Max results to return
+        query_embedding: Precomputed embedding of query (skips the API call)
         
     Returns:
         List of files with combined scores, sorted by relevance
@@ -344,7 +349,7 @@ def hybrid_search(
     logger.info(f"🔍 [HYBRID] weights: semantic={config.semantic_weight}, fts={config.fts_weight}, graph={config.graph_weight}")
     
     # Run all searches
-    semantic_results = semantic_search(query, project_id, db, config.semantic_limit)
+    semantic_results = semantic_search(query, project_id, db, config.semantic_limit, query_embedding=query_embedding)
     fts_results = fts_search(query, project_id, db, config.fts_limit)
     graph_results = graph_search(query, project_id, db, config.graph_limit)
     
@@ -9,7 +9,7 @@ REFACTORED v2.0:
   * END (high attention): Relevant Code
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
@@ -132,11 +132,14 @@ async def build_smart_context(
     query: str,
     session_id: str,
     db: Session,
-    memory: MemoryManager
+    memory: MemoryManager,
+    query_embedding: Optional[List[float]] = None,
 ) -> str:
     """
     Build Smart Context using existing services.
     Returns ~4K tokens instead of 150K.
+    query_embedding: precomputed embedding of query, reused by the
+    semantic searches (4, 5) instead of embedding the query again.
     
     ORDER BASED ON RESEARCH ("Lost in the Middle" effect):
     - START (high attention): Project structure
@@ -365,7 +368,8 @@ async def build_smart_context(
             db=db,
             query=query,
             session_id=session_id,
-            limit=3
+            limit=3,
+            query_embedding=query_embedding,
         )
         if relevant_context:
             parts.append(f"📌 RELATED DISCUSSIONS:\n{relevant_context}")
@@ -388,7 +392,8 @@ async def build_smart_context(
             project_id=project_id,
             db=db,
             preset="code",  # Balanced: semantic=40%, fts=30%, graph=30%
-            limit=15
+            limit=15,
+            query_embedding=query_embedding,
         )
 
         if relevant_files:
@@ -49,7 +49,7 @@ def preflight(
       "over_hard": false,   # >= hard
     }
     """
-    soft, hard = get_thresholds(model=model, provider=provider)
+    soft, hard = get_thresholds(model, provider)  # positional → one lru_cache key
     total, parts = estimate_tokens_batch(inputs, model=model)
 
     near_soft = total >= int(soft * 0.80)
@@ -183,7 +183,8 @@ def store_message_with_embedding(
     db: Session,
     message_id: int,
     content: str,
-    table_name: str = "memory_entries"
+    table_name: str = "memory_entries",
+    embedding: Optional[List[float]] = None,
 ) -> None:
     """
     Generate and store embedding for a message.
@@ -196,10 +197,12 @@ def store_message_with_embedding(
         message_id: ID of the message to embed
         content: Message content to embed
         table_name: Name of the table storing messages (default: memory_entries)
+        embedding: Precomputed embedding of content (skips the API call)
     """
     try:
         # Generate embedding
-        embedding = create_embedding(content)
+        if embedding is None:
+            embedding = create_embedding(content)
         
         # Update message with embedding vector
         db.execute(
@@ -221,7 +224,8 @@ def search_similar_messages(
     session_id: str,
     limit: int = 5,
     table_name: str = "memory_entries",
-    session_column: str = "chat_session_id"
+    session_column: str = "chat_session_id",
+    query_embedding: Optional[List[float]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Perform semantic search using pgvector cosine similarity.
@@ -235,6 +239,7 @@ def search_similar_messages(
         limit: Maximum number of results to return
         table_name: Name of the table storing messages
         session_column: Column name for session ID
+        query_embedding: Precomputed embedding of query (skips the API call)
         
     Returns:
         List of dictionaries containing:
@@ -246,7 +251,8 @@ def search_similar_messages(
     """
     try:
         # Generate query embedding
-        query_embedding = create_embedding(query)
+        if query_embedding is None:
+            query_embedding = create_embedding(query)
         
         # Perform vector similarity search
         # <=> is pgvector's cosine distance operator
@@ -294,7 +300,8 @@ def get_relevant_context(
     query: str,
     session_id: str,
     limit: int = 3,
-    max_chars_per_message: int = 200
+    max_chars_per_message: int = 200,
+    query_embedding: Optional[List[float]] = None,
 ) -> str:
     """
     Get relevant context from conversation history for RAG.
@@ -309,11 +316,12 @@ def get_relevant_context(
         session_id: Chat session ID
         limit: Number of relevant messages to retrieve
         max_chars_per_message: Max characters to include per message
+        query_embedding: Precomputed embedding of query (skips the API call)
         
     Returns:
         Formatted context string ready for inclusion in prompt
     """
-    similar_messages = search_similar_messages(db, query, session_id, limit)
+    similar_messages = search_similar_messages(db, query, session_id, limit, query_embedding=query_embedding)
     
     if not similar_messages:
         return ""
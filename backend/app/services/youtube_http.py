@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 import os
-import json
 import re
+import threading
 from typing import Tuple, List, Dict, Optional, Union, Any
 
+import httpx
 import requests  # used by both HTTP paths and the new helpers
 
 # -------------------- optional deps --------------------
@@ -138,11 +139,24 @@ def _norm_hit(title: str, url: str, video_id: Optional[str], desc: Optional[str]
     }
 
 # -------------------- Legacy Public API (kept for compatibility) --------------------
+# googleapiclient services sit on httplib2, which is not thread-safe, so the
+# built client is reused per thread (and rebuilt only if the key changes).
+_yt_local = threading.local()
+
+def _get_yt_client(api_key: str) -> Any:
+    cached = getattr(_yt_local, "client", None)
+    if cached is not None and cached[0] == api_key:
+        return cached[1]
+    # static_discovery: use the bundled discovery doc, no HTTP fetch
+    yt = build("youtube", "v3", developerKey=api_key, cache_discovery=False, static_discovery=True)
+    _yt_local.client = (api_key, yt)
+    return yt
+
 def _search_youtube_api(api_key: str, query: str, max_results: int) -> List[Dict[str, str]]:
     if not _HAVE_GOOGLE_API or build is None:
         _dbg(False, "[YouTube] googleapiclient not installed; skipping API call.")
         return []
-    yt = build("youtube", "v3", developerKey=api_key, cache_discovery=False)
+    yt = _get_yt_client(api_key)
     _dbg(False, f"[YouTube] Searching (API): '{query}', max={max_results}, region={_REGION_CODE or '-'}, safe={_SAFESEARCH}, order={_YT_API_ORDER}")
     kwargs: Dict[str, Any] = {
         "part": "snippet",
@@ -311,19 +325,19 @@ def perform_youtube_search(
     role_id: Optional[Union[int, str]] = None,
     project_id: Optional[Union[int, str]] = None,
 ) -> Union[List[Dict[str, str]], Tuple[str, List[Dict[str, str]]]]:
+    """
+    Search and, when mem/role_id/project_id are given, return (block, hits).
+    No long-term memory is written here: callers fold the block into their
+    single end-of-request summary, so a YouTube turn costs one summarize +
+    store_memory instead of two.
+    """
     hits = search_youtube(query, max_results=max_results)
     if mem is None or role_id is None or project_id is None:
         return hits
     try:
-        raw = f"YouTube search ({query}): {json.dumps(hits, indent=2)}"
-        summary = mem.summarize_messages([raw])
-        mem.store_memory(project_id=str(project_id), role_id=int(role_id), summary=summary, raw_text=raw)
-        try:
-            mem.insert_audit_log(str(project_id), int(role_id), None, "youtube", "search", (query or "")[:300])
-        except Exception:
-            pass
+        mem.insert_audit_log(str(project_id), int(role_id), None, "youtube", "search", (query or "")[:300])
     except Exception as e:
-        _dbg(False, "[YouTube] Memory logging failed:", e)
+        _dbg(False, "[YouTube] Audit logging failed:", e)
     block = (
         f"\n\n▶️ **YouTube search results for:** `{(query or '').strip()}`\n"
         + ("\n".join(f"- [{h['title']}]({h['url']})" for h in hits) if hits else "- _(no results)_")
@@ -353,7 +367,8 @@ def _fields_videos() -> str:
         ")"
     )
 
-def search_list(
+def _search_params(
+    api_key: str,
     *,
     q: str,
     max_results: int,
@@ -362,15 +377,7 @@ def search_list(
     published_after_iso: Optional[str],
     relevance_language: Optional[str],
     safe_search: Optional[str],
-    debug: bool = False,
 ) -> Dict[str, Any]:
-    """Deterministic call to search.list (type=video, part=snippet)."""
-    from urllib.parse import urlencode
-
-    api_key = os.getenv("YOUTUBE_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError("YouTube API key not configured")
-
     params = {
         "key": api_key,
         "part": "snippet",
@@ -388,11 +395,50 @@ def search_list(
         params["relevanceLanguage"] = relevance_language
     if safe_search:
         params["safeSearch"] = safe_search
+    return params
+
+def _videos_params(api_key: str, video_ids: List[str]) -> Dict[str, Any]:
+    return {
+        "key": api_key,
+        "part": "contentDetails,statistics,status,snippet",
+        "id": ",".join(video_ids),
+        "fields": _fields_videos(),
+        "maxResults": len(video_ids),
+    }
 
-    # mask key in debug URL
-    dbg_params = dict(params)
-    dbg_params["key"] = "***"
-    _dbg(debug, f"[YT HTTP] GET {BASE_URL}/search?{urlencode(dbg_params)}")
+def _api_key_or_raise() -> str:
+    api_key = os.getenv("YOUTUBE_API_KEY", "").strip()
+    if not api_key:
+        raise RuntimeError("YouTube API key not configured")
+    return api_key
+
+def _dbg_url(debug: bool, path: str, params: Dict[str, Any]) -> None:
+    if debug or _YT_DEBUG:
+        from urllib.parse import urlencode
+
+        # mask key in debug URL
+        dbg_params = dict(params)
+        dbg_params["key"] = "***"
+        print(f"[YT HTTP] GET {BASE_URL}{path}?{urlencode(dbg_params)}")
+
+def search_list(
+    *,
+    q: str,
+    max_results: int,
+    order: str,
+    region: str,
+    published_after_iso: Optional[str],
+    relevance_language: Optional[str],
+    safe_search: Optional[str],
+    debug: bool = False,
+) -> Dict[str, Any]:
+    """Deterministic call to search.list (type=video, part=snippet)."""
+    params = _search_params(
+        _api_key_or_raise(), q=q, max_results=max_results, order=order, region=region,
+        published_after_iso=published_after_iso, relevance_language=relevance_language,
+        safe_search=safe_search,
+    )
+    _dbg_url(debug, "/search", params)
 
     r = requests.get(f"{BASE_URL}/search", params=params, timeout=10)
     _dbg(debug, f"[YT HTTP] status={r.status_code}")
@@ -407,30 +453,74 @@ def search_list(
 
 def videos_list(video_ids: List[str], debug: bool = False) -> Dict[str, Any]:
     """Deterministic call to videos.list to enrich ids with duration, views, and status."""
-    from urllib.parse import urlencode
-
     if not video_ids:
         _dbg(debug, "[YT HTTP] videos.list skipped: no ids")
         return {"items": []}
 
-    api_key = os.getenv("YOUTUBE_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError("YouTube API key not configured")
+    params = _videos_params(_api_key_or_raise(), video_ids)
+    _dbg_url(debug, "/videos", params)
 
-    params = {
-        "key": api_key,
-        "part": "contentDetails,statistics,status,snippet",
-        "id": ",".join(video_ids),
-        "fields": _fields_videos(),
-        "maxResults": len(video_ids),
-    }
+    r = requests.get(f"{BASE_URL}/videos", params=params, timeout=10)
+    _dbg(debug, f"[YT HTTP] status={r.status_code}")
+    if r.status_code != 200:
+        raise RuntimeError(f"YouTube videos error {r.status_code}: {r.text}")
 
-    # mask key in debug URL
-    dbg_params = dict(params)
-    dbg_params["key"] = "***"
-    _dbg(debug, f"[YT HTTP] GET {BASE_URL}/videos?{urlencode(dbg_params)}")
+    data = r.json() or {}
+    _dbg(debug, f"[YT HTTP] videos.items={len(data.get('items', []) or [])}")
+    return data
 
-    r = requests.get(f"{BASE_URL}/videos", params=params, timeout=10)
+# -------------------- Async variants (shared httpx pool) --------------------
+_yt_http: Optional[httpx.AsyncClient] = None
+
+def _get_yt_http() -> httpx.AsyncClient:
+    """One keep-alive AsyncClient for all YouTube Data API calls."""
+    global _yt_http
+    if _yt_http is None:
+        _yt_http = httpx.AsyncClient(
+            base_url=BASE_URL,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _yt_http
+
+async def search_list_async(
+    *,
+    q: str,
+    max_results: int,
+    order: str,
+    region: str,
+    published_after_iso: Optional[str],
+    relevance_language: Optional[str],
+    safe_search: Optional[str],
+    debug: bool = False,
+) -> Dict[str, Any]:
+    """Awaitable search_list() — same params and errors, no worker thread."""
+    params = _search_params(
+        _api_key_or_raise(), q=q, max_results=max_results, order=order, region=region,
+        published_after_iso=published_after_iso, relevance_language=relevance_language,
+        safe_search=safe_search,
+    )
+    _dbg_url(debug, "/search", params)
+
+    r = await _get_yt_http().get("/search", params=params)
+    _dbg(debug, f"[YT HTTP] status={r.status_code}")
+    if r.status_code != 200:
+        raise RuntimeError(f"YouTube search error {r.status_code}: {r.text}")
+
+    data = r.json() or {}
+    _dbg(debug, f"[YT HTTP] search.items={len(data.get('items', []) or [])}")
+    return data
+
+async def videos_list_async(video_ids: List[str], debug: bool = False) -> Dict[str, Any]:
+    """Awaitable videos_list()."""
+    if not video_ids:
+        _dbg(debug, "[YT HTTP] videos.list skipped: no ids")
+        return {"items": []}
+
+    params = _videos_params(_api_key_or_raise(), video_ids)
+    _dbg_url(debug, "/videos", params)
+
+    r = await _get_yt_http().get("/videos", params=params)
     _dbg(debug, f"[YT HTTP] status={r.status_code}")
     if r.status_code != 200:
         raise RuntimeError(f"YouTube videos error {r.status_code}: {r.text}")
@@ -444,4 +534,6 @@ __all__ = [
     "perform_youtube_search",
     "search_list",
     "videos_list",
+    "search_list_async",
+    "videos_list_async",
 ]
@@ -6,7 +6,12 @@ from datetime import datetime, timedelta, timezone
 import time
 
 from app.config.settings import settings
-from app.services.youtube_http import search_list, videos_list
+from app.services.youtube_http import (
+    search_list,
+    search_list_async,
+    videos_list,
+    videos_list_async,
+)
 
 __SVC_VERSION__ = "yt-svc v4"
 
@@ -316,6 +321,106 @@ def search_videos_smart(
     return results
 
 
+# ------------------- request building / result shaping -------------------
+# Shared by search_videos() and search_videos_async(): only the transport
+# (youtube_http sync vs async client) differs between the two.
+def _prepare_search(
+    *,
+    query: str,
+    max_results: int,
+    since_months: int,
+    channels: Optional[str],
+    order: Optional[str],
+    region: Optional[str],
+    debug: bool,
+) -> Tuple[Tuple, Dict[str, Any], bool]:
+    """Resolve defaults → (cache_key, search.list kwargs, debug flag)."""
+    if not settings.YOUTUBE_API_KEY:
+        raise RuntimeError("YouTube API key not configured")
+
+    eff_order = order or getattr(settings, "YOUTUBE_ORDER", "relevance")
+    eff_region = region or getattr(settings, "YOUTUBE_REGION_CODE", "")
+    dbg = debug or getattr(settings, "YOUTUBE_DEBUG", False)
+
+    # entry banner (versioned)
+    if dbg:
+        print(f"[YouTube:{__SVC_VERSION__}] query='{query}' max={max_results} since={since_months}m order={eff_order} region={eff_region or '-'}")
+
+    cache_key = (query, max_results, since_months, channels or "", eff_order, eff_region)
+    search_kwargs = dict(
+        q=query,
+        max_results=max_results,
+        order=eff_order,
+        region=eff_region,
+        published_after_iso=_iso_published_after(since_months),
+        relevance_language=None,
+        safe_search=getattr(settings, "YOUTUBE_SAFESEARCH", "moderate"),
+        debug=dbg,
+    )
+    return cache_key, search_kwargs, dbg
+
+
+def _cached(cache_key: Tuple, dbg: bool) -> Optional[List[Dict[str, Any]]]:
+    cached = _cache.get(cache_key)
+    if cached is not None and dbg:
+        print(f"[YouTube:{__SVC_VERSION__}] cache HIT for key={cache_key}")
+    return cached
+
+
+def _search_ids(s_json: Dict[str, Any], dbg: bool) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """search.list payload → (items, video IDs in search order)."""
+    s_items = s_json.get("items", []) or []
+    ids = [
+        (it.get("id") or {}).get("videoId")
+        for it in s_items
+        if (it.get("id") or {}).get("videoId")
+    ]
+    if dbg:
+        print(f"[YouTube:{__SVC_VERSION__}] search.list items={len(s_items)} ids(sample)={ids[:5]}")
+    return s_items, ids
+
+
+def _finish_search(
+    cache_key: Tuple,
+    s_items: List[Dict[str, Any]],
+    v_json: Dict[str, Any],
+    *,
+    channels: Optional[str],
+    max_results: int,
+    dbg: bool,
+) -> List[Dict[str, Any]]:
+    """videos.list payload → normalized, allowlisted, capped results (cached)."""
+    v_items = v_json.get("items", []) or []
+    if dbg:
+        print(f"[YouTube:{__SVC_VERSION__}] videos.list items={len(v_items)}")
+
+    items = _normalize(s_items, v_items)
+    if dbg:
+        print(f"[YouTube:{__SVC_VERSION__}] normalized={len(items)} (pre-filter)")
+
+    items = _apply_channel_allowlist(items, channels)
+    items = items[:max_results]  # enforce post-filter cap
+    _cache.set(cache_key, items)
+    return items
+
+
+def _print_diag(
+    items: List[Dict[str, Any]],
+    search_kwargs: Dict[str, Any],
+    since_months: int,
+    cache_hit: bool,
+) -> None:
+    hosts = ",".join(getattr(settings, "PIPED_HOSTS", [])) if getattr(settings, "PIPED_HOSTS", ()) else "-"
+    since_tag = f"{since_months}m" if since_months else "0m"
+    allowlisted = len(getattr(settings, "YOUTUBE_CHANNEL_ALLOWLIST", []))
+    print(
+        f"[YouTube:diag {__SVC_VERSION__}] key=yes region={search_kwargs['region'] or '-'} order={search_kwargs['order']} "
+        f"safe={search_kwargs['safe_search']} since={since_tag} "
+        f"allowlisted={allowlisted} piped_disabled={getattr(settings, 'PIPED_DISABLE', True)} hosts={hosts}"
+    )
+    print(f"[YouTube] results={len(items)} cache={'HIT' if cache_hit else 'MISS'}")
+
+
 # --------------------------- public API ---------------------------
 def search_videos(
     *,
@@ -335,69 +440,57 @@ def search_videos(
     4) normalize → schema used by routers/youtube.py
     5) optional allowlist filter by channels
     """
-    if not settings.YOUTUBE_API_KEY:
-        raise RuntimeError("YouTube API key not configured")
+    cache_key, search_kwargs, dbg = _prepare_search(
+        query=query, max_results=max_results, since_months=since_months,
+        channels=channels, order=order, region=region, debug=debug,
+    )
+    items = _cached(cache_key, dbg)
+    cache_hit = items is not None
+
+    if not cache_hit:
+        s_items, ids = _search_ids(search_list(**search_kwargs), dbg)
+        items = _finish_search(
+            cache_key, s_items, videos_list(ids, debug=dbg),
+            channels=channels, max_results=max_results, dbg=dbg,
+        )
 
-    eff_order = order or getattr(settings, "YOUTUBE_ORDER", "relevance")
-    eff_region = region or getattr(settings, "YOUTUBE_REGION_CODE", "")
-    published_after = _iso_published_after(since_months)
+    # diagnostics (final)
+    if dbg:
+        _print_diag(items, search_kwargs, since_months, cache_hit)
 
-    # entry banner (versioned)
-    if debug or getattr(settings, "YOUTUBE_DEBUG", False):
-        print(f"[YouTube:{__SVC_VERSION__}] query='{query}' max={max_results} since={since_months}m order={eff_order} region={eff_region or '-'}")
+    return items
 
-    cache_key = (query, max_results, since_months, channels or "", eff_order, eff_region)
-    cached = _cache.get(cache_key)
-    cache_hit = cached is not None
-
-    if cache_hit:
-        items = cached
-        if debug or getattr(settings, "YOUTUBE_DEBUG", False):
-            print(f"[YouTube:{__SVC_VERSION__}] cache HIT for key={cache_key}")
-    else:
-        s_json = search_list(
-            q=query,
-            max_results=max_results,
-            order=eff_order,
-            region=eff_region,
-            published_after_iso=published_after,
-            relevance_language=None,
-            safe_search=getattr(settings, "YOUTUBE_SAFESEARCH", "moderate"),
-            debug=debug or getattr(settings, "YOUTUBE_DEBUG", False),
-        )
-        s_items = s_json.get("items", []) or []
-        ids = [
-            (it.get("id") or {}).get("videoId")
-            for it in s_items
-            if (it.get("id") or {}).get("videoId")
-        ]
-        if debug or getattr(settings, "YOUTUBE_DEBUG", False):
-            print(f"[YouTube:{__SVC_VERSION__}] search.list items={len(s_items)} ids(sample)={ids[:5]}")
-
-        v_json = videos_list(ids, debug=debug or getattr(settings, "YOUTUBE_DEBUG", False))
-        v_items = v_json.get("items", []) or []
-        if debug or getattr(settings, "YOUTUBE_DEBUG", False):
-            print(f"[YouTube:{__SVC_VERSION__}] videos.list items={len(v_items)}")
-
-        items = _normalize(s_items, v_items)
-        if debug or getattr(settings, "YOUTUBE_DEBUG", False):
-            print(f"[YouTube:{__SVC_VERSION__}] normalized={len(items)} (pre-filter)")
-
-        items = _apply_channel_allowlist(items, channels)
-        items = items[:max_results]  # enforce post-filter cap
-        _cache.set(cache_key, items)
 
-    # diagnostics (final)
-    if debug or getattr(settings, "YOUTUBE_DEBUG", False):
-        key_flag = "yes"
-        hosts = ",".join(getattr(settings, "PIPED_HOSTS", [])) if getattr(settings, "PIPED_HOSTS", ()) else "-"
-        since_tag = f"{since_months}m" if since_months else "0m"
-        allowlisted = len(getattr(settings, "YOUTUBE_CHANNEL_ALLOWLIST", []))
-        print(
-            f"[YouTube:diag {__SVC_VERSION__}] key={key_flag} region={eff_region or '-'} order={eff_order} "
-            f"safe={getattr(settings, 'YOUTUBE_SAFESEARCH', 'moderate')} since={since_tag} "
-            f"allowlisted={allowlisted} piped_disabled={getattr(settings, 'PIPED_DISABLE', True)} hosts={hosts}"
+async def search_videos_async(
+    *,
+    query: str,
+    max_results: int = 3,
+    since_months: int = 24,
+    channels: Optional[str] = None,
+    order: Optional[str] = None,
+    region: Optional[str] = None,
+    debug: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Awaitable search_videos(): same cache, normalization and allowlist,
+    but search.list / videos.list go through the shared httpx AsyncClient
+    instead of blocking a worker thread.
+    """
+    cache_key, search_kwargs, dbg = _prepare_search(
+        query=query, max_results=max_results, since_months=since_months,
+        channels=channels, order=order, region=region, debug=debug,
+    )
+    items = _cached(cache_key, dbg)
+    cache_hit = items is not None
+
+    if not cache_hit:
+        s_items, ids = _search_ids(await search_list_async(**search_kwargs), dbg)
+        items = _finish_search(
+            cache_key, s_items, await videos_list_async(ids, debug=dbg),
+            channels=channels, max_results=max_results, dbg=dbg,
         )
-        print(f"[YouTube] results={len(items)} cache={'HIT' if cache_hit else 'MISS'}")
+
+    if dbg:
+        _print_diag(items, search_kwargs, since_months, cache_hit)
 
     return items
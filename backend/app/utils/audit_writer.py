@@ -0,0 +1,64 @@
+"""
+Deferred audit-log writes off the request path.
+
+Usage (sync or async context — never blocks on the DB):
+    from app.utils.audit_writer import enqueue_audit_log
+
+    enqueue_audit_log({"project_id": "1", "role_id": 2, "provider": "openai", "action": "ask", ...})
+
+Rows are audit_logs column dicts (MemoryManager.insert_audit_log builds them).
+The consumer is started/stopped by the app lifespan (start_audit_writer /
+stop_audit_writer, which flushes what is still queued). It is a BatchWriter:
+batches of up to BATCH_SIZE rows (or whatever arrived within FLUSH_INTERVAL)
+are written in a worker thread on their own session as one executemany
+INSERT + commit. Without a running consumer (scripts, tests) the row is
+written inline, exactly as before.
+"""
+from typing import Any, Dict, List
+
+from app.utils.batch_writer import BatchWriter
+
+QUEUE_MAXSIZE = 10_000
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.1  # seconds
+
+
+def _write_batch(rows: List[Dict[str, Any]]) -> None:
+    from sqlalchemy import insert
+
+    from app.memory.db import SessionLocal
+    from app.memory.models import AuditLog
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(AuditLog), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise  # BatchWriter retries the rows one by one
+    finally:
+        db.close()
+
+
+_writer: BatchWriter[Dict[str, Any]] = BatchWriter(
+    "audit log",
+    _write_batch,
+    batch_size=BATCH_SIZE,
+    flush_interval=FLUSH_INTERVAL,
+    queue_maxsize=QUEUE_MAXSIZE,
+    describe=lambda row: f"{row.get('provider')}/{row.get('action')}",
+)
+
+
+def enqueue_audit_log(row: Dict[str, Any]) -> None:
+    """Queue one audit_logs row — returns immediately (thread-safe)."""
+    _writer.enqueue(row)
+
+
+def start_audit_writer() -> None:
+    _writer.start()
+
+
+async def stop_audit_writer() -> None:
+    """Flush whatever is still queued, then stop the consumer."""
+    await _writer.stop()
@@ -0,0 +1,123 @@
+"""
+Queue-backed batch writer: callers enqueue items without blocking, one
+consumer task drains them in batches and hands each batch to a blocking
+write_batch(items) in a worker thread.
+
+    writer = BatchWriter("audit log", _write_batch, batch_size=256)
+    writer.start()          # app lifespan, on the running loop
+    writer.enqueue(item)    # any thread, sync or async context
+    await writer.stop()     # flushes what is still queued
+
+A batch is up to batch_size items, or whatever arrived within
+flush_interval of its first item. Without a running consumer (scripts,
+tests) enqueue() calls write_batch([item]) inline.
+
+Items are not dropped: write_batch raises on failure and the batch is
+then retried one item at a time, and when the queue is full the item is
+written on its own in the loop's default executor instead.
+"""
+import asyncio
+import logging
+from typing import Callable, Generic, List, Optional, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()  # sentinel: flush and exit
+
+
+class BatchWriter(Generic[T]):
+    def __init__(
+        self,
+        name: str,
+        write_batch: Callable[[List[T]], None],
+        batch_size: int = 32,
+        flush_interval: float = 0.1,
+        queue_maxsize: int = 10_000,
+        describe: Callable[[T], str] = repr,
+    ) -> None:
+        self.name = name
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_maxsize = queue_maxsize
+        self.describe = describe  # item label for warnings
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._overflow: Set["asyncio.Future[None]"] = set()  # queue-full writes in flight
+
+    def _write(self, batch: List[T]) -> None:
+        """write_batch(batch); on failure fall back to one item at a time."""
+        try:
+            self.write_batch(batch)
+        except Exception as exc:
+            if len(batch) == 1:
+                logger.warning("%s of %s failed: %s", self.name, self.describe(batch[0]), exc)
+                return
+            logger.warning("%s batch (%d items) failed, writing one by one: %s", self.name, len(batch), exc)
+            for item in batch:
+                self._write([item])
+
+    def _put(self, item: T) -> None:
+        try:
+            self._queue.put_nowait(item)  # type: ignore[union-attr]
+        except asyncio.QueueFull:
+            logger.warning("%s queue full — writing %s inline", self.name, self.describe(item))
+            fut = self._loop.run_in_executor(None, self._write, [item])  # type: ignore[union-attr]
+            self._overflow.add(fut)
+            fut.add_done_callback(self._overflow.discard)
+
+    def enqueue(self, item: T) -> None:
+        """Queue one item — returns immediately (thread-safe)."""
+        loop = self._loop
+        if loop is None or self._queue is None or loop.is_closed():
+            self._write([item])
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._put(item)
+        else:
+            loop.call_soon_threadsafe(self._put, item)
+
+    async def _consume(self) -> None:
+        queue, loop = self._queue, self._loop
+        assert queue is not None and loop is not None
+        stopping = False
+        while not stopping:
+            first = await queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await asyncio.to_thread(self._write, batch)
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_maxsize)
+        self._task = self._loop.create_task(self._consume())
+
+    async def stop(self) -> None:
+        """Flush whatever is still queued, then stop the consumer."""
+        if self._task is not None and self._queue is not None:
+            await self._queue.put(_STOP)
+            await self._task
+        if self._overflow:
+            await asyncio.gather(*self._overflow)
+        self._queue, self._loop, self._task = None, None, None
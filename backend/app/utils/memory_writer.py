@@ -0,0 +1,111 @@
+"""
+Deferred long-term memory writes (summarize + store_memory) off the request path.
+
+Usage (sync or async context — never blocks on the LLM summary or the DB):
+    from app.utils.memory_writer import enqueue_memory_write
+
+    enqueue_memory_write(project_id, role_id, raw_text, chat_session_id, is_ai_to_ai=True)
+
+The consumer is started/stopped by the app lifespan (start_memory_writer /
+stop_memory_writer). It is a BatchWriter: batches of up to BATCH_SIZE items
+(or whatever arrived within FLUSH_INTERVAL) are written in a worker thread on
+their own session, as a single INSERT transaction. Missing summaries in a
+batch are generated concurrently (SUMMARY_CONCURRENCY LLM calls at a time),
+so one batch costs about one summary round-trip, not one per item. Without a
+running consumer (scripts, tests) the write happens inline, exactly as before.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional
+
+from app.utils.batch_writer import BatchWriter
+
+if TYPE_CHECKING:
+    from app.memory.manager import MemoryManager
+
+logger = logging.getLogger(__name__)
+
+QUEUE_MAXSIZE = 10_000
+BATCH_SIZE = 32
+FLUSH_INTERVAL = 0.1  # seconds
+SUMMARY_CONCURRENCY = 8
+
+
+@dataclass(frozen=True)
+class _MemoryWrite:
+    project_id: str
+    role_id: int
+    raw_text: str
+    chat_session_id: Optional[str] = None
+    is_ai_to_ai: bool = False
+    summary: Optional[str] = None
+
+
+_summary_pool = ThreadPoolExecutor(max_workers=SUMMARY_CONCURRENCY, thread_name_prefix="memory-summary")
+
+
+def _summarize(mm: "MemoryManager", it: _MemoryWrite) -> str:
+    if it.summary is not None:
+        return it.summary
+    try:
+        return mm.summarize_messages([it.raw_text])
+    except Exception as exc:
+        logger.warning("memory summary project=%s role=%s failed: %s", it.project_id, it.role_id, exc)
+        return f"Summary unavailable: {exc}"
+
+
+def _write_batch(items: List[_MemoryWrite]) -> None:
+    from app.memory.db import SessionLocal
+    from app.memory.manager import MemoryManager
+
+    db = SessionLocal()
+    try:
+        mm = MemoryManager(db)
+        if len(items) == 1:
+            summaries = [_summarize(mm, items[0])]
+        else:
+            summaries = list(_summary_pool.map(lambda it: _summarize(mm, it), items))
+        rows = [
+            (it.project_id, it.role_id, summary, it.raw_text, it.chat_session_id, it.is_ai_to_ai)
+            for it, summary in zip(items, summaries)
+        ]
+        try:
+            mm.store_memory_bulk(rows)  # one transaction for the whole batch
+        except Exception:
+            db.rollback()
+            raise  # BatchWriter retries the items one by one
+    finally:
+        db.close()
+
+
+_writer: BatchWriter[_MemoryWrite] = BatchWriter(
+    "memory write",
+    _write_batch,
+    batch_size=BATCH_SIZE,
+    flush_interval=FLUSH_INTERVAL,
+    queue_maxsize=QUEUE_MAXSIZE,
+    describe=lambda it: f"project={it.project_id} role={it.role_id}",
+)
+
+
+def enqueue_memory_write(
+    project_id: str,
+    role_id: int,
+    raw_text: str,
+    chat_session_id: Optional[str] = None,
+    is_ai_to_ai: bool = False,
+    summary: Optional[str] = None,
+) -> None:
+    """Queue a summarize+store_memory write — returns immediately (thread-safe)."""
+    item = _MemoryWrite(str(project_id), int(role_id), raw_text, chat_session_id, is_ai_to_ai, summary)
+    _writer.enqueue(item)
+
+
+def start_memory_writer() -> None:
+    _writer.start()
+
+
+async def stop_memory_writer() -> None:
+    """Flush whatever is still queued, then stop the consumer."""
+    await _writer.stop()
@@ -0,0 +1,9 @@
+"""SSE frame helper shared by the streaming routes."""
+from typing import Any, Dict
+
+import orjson
+
+
+def sse_event(name: str, data: Dict[str, Any]) -> str:
+    """One SSE frame body ({"event", "data"} JSON); orjson keeps per-chunk encoding cheap."""
+    return orjson.dumps({"event": name, "data": data}).decode() + "\n\n"
@@ -0,0 +1,38 @@
+"""
+Process-wide tiktoken encoding, loaded lazily on first use.
+
+Usage:
+    from app.utils.tokenizer import get_encoding
+
+    enc = get_encoding()  # None when tiktoken (or its BPE files) is unavailable
+    n = len(enc.encode(text)) if enc is not None else len(text) // 4
+
+BPE ranks are read from TIKTOKEN_CACHE_DIR (the Docker image pre-populates
+/app/.tiktoken_cache; a local <backend>/.tiktoken_cache is picked up when
+present), so importing a module that counts tokens never blocks on a network
+fetch — at most the first count does, once.
+"""
+import os
+from functools import lru_cache
+from typing import Any, Optional
+
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+_BUNDLED_CACHE = os.path.join(_BACKEND_ROOT, ".tiktoken_cache")
+if os.path.isdir(_BUNDLED_CACHE):
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", _BUNDLED_CACHE)
+
+ENCODINGS = ("o200k_base", "cl100k_base")  # preferred first
+
+
+@lru_cache(maxsize=1)
+def get_encoding() -> Optional[Any]:
+    try:
+        import tiktoken  # type: ignore
+    except Exception:
+        return None
+    for name in ENCODINGS:
+        try:
+            return tiktoken.get_encoding(name)
+        except Exception:
+            continue
+    return None
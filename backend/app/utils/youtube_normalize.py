@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 
 from app.memory.db import get_db
 from app.memory.manager import MemoryManager
+from app.memory.utils import rows_to_messages
 from app.memory.models import Project
 from app.providers.openai_provider import ask_openai
 from app.providers.claude_provider import ask_claude
@@ -309,20 +310,6 @@ async def claude_with_retry(messages: List[Dict[str, str]], retries: int = 2) ->
         await asyncio.sleep(1.5 + attempt)
     return last or "[Claude Retry Failed]"
 
-def _rows_to_messages(rows: List[Dict[str, Any]]) -> List[Dict[str, str]]:
-    """Map DB rows → provider messages; keep only user/assistant turns."""
-    out: List[Dict[str, str]] = []
-    for r in rows:
-        sender = (r.get("sender") or "").strip().lower()
-        text = (r.get("text") or "").strip()
-        if not text:
-            continue
-        if sender in {"openai", "anthropic", "assistant", "final"}:
-            out.append({"role": "assistant", "content": text})
-        elif sender == "user":
-            out.append({"role": "user", "content": text})
-    return out
-
 def _clip_by_tokens(memory: MemoryManager, messages: List[Dict[str, str]], max_tokens: int) -> List[Dict[str, str]]:
     """Keep newest turns within token budget by dropping from the front."""
     if not messages:
@@ -399,7 +386,7 @@ async def ask_ai_to_ai_route(data: AiToAiRequest, db: Session = Depends(get_db))
         limit=HISTORY_FETCH_LIMIT,
     )
     rows = messages_data.get("messages", [])
-    history = _rows_to_messages(rows)
+    history = rows_to_messages(rows)
     history = _clip_by_tokens(memory, history, HISTORY_MAX_TOKENS)
     if history:
         print(f"🧩 Context included → {len(history)} turns")
@@ -433,7 +420,7 @@ async def ask_ai_to_ai_route(data: AiToAiRequest, db: Session = Depends(get_db))
     yt_hits: List[Dict[str, Any]] = []
     try:
         # Some implementations return (block, hits); others return just hits; some return dicts
-        raw_yt = await run_in_threadpool(perform_youtube_search, data.topic, memory, role_id, project_id)
+        raw_yt = await run_in_threadpool(perform_youtube_search, data.topic, mem=memory, role_id=role_id, project_id=project_id)
         if isinstance(raw_yt, tuple) and len(raw_yt) == 2:
             raw_block, raw_items = raw_yt
             yt_hits = normalize_youtube_items(raw_items)
@@ -644,6 +631,9 @@ async def ask_ai_to_ai_route(data: AiToAiRequest, db: Session = Depends(get_db))
             + [{"role": "assistant", "content": final_reply}]
         )
         raw_text = "\n".join([f"{m['role']}: {m['content']}" for m in transcript])
+        if yt_hits:
+            # One summary per turn: the YouTube results ride along here
+            raw_text = f"{raw_text}\nYouTube: {yt_block}"
         summary = memory.summarize_messages([raw_text])
         memory.store_memory(project_id, role_id, summary, raw_text, chat_session_id, is_ai_to_ai=True)
     except Exception as e:
@@ -0,0 +1,80 @@
+# tests/test_batch_writer.py
+"""
+Unit tests for BatchWriter in app.utils.batch_writer
+"""
+
+import asyncio
+
+from app.utils.batch_writer import BatchWriter
+
+
+def test_without_consumer_items_are_written_inline():
+    batches = []
+    writer = BatchWriter("test", batches.append)
+    writer.enqueue(1)
+    writer.enqueue(2)
+    assert batches == [[1], [2]]
+
+
+def test_stop_flushes_queued_items_in_batches():
+    batches = []
+    writer = BatchWriter("test", batches.append, batch_size=4, flush_interval=1.0)
+
+    async def run():
+        writer.start()
+        for i in range(10):
+            writer.enqueue(i)
+        await writer.stop()
+
+    asyncio.run(run())
+    assert [i for b in batches for i in b] == list(range(10))
+    assert all(len(b) <= 4 for b in batches)
+
+
+def test_enqueue_from_another_thread_reaches_the_consumer():
+    batches = []
+    writer = BatchWriter("test", batches.append)
+
+    async def run():
+        writer.start()
+        await asyncio.to_thread(writer.enqueue, "from-thread")
+        await writer.stop()
+
+    asyncio.run(run())
+    assert batches == [["from-thread"]]
+
+
+def test_failed_batch_is_retried_item_by_item():
+    written = []
+
+    def write_batch(items):
+        if len(items) > 1:
+            raise RuntimeError("batch insert failed")
+        if items == ["bad"]:
+            raise RuntimeError("bad row")
+        written.extend(items)
+
+    writer = BatchWriter("test", write_batch, batch_size=8, flush_interval=1.0)
+
+    async def run():
+        writer.start()
+        for item in ("a", "bad", "b"):
+            writer.enqueue(item)
+        await writer.stop()
+
+    asyncio.run(run())
+    assert written == ["a", "b"]
+
+
+def test_full_queue_writes_inline_instead_of_dropping():
+    written = []
+    writer = BatchWriter("test", written.extend, batch_size=100, flush_interval=1.0, queue_maxsize=2)
+
+    async def run():
+        writer.start()
+        for i in range(6):
+            writer.enqueue(i)
+        await writer.stop()
+
+    asyncio.run(run())
+    assert sorted(written) == list(range(6))
@@ -0,0 +1,119 @@
+# tests/test_exact_cache.py
+"""
+Unit tests for LLMCache and cached_completion in app.cache.exact
+"""
+
+import asyncio
+import dataclasses
+
+import pytest
+
+from app.cache import exact
+from app.cache.exact import LLMCache, cached_completion
+from app.providers.errors import ProviderErrorText
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(exact, "time", c)
+    return c
+
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    """A cached fake provider; returns (wrapped_fn, list of calls it actually made)."""
+    monkeypatch.setattr(exact, "settings", dataclasses.replace(exact.settings, ENABLE_EXACT_CACHE=True))
+    exact.llm_cache.clear()
+    calls = []
+
+    @cached_completion("test")
+    async def ask(messages, temperature=0.0, api_key=None, answer="ok"):
+        calls.append((messages, temperature, api_key))
+        return answer
+
+    yield ask, calls
+    exact.llm_cache.clear()
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = LLMCache(ttl=10, max_entries=4)
+    cache.set("k", "v")
+    clock.now += 9
+    assert cache.get("k") == "v"
+    clock.now += 2
+    assert cache.get("k") is None
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = LLMCache(ttl=10, max_entries=4)
+    cache.set("short", "v", ttl=1)
+    clock.now += 2
+    assert cache.get("short") is None
+
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = LLMCache(ttl=60, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # a is now most recent
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_temperature_zero_repeat_is_served_from_cache(provider_calls):
+    ask, calls = provider_calls
+    msgs = [{"role": "user", "content": "hi"}]
+    assert asyncio.run(ask(msgs)) == "ok"
+    assert asyncio.run(ask(msgs)) == "ok"
+    assert len(calls) == 1
+
+
+def test_positive_temperature_is_not_cached(provider_calls):
+    ask, calls = provider_calls
+    msgs = [{"role": "user", "content": "hi"}]
+    asyncio.run(ask(msgs, temperature=0.7))
+    asyncio.run(ask(msgs, temperature=0.7))
+    assert len(calls) == 2
+
+
+def test_error_answer_is_not_cached(provider_calls):
+    ask, calls = provider_calls
+    msgs = [{"role": "user", "content": "hi"}]
+    err = ProviderErrorText("[Test Error] boom")
+    assert asyncio.run(ask(msgs, answer=err)) == err
+    asyncio.run(ask(msgs, answer=err))
+    assert len(calls) == 2
+
+
+def test_cache_is_keyed_by_api_key(provider_calls):
+    ask, calls = provider_calls
+    msgs = [{"role": "user", "content": "hi"}]
+    asyncio.run(ask(msgs, api_key="key-a"))
+    asyncio.run(ask(msgs, api_key="key-b"))
+    asyncio.run(ask(msgs, api_key="key-a"))
+    assert [c[2] for c in calls] == ["key-a", "key-b"]
+
+
+def test_concurrent_calls_with_different_api_keys_are_not_coalesced(provider_calls):
+    ask, calls = provider_calls
+    msgs = [{"role": "user", "content": "hi"}]
+
+    async def both():
+        return await asyncio.gather(
+            ask(msgs, temperature=0.7, api_key="key-a"),
+            ask(msgs, temperature=0.7, api_key="key-b"),
+        )
+
+    asyncio.run(both())
+    assert sorted(c[2] for c in calls) == ["key-a", "key-b"]
@@ -0,0 +1,76 @@
+# tests/test_semantic_cache.py
+"""
+Unit tests for SemanticCache and is_error_answer in app.cache.semantic
+"""
+
+import pytest
+
+from app.cache import semantic
+from app.cache.semantic import SemanticCache, is_error_answer
+from app.providers.errors import ProviderErrorText
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(semantic, "time", c)
+    return c
+
+
+def test_near_duplicate_hits_and_distant_vector_misses(clock):
+    cache = SemanticCache(tau=0.9, ttl=60)
+    cache.put("ns", [1.0, 0.0, 0.0], {"answer": "a"})
+    assert cache.query("ns", [0.99, 0.05, 0.0]) == {"answer": "a"}
+    assert cache.query("ns", [0.5, 0.5, 0.5]) is None
+
+
+def test_tau_is_the_similarity_threshold(clock):
+    cache = SemanticCache(tau=0.9, ttl=60)
+    cache.put("ns", [1.0, 0.0], {"answer": "a"})
+    # cos = 0.8 for [0.8, 0.6]
+    assert cache.query("ns", [0.8, 0.6]) is None
+    assert cache.query("ns", [0.8, 0.6], tau=0.75) == {"answer": "a"}
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SemanticCache(tau=0.9, ttl=10)
+    cache.put("ns", [1.0, 0.0], {"answer": "a"})
+    clock.now += 11
+    assert cache.query("ns", [1.0, 0.0]) is None
+
+
+def test_namespaces_are_isolated(clock):
+    cache = SemanticCache(tau=0.9, ttl=60)
+    cache.put(("user", 1), [1.0, 0.0], {"answer": "a"})
+    assert cache.query(("user", 2), [1.0, 0.0]) is None
+    assert cache.query(("user", 1), [1.0, 0.0]) == {"answer": "a"}
+
+
+def test_capacity_drops_oldest_entries(clock):
+    cache = SemanticCache(tau=0.99, ttl=60, max_per_namespace=2)
+    cache.put("ns", [1.0, 0.0, 0.0], {"answer": "x"})
+    cache.put("ns", [0.0, 1.0, 0.0], {"answer": "y"})
+    cache.put("ns", [0.0, 0.0, 1.0], {"answer": "z"})
+    assert cache.query("ns", [1.0, 0.0, 0.0]) is None
+    assert cache.query("ns", [0.0, 0.0, 1.0]) == {"answer": "z"}
+
+
+def test_zero_vector_is_ignored(clock):
+    cache = SemanticCache()
+    cache.put("ns", [0.0, 0.0], {"answer": "a"})
+    assert cache.query("ns", [0.0, 0.0]) is None
+
+
+def test_is_error_answer_checks_type_not_text():
+    assert is_error_answer(ProviderErrorText("[OpenAI Error] boom"))
+    assert is_error_answer("")
+    assert is_error_answer(None)
+    assert not is_error_answer("[Note] an answer that error]s in its opening words")
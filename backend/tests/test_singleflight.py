@@ -0,0 +1,95 @@
+# tests/test_singleflight.py
+"""
+Unit tests for SingleFlight in app.cache.singleflight
+"""
+
+import asyncio
+
+import pytest
+
+from app.cache.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    sf = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def run():
+        return await asyncio.gather(*(sf.do("k", work) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["done"] * 5
+    assert len(calls) == 1
+    assert len(sf) == 0
+
+
+def test_different_keys_run_separately():
+    sf = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return len(calls)
+
+    async def run():
+        return await asyncio.gather(sf.do("a", work), sf.do("b", work))
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_sequential_calls_are_not_coalesced():
+    sf = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        return "x"
+
+    async def run():
+        await sf.do("k", work)
+        await sf.do("k", work)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_exception_reaches_every_waiter():
+    sf = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(sf.do("k", work), sf.do("k", work), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    sf = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+        return "done"
+
+    async def run():
+        first = asyncio.create_task(sf.do("k", work))
+        second = asyncio.create_task(sf.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+    assert finished == [1]